@@ -1,7 +1,24 @@
-from .fen_parser import FenParser
+from .animation import game_to_animation, uci_to_animation
+from .atlas import load_pieces_atlas, save_pieces_atlas
+from .async_render import AsyncRenderer, fen_to_image_async
+from .cache import CacheStats, IdentityCache, LazyImageMap, LRUCache
+from .encoding import encode_image, fen_to_png_bytes, fen_to_webp_bytes
+from .fen_parser import FenParser, Position
+from .game import GameRenderer, positions_from_uci
+from .instrumentation import (
+    PHASES,
+    Instrumentation,
+    PhaseTimer,
+    RenderEvent,
+    get_instrumentation,
+    set_instrumentation,
+)
+from .mipmaps import load_pieces_mipmaps
 from .main import (
     # Core API
     fen_to_image,
+    fen_to_images,
+    render_into,
     load_pieces_folder,
     load_arrows_folder,
     load_font_file,
@@ -10,6 +27,9 @@ from .main import (
     standard,
     every_square,
     along_outer_rim,
+    # Cache management
+    clear_caches,
+    cache_stats,
     # Utility functions (for advanced usage)
     square_to_indices,
     indices_to_square,
@@ -21,13 +41,49 @@ from .main import (
     loadFontFile,
     CoordinatePositionFn,
 )
+from .parallel import render_many
+from .render_cache import DiskRenderCache, MemoryRenderCache, render_key
+from .pdf import fen_to_pdf, fens_to_pdf
+from .sheet import render_sheet
+from .svg import fen_to_svg, load_pieces_svg
+from .tiled import render_bands, write_png_bands
 
 __all__ = [
     # Classes
     "FenParser",
+    "Position",
+    "LRUCache",
+    "IdentityCache",
+    "GameRenderer",
+    "CacheStats",
+    "LazyImageMap",
     # Core API
     "fen_to_image",
+    "fen_to_images",
+    "render_into",
+    "render_many",
+    "render_sheet",
+    "render_bands",
+    "write_png_bands",
+    "fen_to_svg",
+    "fen_to_pdf",
+    "fens_to_pdf",
+    "fen_to_image_async",
+    "AsyncRenderer",
+    "fen_to_png_bytes",
+    "fen_to_webp_bytes",
+    "encode_image",
+    "game_to_animation",
+    "uci_to_animation",
+    "positions_from_uci",
+    "MemoryRenderCache",
+    "DiskRenderCache",
+    "render_key",
     "load_pieces_folder",
+    "load_pieces_atlas",
+    "save_pieces_atlas",
+    "load_pieces_mipmaps",
+    "load_pieces_svg",
     "load_arrows_folder",
     "load_font_file",
     # Coordinate position functions
@@ -35,6 +91,16 @@ __all__ = [
     "standard",
     "every_square",
     "along_outer_rim",
+    # Cache management
+    "clear_caches",
+    "cache_stats",
+    # Instrumentation
+    "Instrumentation",
+    "PhaseTimer",
+    "RenderEvent",
+    "PHASES",
+    "set_instrumentation",
+    "get_instrumentation",
     # Utility functions (for advanced usage)
     "square_to_indices",
     "indices_to_square",
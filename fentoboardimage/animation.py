@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""Animated GIF, APNG and WebP export of whole games.
+
+Frames are rendered incrementally with GameRenderer and mapped onto one
+palette shared by the whole animation, so consecutive frames differ only
+in the squares that changed. The encoders then store each frame as the
+rectangle that differs from the previous one.
+
+Example:
+    ```python
+    from fentoboardimage import load_pieces_folder, uci_to_animation
+
+    gif = uci_to_animation(
+        ["e2e4", "e7e5", "g1f3", "b8c6"],
+        square_length=60,
+        piece_set=load_pieces_folder("./pieces"),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+    )
+    with open("game.gif", "wb") as f:
+        f.write(gif)
+    ```
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .encoding import _NO_DITHER, quantize_board
+from .game import STARTING_FEN, GameRenderer, positions_from_uci
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    Coordinates,
+    LastMove,
+    PieceImages,
+)
+
+_ANIMATION_FORMATS = {"GIF": "GIF", "PNG": "PNG", "APNG": "PNG", "WEBP": "WEBP"}
+
+
+def _palette_sample(
+    first_frame: Image.Image,
+    renderer: GameRenderer,
+    square_colors: List[str],
+) -> Image.Image:
+    """Build an image holding every color the animation is likely to use.
+
+    The first frame covers the board, coordinates and most piece edges.
+    Below it a strip of tiles adds the last move highlight colors with
+    pieces on top, and the arrow sprites, which may only appear later.
+
+    Args:
+        first_frame: The first rendered frame.
+        renderer: The renderer producing the frames.
+        square_colors: Highlight colors used by any frame.
+
+    Returns:
+        An RGB image to build the shared palette from.
+    """
+    length = renderer.square_length
+    tiles: List[Image.Image] = []
+    pieces = renderer._piece_images
+    for color in square_colors:
+        for piece in ("Q", "q"):
+            tile = Image.new("RGB", (length, length), color)
+            if piece in pieces:
+                tile.paste(pieces[piece], (0, 0), pieces[piece].getchannel("A"))
+            tiles.append(tile)
+    if renderer._arrow_images is not None:
+        base = first_frame.getpixel((0, length))
+        for sprite in renderer._arrow_images.values():
+            tile = Image.new("RGB", sprite.size, base)
+            tile.paste(sprite, (0, 0), sprite.getchannel("A") if "A" in sprite.getbands() else None)
+            tiles.append(tile.resize((length, length)))
+
+    width = first_frame.width
+    per_row = max(1, width // length)
+    rows = (len(tiles) + per_row - 1) // per_row
+    sample = Image.new("RGB", (width, first_frame.height + rows * length), first_frame.getpixel((0, 0)))
+    sample.paste(first_frame, (0, 0))
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, per_row)
+        sample.paste(tile, (column * length, first_frame.height + row * length))
+    return sample
+
+
+def game_to_animation(
+    fens: Iterable[str],
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    last_moves: Optional[Iterable[Optional[LastMove]]] = None,
+    arrows: Optional[Iterable[Optional[List[ArrowInput]]]] = None,
+    flipped: bool = False,
+    coordinates: Optional[Coordinates] = None,
+    format: str = "GIF",
+    duration: int = 500,
+    loop: int = 0,
+    colors: int = 256,
+) -> bytes:
+    """Render a sequence of positions as an animated image.
+
+    Frames are rendered one at a time with GameRenderer, which only
+    repaints changed squares, and quantized to a single palette built from
+    the first frame and the highlight and arrow colors. Each frame is
+    mapped onto that palette instead of being quantized on its own, and
+    frames are kept as palette images, a third of the size of RGB.
+
+    Args:
+        fens: The FEN string of each frame, in order.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        last_moves: Optional last move highlight for each frame, with None
+            for frames without one.
+        arrows: Optional list of arrows for each frame, with None for frames
+            without arrows. Ignored if ``arrow_set`` is not given.
+        flipped: If True, render the boards from black's perspective.
+        coordinates: Optional configuration for drawing coordinates.
+        format: "GIF", "APNG" (or "PNG") or "WEBP".
+        duration: How long each frame is shown, in milliseconds.
+        loop: Number of times the animation repeats; 0 loops forever.
+        colors: The size of the shared palette (2-256).
+
+    Returns:
+        The encoded animation.
+
+    Raises:
+        ValueError: If ``format`` is not supported, ``fens`` is empty, or
+            ``last_moves`` or ``arrows`` has a different length than ``fens``.
+        KeyError: If Pillow was built without support for ``format``.
+    """
+    save_format = _ANIMATION_FORMATS.get(format.upper())
+    if save_format is None:
+        raise ValueError(f"Unsupported animation format: {format!r}")
+    # The per-frame options are small, so materialize them to find every
+    # highlight color before rendering
+    fens = list(fens)
+    if not fens:
+        raise ValueError("Cannot make an animation without frames")
+    moves: List[Optional[LastMove]] = list(last_moves) if last_moves is not None else [None] * len(fens)
+    frame_arrows: List[Optional[List[ArrowInput]]] = (
+        list(arrows) if arrows is not None else [None] * len(fens)
+    )
+    for name, values in (("last_moves", moves), ("arrows", frame_arrows)):
+        if len(values) != len(fens):
+            raise ValueError(f"Got {len(values)} {name} for {len(fens)} frames")
+
+    renderer = GameRenderer(
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        flipped=flipped,
+        coordinates=coordinates,
+    )
+    frames = (
+        renderer.render(fen, last_move=move, arrows=frame_arrow)
+        for fen, move, frame_arrow in zip(fens, moves, frame_arrows)
+    )
+    first = next(frames)
+
+    square_colors: List[str] = []
+    for move in moves:
+        if move is not None:
+            for color in (move["darkColor"], move["lightColor"]):
+                if color not in square_colors:
+                    square_colors.append(color)
+    palette = quantize_board(_palette_sample(first, renderer, square_colors), colors)
+
+    def quantized(images: Iterable[Image.Image]) -> Iterator[Image.Image]:
+        for image in images:
+            yield image.quantize(palette=palette, dither=_NO_DITHER)
+
+    params: Dict[str, Any] = {"save_all": True, "duration": duration, "loop": loop}
+    if save_format == "GIF":
+        # Keep the shared palette rather than a trimmed palette per frame
+        params["optimize"] = False
+    elif save_format == "WEBP":
+        params["lossless"] = True
+
+    append_images: Iterable[Image.Image] = quantized(frames)
+    if save_format != "GIF":
+        # The APNG and WebP writers iterate over the frames more than once
+        append_images = list(append_images)
+
+    buffer = io.BytesIO()
+    first_frame = first.quantize(palette=palette, dither=_NO_DITHER)
+    first_frame.save(buffer, save_format, append_images=append_images, **params)
+    return buffer.getvalue()
+
+
+def uci_to_animation(
+    moves: Iterable[str],
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    start_fen: str = STARTING_FEN,
+    highlight: Optional[Tuple[str, str]] = ("#aaa23a", "#cdd26a"),
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    flipped: bool = False,
+    coordinates: Optional[Coordinates] = None,
+    format: str = "GIF",
+    duration: int = 500,
+    loop: int = 0,
+    colors: int = 256,
+) -> bytes:
+    """Render a game given as UCI moves as an animated image.
+
+    The first frame shows ``start_fen`` and each following frame the
+    position after one move, with that move highlighted and, if an arrow
+    set is given, drawn as an arrow.
+
+    Args:
+        moves: Moves in UCI long algebraic notation, e.g. "e2e4" or "e7e8q".
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        start_fen: The position before the first move.
+        highlight: The (dark square, light square) colors of the last move
+            highlight, or None to disable it.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        flipped: If True, render the boards from black's perspective.
+        coordinates: Optional configuration for drawing coordinates.
+        format: "GIF", "APNG" (or "PNG") or "WEBP".
+        duration: How long each frame is shown, in milliseconds.
+        loop: Number of times the animation repeats; 0 loops forever.
+        colors: The size of the shared palette (2-256).
+
+    Returns:
+        The encoded animation.
+
+    Raises:
+        ValueError: If a move is malformed or the format is not supported.
+    """
+    fens = [start_fen]
+    last_moves: List[Optional[LastMove]] = [None]
+    arrows: List[Optional[List[ArrowInput]]] = [None]
+    for fen, (before, after) in positions_from_uci(moves, start_fen):
+        fens.append(fen)
+        last_moves.append(
+            {"before": before, "after": after, "darkColor": highlight[0], "lightColor": highlight[1]}
+            if highlight is not None
+            else None
+        )
+        arrows.append([[before, after]] if arrow_set is not None else None)
+    return game_to_animation(
+        fens,
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        last_moves=last_moves,
+        arrows=arrows,
+        flipped=flipped,
+        coordinates=coordinates,
+        format=format,
+        duration=duration,
+        loop=loop,
+        colors=colors,
+    )
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""Rendering chess positions from asyncio code.
+
+Rendering is CPU bound and would block the event loop, so these helpers run
+it in an executor. AsyncRenderer also caps the number of renders in flight
+and lets concurrent requests for the same render share one result.
+
+Example:
+    ```python
+    from fentoboardimage import AsyncRenderer, load_pieces_folder
+
+    renderer = AsyncRenderer(max_concurrency=4)
+    pieces = load_pieces_folder("./pieces")
+
+    async def handle(fen):
+        return await renderer.render(fen, 60, pieces, "#D18B47", "#FFCE9E")
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+from PIL import Image
+
+from .encoding import _render_bytes
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    fen_to_image,
+)
+from .render_cache import RenderCache, render_key
+
+
+async def fen_to_image_async(
+    fen: str,
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    executor: Optional[Executor] = None,
+) -> Image.Image:
+    """Generate a chess board image without blocking the event loop.
+
+    Accepts the same rendering options as fen_to_image, and runs it in
+    ``executor``.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        executor: The executor to render in. Defaults to the event loop's
+            default thread pool.
+
+    Returns:
+        A PIL Image of the rendered chess position.
+    """
+    loop = asyncio.get_running_loop()
+    render = functools.partial(
+        fen_to_image,
+        fen,
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        arrows=arrows,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+    )
+    return await loop.run_in_executor(executor, render)
+
+
+class AsyncRenderer:
+    """Renders positions to encoded bytes from asyncio code.
+
+    Renders run in an executor, at most ``max_concurrency`` at a time.
+    Concurrent requests for the same render (see render_key) are coalesced:
+    only the first one is rendered and every caller receives its bytes.
+    Requests that cannot be keyed, such as ones using a lambda piece set,
+    are rendered individually.
+
+    The renderer binds to the event loop it is first used in.
+
+    Attributes:
+        coalesced: Number of requests served by another request's render.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = 4,
+        cache: Optional[RenderCache] = None,
+    ) -> None:
+        """Initialize the renderer.
+
+        Args:
+            executor: The executor to render in. Defaults to the event loop's
+                default thread pool. A process pool also works as long as the
+                render options and ``cache`` can be pickled.
+            max_concurrency: The maximum number of renders in flight.
+            cache: Optional render cache consulted before rendering.
+
+        Raises:
+            ValueError: If ``max_concurrency`` is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.coalesced = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    @property
+    def inflight(self) -> int:
+        """The number of distinct keyed renders currently in progress."""
+        return len(self._inflight)
+
+    async def render(
+        self,
+        fen: str,
+        square_length: int,
+        piece_set: Callable[[Image.Image], PieceImages],
+        dark_color: str,
+        light_color: str,
+        arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+        arrows: Optional[List[ArrowInput]] = None,
+        flipped: bool = False,
+        last_move: Optional[LastMove] = None,
+        coordinates: Optional[Coordinates] = None,
+        format: str = "PNG",
+        **encode_params: Any,
+    ) -> bytes:
+        """Render a position to encoded bytes.
+
+        Args:
+            fen: A FEN string representing the chess position.
+            square_length: The length of each square in pixels.
+            piece_set: A piece loader function from load_pieces_folder().
+            dark_color: The color for dark squares as a hex string.
+            light_color: The color for light squares as a hex string.
+            arrow_set: Optional arrow loader function from load_arrows_folder().
+            arrows: Optional list of arrows to draw.
+            flipped: If True, render the board from black's perspective.
+            last_move: Optional dictionary for highlighting the last move.
+            coordinates: Optional configuration for drawing coordinates.
+            format: A Pillow format name such as "PNG" or "WEBP".
+            **encode_params: Extra keyword arguments passed to encode_image().
+
+        Returns:
+            The encoded image.
+        """
+        render_options: Dict[str, Any] = {
+            "fen": fen,
+            "square_length": square_length,
+            "piece_set": piece_set,
+            "dark_color": dark_color,
+            "light_color": light_color,
+            "arrow_set": arrow_set,
+            "arrows": arrows,
+            "flipped": flipped,
+            "last_move": last_move,
+            "coordinates": coordinates,
+        }
+        key = render_key(format=format, encode_params=encode_params, **render_options)
+        if key is None:
+            return await self._render(render_options, format, encode_params)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(render_options, format, encode_params))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        # Shield the shared render so one caller's cancellation does not
+        # cancel it for the others
+        return await asyncio.shield(task)
+
+    async def _render(
+        self,
+        render_options: Dict[str, Any],
+        format: str,
+        encode_params: Dict[str, Any],
+    ) -> bytes:
+        """Render in the executor once a concurrency slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            render = functools.partial(
+                _render_bytes, render_options, format, encode_params, self.cache
+            )
+            return await loop.run_in_executor(self.executor, render)
+
+    def _forget(self, key: str, task: "asyncio.Future[bytes]") -> None:
+        """Drop a finished render from the in-flight table."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""Piece sets packed into a single atlas image.
+
+A piece folder holds twelve PNG files, so loading one means twelve decodes.
+An atlas packs the twelve pieces into one PNG, with the position of each
+piece stored in a text chunk, so a piece set loads with a single decode and
+each piece is a crop of the decoded image.
+
+Example:
+    ```python
+    from fentoboardimage import load_pieces_atlas, save_pieces_atlas
+
+    save_pieces_atlas("./pieces", "./pieces.png")
+    pieces = load_pieces_atlas("./pieces.png")
+    ```
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Tuple
+
+from PIL import Image, ImageChops
+from PIL.PngImagePlugin import PngInfo
+
+from .main import (
+    PieceImages,
+    alpha_cache,
+    load_pieces_folder,
+    piece_cache,
+    resized_cache,
+)
+
+ATLAS_INFO_KEY = "fentoboardimage-atlas"
+"""The PNG text chunk holding the atlas layout."""
+
+ATLAS_VERSION = 1
+
+# Atlas layout: white pieces on the first row, black pieces on the second
+_ATLAS_ORDER = ("KQRBNP", "kqrbnp")
+
+Box = Tuple[int, int, int, int]
+
+
+def pack_pieces_atlas(piece_images: PieceImages) -> Tuple[Image.Image, Dict[str, Box]]:
+    """Pack twelve piece images into one atlas image.
+
+    Pieces are placed in a 6x2 grid of cells as large as the largest piece.
+    Each piece keeps its original size, so cropping its box returns exactly
+    the original image.
+
+    Args:
+        piece_images: A dictionary mapping piece characters to RGBA images.
+
+    Returns:
+        The RGBA atlas and the box of each piece in it.
+
+    Raises:
+        KeyError: If a piece is missing from ``piece_images``.
+    """
+    cell_width = max(image.width for image in piece_images.values())
+    cell_height = max(image.height for image in piece_images.values())
+    atlas = Image.new("RGBA", (cell_width * 6, cell_height * 2), (0, 0, 0, 0))
+    boxes: Dict[str, Box] = {}
+    for row, pieces in enumerate(_ATLAS_ORDER):
+        for column, piece in enumerate(pieces):
+            image = piece_images[piece]
+            x, y = column * cell_width, row * cell_height
+            atlas.paste(image, (x, y))
+            boxes[piece] = (x, y, x + image.width, y + image.height)
+    return atlas, boxes
+
+
+def save_pieces_atlas(folder: str, path: str) -> None:
+    """Pack a piece folder into an atlas file.
+
+    Args:
+        folder: A piece folder as accepted by load_pieces_folder().
+        path: Where to write the atlas PNG.
+    """
+    piece_images = load_pieces_folder(folder, cache=False).piece_images  # type: ignore
+    atlas, boxes = pack_pieces_atlas(piece_images)
+    red, green, blue, _ = atlas.split()
+    if ImageChops.difference(red, green).getbbox() is None and ImageChops.difference(red, blue).getbbox() is None:
+        # Grayscale sets, the common case, decode twice as fast as LA
+        atlas = atlas.convert("LA")
+    info = PngInfo()
+    info.add_text(ATLAS_INFO_KEY, json.dumps({"version": ATLAS_VERSION, "boxes": boxes}))
+    atlas.save(path, "PNG", pnginfo=info)
+
+
+def _read_atlas(path: str) -> Tuple[Image.Image, Dict[str, Box]]:
+    """Decode an atlas file and its layout.
+
+    Args:
+        path: Path to an atlas written by save_pieces_atlas().
+
+    Returns:
+        The atlas, in the mode it was saved in, and the box of each piece in it.
+
+    Raises:
+        ValueError: If the file has no atlas layout or an unknown version.
+    """
+    with Image.open(path) as image:
+        raw = image.info.get(ATLAS_INFO_KEY)
+        if raw is None:
+            raise ValueError(f"{path} is not a piece atlas")
+        image.load()
+    layout = json.loads(raw)
+    if layout.get("version") != ATLAS_VERSION:
+        raise ValueError(f"Unsupported piece atlas version in {path}: {layout.get('version')}")
+    boxes = {piece: tuple(box) for piece, box in layout["boxes"].items()}
+    return image, boxes  # type: ignore
+
+
+class _PieceAtlasLoader:
+    """Piece loader returned by load_pieces_atlas().
+
+    For each board size the pieces are resized into one RGBA atlas of
+    square cells, and the alpha channel of that atlas is extracted once.
+    The piece images and their alpha channels are crops of these two
+    buffers.
+    """
+
+    __slots__ = ("path", "cache", "piece_images")
+
+    def __init__(self, path: str, cache: bool, piece_images: PieceImages) -> None:
+        self.path = path
+        self.cache = cache
+        self.piece_images = piece_images
+
+    def __call__(self, board: Image.Image) -> PieceImages:
+        cache_key = (self.path, board.size[0])
+        cached = resized_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        piece_size = int(board.size[0] / 8)
+        sized_atlas = Image.new("RGBA", (piece_size * 6, piece_size * 2), (0, 0, 0, 0))
+        boxes: List[Tuple[str, Box]] = []
+        for row, pieces in enumerate(_ATLAS_ORDER):
+            for column, piece in enumerate(pieces):
+                x, y = column * piece_size, row * piece_size
+                sized_atlas.paste(self.piece_images[piece].resize((piece_size, piece_size)), (x, y))
+                boxes.append((piece, (x, y, x + piece_size, y + piece_size)))
+        alpha_plane = sized_atlas.getchannel("A")
+        resized: PieceImages = {piece: sized_atlas.crop(box) for piece, box in boxes}
+        alphas = {piece: alpha_plane.crop(box) for piece, box in boxes}
+        if self.cache:
+            resized_cache.put(cache_key, resized)
+            alpha_cache.put(resized, alphas)
+        return resized
+
+    @property
+    def cache_key(self) -> Tuple[str, str]:
+        """A stable identity for this piece set, used in render cache keys."""
+        return ("atlas", os.path.abspath(self.path))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (load_pieces_atlas, (self.path, self.cache))
+
+
+def load_pieces_atlas(
+    path: str,
+    cache: bool = True,
+) -> Callable[[Image.Image], PieceImages]:
+    """Load chess piece images from an atlas file.
+
+    Works like load_pieces_folder(), but decodes a single image written by
+    save_pieces_atlas() instead of twelve.
+
+    Args:
+        path: Path to the atlas PNG.
+        cache: Whether to cache loaded images for reuse. Defaults to True.
+
+    Returns:
+        A function that takes a board image and returns a dictionary
+        mapping piece characters to appropriately sized PIL Images.
+
+    Raises:
+        ValueError: If the file is not a piece atlas.
+
+    Example:
+        ```python
+        pieces = load_pieces_atlas("./pieces.png")
+        board = Image.new("RGB", (800, 800), "white")
+        piece_images = pieces(board)
+        ```
+    """
+    piece_images = piece_cache.get(path)
+    if piece_images is None:
+        atlas, boxes = _read_atlas(path)
+        # Crops stay in the atlas mode (LA for grayscale sets); resizing
+        # gives the same pixels as resizing the RGBA source images
+        piece_images = {piece: atlas.crop(box) for piece, box in boxes.items()}
+        if cache:
+            piece_cache.put(path, piece_images)
+    return _PieceAtlasLoader(path, cache, piece_images)
@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+"""Benchmarks for each stage of the rendering pipeline.
+
+Each stage (FEN parsing, the checkerboard, piece loading, piece and arrow
+painting, the coordinate overlay and PNG encoding) is timed on its own, for
+several square lengths, with cold caches (every module-level cache cleared
+before each sample) and warm caches (after a priming run).
+
+Results are written as JSON. Given a baseline file written by an earlier
+run, the run is compared against it and the command exits with status 1 if
+any stage is slower by more than the threshold.
+
+The piece, arrow and font assets are read from the directory given with
+``--assets``, laid out like the repository's ``test`` directory (which is
+not installed with the package, so run from a source checkout or point
+``--assets`` at a copy).
+
+Example:
+    ```bash
+    python -m fentoboardimage.bench --assets test --output baseline.json
+    # ... change the renderer ...
+    python -m fentoboardimage.bench --assets test --baseline baseline.json --threshold 0.15
+    ```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import PIL
+from PIL import Image
+
+from .encoding import encode_image
+from .fen_parser import Position
+from .main import (
+    Coordinates,
+    PieceImages,
+    _draw_coordinates,
+    _find_piece_alphas,
+    _normalize_arrows,
+    checker_board_template,
+    clear_caches,
+    coordinate_position_fn,
+    fen_to_image,
+    load_arrows_folder,
+    load_font_file,
+    load_pieces_folder,
+    paint_all_arrows,
+    paint_all_pieces,
+    paint_checker_board,
+)
+
+BENCH_VERSION = 1
+"""The version of the JSON result format."""
+
+DEFAULT_SIZES = (16, 32, 64, 128, 256)
+"""The square lengths benchmarked by default."""
+
+CACHE_MODES = ("cold", "warm")
+
+FENS = (
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7",
+    "8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44",
+    "4k3/8/8/8/8/8/8/4K3 w - - 0 1",
+)
+"""Positions used by the parsing and rendering stages."""
+
+ARROW_SHAPES = {
+    "knight": ("g1", "f3"),
+    "vertical": ("e2", "e7"),
+    "horizontal": ("a4", "h4"),
+    "diagonal": ("a1", "h8"),
+}
+"""One arrow of each shape drawn by paint_all_arrows()."""
+
+_DARK = "#D18B47"
+_LIGHT = "#FFCE9E"
+
+
+class Stage(NamedTuple):
+    """A benchmarked stage.
+
+    Attributes:
+        name: The stage name used in results.
+        setup: Called before each sample, untimed; its result is passed to run.
+        run: The timed work.
+    """
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+
+def _piece_sets(assets: str) -> List[str]:
+    """Return the names of the piece set folders in ``assets``."""
+    return sorted(
+        name
+        for name in os.listdir(assets)
+        if name.startswith("pieces") and os.path.isdir(os.path.join(assets, name))
+    )
+
+
+def _load_all_pieces(path: str, board: Image.Image) -> Tuple[PieceImages, Any]:
+    """Load a piece set for a board and create every piece image.
+
+    Piece loaders return lazy mappings, so each piece image and alpha
+    channel is read here to decode and resize the whole set at once.
+
+    Returns:
+        The piece images and their alpha channels, or None for the alphas
+        if the set was not cached.
+    """
+    piece_images = load_pieces_folder(path)(board)
+    piece_alphas = _find_piece_alphas(piece_images)
+    for piece in piece_images:
+        piece_images[piece]
+        if piece_alphas is not None:
+            piece_alphas[piece]
+    return piece_images, piece_alphas
+
+
+def _stages(assets: str, square_length: int) -> Iterator[Stage]:
+    """Build the stages for one square length.
+
+    Loaders are created inside the timed functions, so cold runs include
+    decoding the asset files. The load_pieces stages create all twelve
+    piece images and their alpha channels, so they time decoding and
+    resizing the whole set; paint_all_pieces starts from a loaded set and
+    times painting alone.
+
+    Args:
+        assets: A directory holding ``pieces*``, ``arrows1`` and ``fonts``.
+        square_length: The length of each square in pixels.
+
+    Yields:
+        Each stage, in pipeline order.
+    """
+    pieces_path = os.path.join(assets, "pieces")
+    arrows_path = os.path.join(assets, "arrows1")
+    width = square_length * 8
+    template = checker_board_template(square_length, _DARK, _LIGHT)
+    coordinates: Coordinates = {
+        "font": load_font_file(os.path.join(assets, "fonts", "Roboto-Bold.ttf")),
+        "size": max(1, square_length // 4),
+        "dark_color": "#202020",
+        "light_color": "#f0f0f0",
+        "position_fn": coordinate_position_fn["standard"],
+    }
+
+    yield Stage(
+        "parse_fen",
+        lambda: None,
+        lambda _: [Position.from_fen(fen) for fen in FENS],
+    )
+    yield Stage(
+        "paint_checker_board",
+        lambda: Image.new("RGB", (width, width), _LIGHT),
+        lambda board: paint_checker_board(board, _DARK),
+    )
+    for name in _piece_sets(assets):
+        path = os.path.join(assets, name)
+        yield Stage(
+            f"load_pieces:{name}",
+            lambda: None,
+            lambda _, path=path: _load_all_pieces(path, template),
+        )
+
+    def pieces_setup() -> Any:
+        return (template.copy(),) + _load_all_pieces(pieces_path, template)
+
+    position = Position.from_fen(FENS[1])
+    yield Stage(
+        "paint_all_pieces",
+        pieces_setup,
+        lambda state: paint_all_pieces(state[0], position, state[1], state[2]),
+    )
+
+    for shape, arrow in ARROW_SHAPES.items():
+        normalized = _normalize_arrows([list(arrow)], False)
+        yield Stage(
+            f"paint_all_arrows:{shape}",
+            template.copy,
+            lambda board, normalized=normalized: paint_all_arrows(
+                board, normalized, load_arrows_folder(arrows_path)(board)  # type: ignore
+            ),
+        )
+
+    yield Stage(
+        "coordinates",
+        template.copy,
+        lambda board: _draw_coordinates(board, coordinates, square_length),
+    )
+
+    rendered = fen_to_image(FENS[1], square_length, load_pieces_folder(pieces_path), _DARK, _LIGHT)
+    yield Stage("png_encode", lambda: None, lambda _: encode_image(rendered, "PNG"))
+
+    yield Stage(
+        "fen_to_image",
+        lambda: None,
+        lambda _: fen_to_image(
+            FENS[1],
+            square_length,
+            load_pieces_folder(pieces_path),
+            _DARK,
+            _LIGHT,
+            arrow_set=load_arrows_folder(arrows_path),
+            arrows=[list(arrow) for arrow in ARROW_SHAPES.values()],
+            coordinates=coordinates,
+        ),
+    )
+
+
+def _time_stage(stage: Stage, cache: str, repeat: int) -> List[float]:
+    """Time ``repeat`` samples of a stage, in milliseconds.
+
+    Args:
+        stage: The stage to time.
+        cache: "cold" to clear every cache before each sample, or "warm" to
+            prime the caches with one untimed run first.
+        repeat: The number of samples.
+
+    Returns:
+        The duration of each sample.
+    """
+    if cache == "warm":
+        stage.run(stage.setup())
+    samples = []
+    for _ in range(repeat):
+        if cache == "cold":
+            clear_caches()
+        state = stage.setup()
+        start = time.perf_counter()
+        stage.run(state)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_benchmarks(
+    assets: str,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 5,
+    stages: Optional[Sequence[str]] = None,
+    caches: Sequence[str] = CACHE_MODES,
+) -> Dict[str, Any]:
+    """Time every stage for each square length and cache mode.
+
+    Args:
+        assets: A directory holding ``pieces*``, ``arrows1`` and ``fonts``,
+            laid out like the repository's ``test`` directory.
+        sizes: The square lengths to benchmark.
+        repeat: The number of samples per stage.
+        stages: Optional stage name prefixes to run; defaults to all stages.
+        caches: The cache modes to run, "cold" and/or "warm".
+
+    Returns:
+        A JSON-serializable report with the environment and a list of
+        results, each with the stage, square length, cache mode and the
+        median, minimum and maximum sample in milliseconds.
+
+    Raises:
+        ValueError: If ``repeat`` is less than 1 or a cache mode is unknown.
+        FileNotFoundError: If ``assets`` does not exist.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    for cache in caches:
+        if cache not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {cache!r}, expected one of {CACHE_MODES}")
+    if not os.path.isdir(assets):
+        raise FileNotFoundError(f"Benchmark assets not found: {assets}")
+
+    results = []
+    for square_length in sizes:
+        for stage in _stages(assets, square_length):
+            if stages and not any(stage.name.startswith(prefix) for prefix in stages):
+                continue
+            for cache in caches:
+                samples = _time_stage(stage, cache, repeat)
+                results.append(
+                    {
+                        "stage": stage.name,
+                        "square_length": square_length,
+                        "cache": cache,
+                        "median_ms": statistics.median(samples),
+                        "min_ms": min(samples),
+                        "max_ms": max(samples),
+                        "samples": len(samples),
+                    }
+                )
+    clear_caches()
+    return {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+class Regression(NamedTuple):
+    """A stage that got slower than its baseline.
+
+    Attributes:
+        stage: The stage name.
+        square_length: The square length it was run at.
+        cache: The cache mode, "cold" or "warm".
+        baseline_ms: The baseline median.
+        current_ms: The current median.
+    """
+
+    stage: str
+    square_length: int
+    cache: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        """How many times slower the current run is."""
+        if self.baseline_ms <= 0:
+            return float("inf")
+        return self.current_ms / self.baseline_ms
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10,
+    min_ms: float = 0.05,
+) -> List[Regression]:
+    """Find stages whose median got slower than in a baseline report.
+
+    Results are matched by stage, square length and cache mode; results
+    present in only one report are ignored.
+
+    Args:
+        baseline: A report from run_benchmarks(), usually loaded from JSON.
+        current: The report to check.
+        threshold: The allowed slowdown as a fraction, e.g. 0.10 for 10%.
+        min_ms: Slowdowns smaller than this many milliseconds are ignored,
+            since very short stages are dominated by timer noise.
+
+    Returns:
+        The regressions, in the order of ``current``.
+
+    Raises:
+        ValueError: If the baseline was written by another report version.
+    """
+    if baseline.get("version") != BENCH_VERSION:
+        raise ValueError(f"Unsupported benchmark report version: {baseline.get('version')}")
+    reference = {
+        (result["stage"], result["square_length"], result["cache"]): result["median_ms"]
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        key = (result["stage"], result["square_length"], result["cache"])
+        baseline_ms = reference.get(key)
+        if baseline_ms is None:
+            continue
+        current_ms = result["median_ms"]
+        if current_ms > baseline_ms * (1 + threshold) and current_ms - baseline_ms > min_ms:
+            regressions.append(Regression(*key, baseline_ms, current_ms))
+    return regressions
+
+
+def _format_table(report: Dict[str, Any]) -> str:
+    """Format a report as a plain text table."""
+    lines = [f"{'stage':<32} {'size':>5} {'cache':<5} {'median ms':>10} {'min ms':>10}"]
+    for result in report["results"]:
+        lines.append(
+            f"{result['stage']:<32} {result['square_length']:>5} {result['cache']:<5} "
+            f"{result['median_ms']:>10.3f} {result['min_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks from the command line.
+
+    Args:
+        argv: Command line arguments, defaulting to ``sys.argv[1:]``.
+
+    Returns:
+        The exit status: 1 if a regression was found, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m fentoboardimage.bench",
+        description="Time each stage of the fentoboardimage rendering pipeline.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="comma separated square lengths (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="samples per stage (default: %(default)s)")
+    parser.add_argument(
+        "--assets",
+        required=True,
+        help="directory of pieces*, arrows1 and fonts assets, e.g. the repository's test directory",
+    )
+    parser.add_argument("--stage", action="append", dest="stages", help="only run stages starting with this name")
+    parser.add_argument("--cache", choices=CACHE_MODES, help="only run one cache mode")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against a JSON report from an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed slowdown against the baseline as a fraction (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=0.05,
+        help="ignore slowdowns smaller than this many milliseconds (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.assets):
+        parser.error(f"--assets directory not found: {args.assets}")
+
+    report = run_benchmarks(
+        args.assets,
+        sizes=args.sizes,
+        repeat=args.repeat,
+        stages=args.stages,
+        caches=(args.cache,) if args.cache else CACHE_MODES,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(_format_table(report), file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, report, args.threshold, args.min_ms)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.stage} size={regression.square_length} "
+            f"cache={regression.cache}: {regression.baseline_ms:.3f} ms -> "
+            f"{regression.current_ms:.3f} ms ({regression.ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
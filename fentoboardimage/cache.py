@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+"""Bounded, thread-safe caches used by the renderer.
+
+This module provides the LRUCache class that backs the piece, arrow and
+checkerboard caches in fentoboardimage.main, and IdentityCache for values
+derived from a particular object, such as a resized piece set. Caches can be limited by
+entry count and by approximate memory use, evict the least recently used
+entries first, count hits and misses, and are safe to share between
+threads.
+
+Example:
+    ```python
+    from fentoboardimage import LRUCache
+
+    cache = LRUCache(max_entries=128, max_bytes=64 * 1024 * 1024)
+    image = cache.get_or_create(("board", 100), lambda: render_board(100))
+    print(cache.stats())
+    ```
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from PIL import Image
+
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    """A snapshot of a cache's counters.
+
+    Attributes:
+        hits: Number of lookups that found an entry.
+        misses: Number of lookups that did not find an entry.
+        evictions: Number of entries removed to stay within the limits.
+        entries: Number of entries currently stored.
+        bytes: Approximate memory used by the stored entries.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+def sizeof_value(value: Any) -> int:
+    """Estimate the memory used by a cached value.
+
+    Images count their decoded pixel data. Bytes count their length, and
+    arrays and LazyImageMap their ``nbytes``. Other mappings, tuples and
+    lists count the sum of their items.
+
+    Args:
+        value: The cached value.
+
+    Returns:
+        The approximate size in bytes. Unknown types count as 0.
+    """
+    if isinstance(value, Image.Image):
+        return value.size[0] * value.size[1] * len(value.getbands())
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    # Checked before Mapping, so lazy mappings are not forced to load
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, Mapping):
+        return sum(sizeof_value(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(sizeof_value(item) for item in value)
+    return 0
+
+
+class LazyImageMap(Mapping[str, Image.Image]):
+    """A read-only mapping that creates each image on first access.
+
+    Piece loaders return these so a render only decodes and resizes the
+    pieces that appear on its board. Iterating over keys or checking
+    membership does not create images; reading values does. Safe to
+    share between threads: each image is created once.
+
+    Attributes:
+        nbytes: An estimate of the size of all images once created, used
+            by cache size accounting, or the size of the images created so
+            far when no estimate was given.
+    """
+
+    __slots__ = ("_factories", "_images", "_lock", "_estimate")
+
+    def __init__(
+        self,
+        factories: Mapping[str, Callable[[], Image.Image]],
+        nbytes: Optional[int] = None,
+    ) -> None:
+        """Initialize the mapping.
+
+        Args:
+            factories: A function creating the image for each key.
+            nbytes: An estimate of the size of all images in bytes.
+        """
+        self._factories = dict(factories)
+        self._images: Dict[str, Image.Image] = {}
+        self._lock = threading.Lock()
+        self._estimate = nbytes
+
+    def __getitem__(self, key: str) -> Image.Image:
+        image = self._images.get(key)
+        if image is not None:
+            return image
+        factory = self._factories[key]
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                image = factory()
+                self._images[key] = image
+        return image
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    @property
+    def nbytes(self) -> int:
+        if self._estimate is not None:
+            return self._estimate
+        return sum(sizeof_value(image) for image in list(self._images.values()))
+
+    def loaded(self) -> List[str]:
+        """Return the keys whose images have been created."""
+        return list(self._images)
+
+    def __repr__(self) -> str:
+        return f"LazyImageMap(keys={list(self._factories)!r}, loaded={self.loaded()!r})"
+
+
+class LRUCache(Generic[V]):
+    """A bounded least-recently-used cache.
+
+    All operations take an internal lock, so a cache can be shared by the
+    threads of a threaded server. Values are created outside the lock in
+    get_or_create(), so two threads missing on the same key at the same
+    time may both compute it; the last one stored wins.
+
+    Attributes:
+        max_entries: The maximum number of entries, or None for no limit.
+        max_bytes: The maximum approximate size of all entries in bytes,
+            or None for no limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = sizeof_value,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: The maximum number of entries, or None for no limit.
+            max_bytes: The maximum approximate size of all entries in bytes,
+                or None for no limit. A single entry larger than this is
+                not stored.
+            sizeof: A function estimating the size of a value in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Hashable, Tuple[V, int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Look up a value and mark it as recently used.
+
+        Args:
+            key: The cache key.
+            default: The value to return if the key is not cached.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Store a value, evicting least recently used entries if needed.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """Return the cached value for a key, creating it on a miss.
+
+        Args:
+            key: The cache key.
+            factory: A function called without arguments to create the value.
+
+        Returns:
+            The cached or newly created value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Remove a value from the cache.
+
+        Args:
+            key: The cache key.
+            default: The value to return if the key is not cached.
+
+        Returns:
+            The removed value, or ``default``.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache's counters.
+
+        Returns:
+            A CacheStats tuple.
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._bytes,
+            )
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the limits are met."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __getitem__(self, key: Hashable) -> V:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def __setitem__(self, key: Hashable, value: V) -> None:
+        self.put(key, value)
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return (
+            f"LRUCache(entries={stats.entries}, bytes={stats.bytes}, "
+            f"hits={stats.hits}, misses={stats.misses})"
+        )
+
+
+class IdentityCache(Generic[V]):
+    """A bounded cache of values derived from particular objects.
+
+    Entries are keyed by the ``id()`` of an object, for objects such as
+    piece dictionaries and sprite images that are not hashable or are too
+    costly to compare. Each entry holds the object itself, so its id cannot
+    be reused by another object while the entry is alive; the object
+    counts towards ``max_bytes`` for the same reason.
+
+    Example:
+        ```python
+        masks = IdentityCache(max_entries=64)
+        alphas = masks.get(piece_images)
+        if alphas is None:
+            alphas = {piece: image.getchannel("A") for piece, image in piece_images.items()}
+            masks.put(piece_images, alphas)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = sizeof_value,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: The maximum number of entries, or None for no limit.
+            max_bytes: The maximum approximate size of all entries, objects
+                included, in bytes, or None for no limit.
+            sizeof: A function estimating the size of a value in bytes.
+        """
+        self._entries: LRUCache[Tuple[Any, V]] = LRUCache(max_entries, max_bytes, sizeof)
+
+    @property
+    def max_entries(self) -> Optional[int]:
+        return self._entries.max_entries
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._entries.max_bytes
+
+    def get(self, obj: Any, key: Hashable = None) -> Optional[V]:
+        """Look up the value stored for an object.
+
+        Args:
+            obj: The object the value was derived from.
+            key: Optional further key, for several values per object.
+
+        Returns:
+            The cached value, or None.
+        """
+        entry = self._entries.get((id(obj), key))
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+        return None
+
+    def put(self, obj: Any, value: V, key: Hashable = None) -> None:
+        """Store the value derived from an object.
+
+        Args:
+            obj: The object the value was derived from.
+            value: The value to store.
+            key: Optional further key, for several values per object.
+        """
+        self._entries.put((id(obj), key), (obj, value))
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache's counters.
+
+        Returns:
+            A CacheStats tuple.
+        """
+        return self._entries.stats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return (
+            f"IdentityCache(entries={stats.entries}, bytes={stats.bytes}, "
+            f"hits={stats.hits}, misses={stats.misses})"
+        )
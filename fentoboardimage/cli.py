@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""Command line renderer for bulk FEN, EPD and NDJSON input.
+
+Reads one position per line from a file or stdin, renders them with
+render_many(), optionally across worker processes, and writes numbered
+image files, a tar or zip stream, or length-prefixed images to stdout.
+Input is read and output written as rendering progresses, so arbitrarily
+long inputs run in constant memory.
+
+Each input line is one of:
+
+- a FEN string, or an EPD record, whose first field is the piece placement;
+- a JSON object with a "fen" key and optional "arrows", "flipped" and
+  "last_move" keys, as accepted by render_many();
+- blank, or a comment starting with "#", which is skipped.
+
+Output images are named after the number of their input line, e.g.
+``000042.png``. Lines that cannot be parsed or rendered are reported on
+stderr with their line number and skipped, and the exit status is then 1.
+
+Example:
+    ```
+    fentoboardimage puzzles.epd --pieces ./pieces --size 40 --workers 8 --output-dir out/
+    zcat games.fen.gz | fentoboardimage --pieces ./pieces --format webp --archive tar > boards.tar
+    ```
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from typing import IO, Any, BinaryIO, Callable, Deque, Dict, Iterator, Optional, Sequence, TextIO
+
+from PIL import Image, ImageColor
+
+from .atlas import load_pieces_atlas
+from .fen_parser import Position
+from .main import (
+    PieceImages,
+    _check_arrows,
+    _normalize_arrows,
+    _normalize_last_move,
+    load_arrows_folder,
+    load_pieces_folder,
+)
+from .parallel import RenderJob, render_many
+
+THEMES = {
+    "brown": ("#D18B47", "#FFCE9E"),
+    "green": ("#769656", "#EEEED2"),
+    "blue": ("#8CA2AD", "#DEE3E6"),
+    "gray": ("#909090", "#FFFEFE"),
+}
+"""Built-in board colors as (dark_color, light_color) pairs."""
+
+FORMATS = ("png", "webp", "jpeg")
+"""The image formats the command line renderer can write."""
+
+# Keys a JSON render spec may set, the per-job overrides of render_many()
+_SPEC_KEYS = frozenset(("fen", "arrows", "flipped", "last_move"))
+
+
+def _check_spec(spec: Dict[str, Any]) -> None:
+    """Check the per-job overrides of a render spec.
+
+    Arrows and the last move are resolved as fen_to_image() resolves them,
+    so a spec that passes renders without option errors.
+
+    Raises:
+        ValueError: If an override is malformed, names a square off the
+            board, or has an arrow fen_to_image cannot draw.
+    """
+    if not isinstance(spec.get("flipped", False), bool):
+        raise ValueError("Render spec 'flipped' must be true or false")
+    try:
+        arrows = _normalize_arrows(spec.get("arrows"), False) or []
+        last_move = _normalize_last_move(spec.get("last_move"), False)
+        squares = [square for arrow in arrows for square in arrow]
+        if last_move is not None:
+            squares += [last_move["before"], last_move["after"]]
+            for key in ("darkColor", "lightColor"):
+                ImageColor.getrgb(last_move[key])  # type: ignore
+        for x, y in squares:  # type: ignore
+            if not (0 <= x < 8 and 0 <= y < 8):
+                raise ValueError(f"Square {(x, y)} is off the board")
+    except (AttributeError, IndexError, KeyError, TypeError) as error:
+        raise ValueError(f"Malformed render spec: {error!r}") from error
+    _check_arrows(arrows)
+
+
+def _parse_line(line: str) -> Optional[RenderJob]:
+    """Turn one input line into a render job.
+
+    Args:
+        line: A FEN, EPD or JSON line.
+
+    Returns:
+        The job, or None for blank and comment lines.
+
+    Raises:
+        ValueError: If the line is not a valid position or render spec.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        spec = json.loads(line)
+        unknown = set(spec) - _SPEC_KEYS
+        if unknown:
+            raise ValueError(f"Unknown render spec keys: {', '.join(sorted(unknown))}")
+        if "fen" not in spec:
+            raise ValueError("Render spec has no 'fen' key")
+        if not isinstance(spec["fen"], str):
+            raise ValueError("Render spec 'fen' must be a string")
+        Position.from_fen(spec["fen"])
+        _check_spec(spec)
+        return spec
+    # The placement is the first field of both FEN and EPD lines
+    placement = line.split(None, 1)[0]
+    Position.from_fen(placement)
+    return placement
+
+
+def _read_jobs(
+    lines: TextIO,
+    line_numbers: Deque[int],
+    report: Callable[[str], None],
+) -> Iterator[RenderJob]:
+    """Yield the render jobs of an input stream, recording their line numbers."""
+    for number, line in enumerate(lines, 1):
+        try:
+            job = _parse_line(line)
+        except ValueError as error:
+            report(f"line {number}: {error}")
+            continue
+        if job is not None:
+            line_numbers.append(number)
+            yield job
+
+
+class _DirectoryWriter:
+    """Writes each image to a numbered file in a directory."""
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def write(self, name: str, data: bytes) -> None:
+        with open(os.path.join(self.directory, name), "wb") as f:
+            f.write(data)
+
+    def close(self) -> None:
+        pass
+
+
+class _TarWriter:
+    """Streams images into an uncompressed tar archive."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.archive = tarfile.open(fileobj=stream, mode="w|")
+        self.mtime = time.time()
+
+    def write(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = self.mtime
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class _ZipWriter:
+    """Streams images into a zip archive, stored without recompression."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.archive = zipfile.ZipFile(stream, "w", zipfile.ZIP_STORED)
+
+    def write(self, name: str, data: bytes) -> None:
+        self.archive.writestr(name, data)
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class _FrameWriter:
+    """Writes each image as a 4 byte big-endian length followed by its bytes."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+
+    def write(self, name: str, data: bytes) -> None:
+        self.stream.write(struct.pack(">I", len(data)))
+        self.stream.write(data)
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+def _load_pieces(path: str) -> Callable[[Image.Image], PieceImages]:
+    """Load a piece folder, or a piece atlas if ``path`` is a file."""
+    if os.path.isfile(path):
+        return load_pieces_atlas(path)
+    return load_pieces_folder(path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Render positions from the command line.
+
+    Args:
+        argv: Command line arguments, defaulting to ``sys.argv[1:]``.
+
+    Returns:
+        The exit status: 1 if any input line was skipped, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        prog="fentoboardimage",
+        description="Render chess positions from FEN, EPD or NDJSON lines.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("--pieces", required=True, help="piece folder, or a piece atlas PNG")
+    parser.add_argument("--arrows", help="arrow folder, for arrows in JSON render specs")
+    parser.add_argument("--theme", choices=sorted(THEMES), default="brown", help="board colors (default: %(default)s)")
+    parser.add_argument("--dark", help="dark square color, overriding the theme")
+    parser.add_argument("--light", help="light square color, overriding the theme")
+    parser.add_argument("--size", type=int, default=60, help="square length in pixels (default: %(default)s)")
+    parser.add_argument("--flip", action="store_true", help="render from black's perspective")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="image format (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: %(default)s)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--output-dir", help="write numbered image files to this directory")
+    output.add_argument(
+        "--archive",
+        choices=("tar", "zip"),
+        help="write an archive of numbered images to stdout",
+    )
+    args = parser.parse_args(argv)
+    if args.size < 1:
+        parser.error("--size must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    dark_color, light_color = THEMES[args.theme]
+    options: Dict[str, Any] = {
+        "square_length": args.size,
+        "piece_set": _load_pieces(args.pieces),
+        "dark_color": args.dark or dark_color,
+        "light_color": args.light or light_color,
+        "flipped": args.flip,
+        "workers": args.workers,
+        "format": args.format.upper(),
+    }
+    if args.arrows is not None:
+        options["arrow_set"] = load_arrows_folder(args.arrows)
+
+    errors = []
+
+    def report(message: str) -> None:
+        errors.append(message)
+        print(message, file=sys.stderr)
+
+    def render_failed(index: int, error: Exception) -> None:
+        report(f"line {line_numbers.popleft()}: {error}")
+
+    stdout = sys.stdout.buffer
+    if args.output_dir is not None:
+        writer: Any = _DirectoryWriter(args.output_dir)
+    elif args.archive == "tar":
+        writer = _TarWriter(stdout)
+    elif args.archive == "zip":
+        writer = _ZipWriter(stdout)
+    else:
+        writer = _FrameWriter(stdout)
+
+    lines: IO[str] = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    line_numbers: Deque[int] = deque()
+    try:
+        jobs = _read_jobs(lines, line_numbers, report)
+        for data in render_many(jobs, on_error=render_failed, **options):
+            writer.write(f"{line_numbers.popleft():06d}.{args.format}", data)
+    finally:
+        writer.close()
+        if lines is not sys.stdin:
+            lines.close()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
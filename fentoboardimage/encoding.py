@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""Encoding rendered boards straight to image bytes.
+
+This module provides functions that render a position and return the
+encoded PNG or WebP bytes, with encoder settings tuned for board images.
+
+Example:
+    ```python
+    from fentoboardimage import fen_to_png_bytes, load_pieces_folder
+
+    png = fen_to_png_bytes(
+        fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        square_length=60,
+        piece_set=load_pieces_folder("./pieces"),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+        palette=True,
+    )
+    ```
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from PIL import Image
+
+from .fen_parser import Position
+from .instrumentation import Instrumentation, get_instrumentation, span
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    fen_to_image,
+)
+from .render_cache import RenderCache, render_key
+
+# Pillow 9.1 moved the quantization constants into enums
+_FAST_OCTREE = Image.Quantize.FASTOCTREE if hasattr(Image, "Quantize") else Image.FASTOCTREE  # type: ignore
+_NO_DITHER = Image.Dither.NONE if hasattr(Image, "Dither") else Image.NONE  # type: ignore
+
+
+def quantize_board(image: Image.Image, colors: int = 256) -> Image.Image:
+    """Convert a rendered board to a palette image.
+
+    Boards are mostly flat square colors with anti-aliased piece edges, so
+    a 256 color palette without dithering is usually visually lossless and
+    encodes to a much smaller PNG.
+
+    Args:
+        image: The rendered board, in RGB or RGBA mode.
+        colors: The maximum number of palette entries (2-256).
+
+    Returns:
+        The board as a "P" mode image.
+    """
+    return image.quantize(colors=colors, method=_FAST_OCTREE, dither=_NO_DITHER)
+
+
+def encode_image(
+    image: Image.Image,
+    format: str = "PNG",
+    palette: bool = False,
+    colors: int = 256,
+    instrumentation: Optional[Instrumentation] = None,
+    piece_count: Optional[int] = None,
+    arrow_count: int = 0,
+    **params: Any,
+) -> bytes:
+    """Encode an image to bytes.
+
+    The image is written in its current mode; no RGB/RGBA round trip is
+    made unless ``palette`` asks for quantization.
+
+    Args:
+        image: The PIL Image to encode.
+        format: A Pillow format name such as "PNG" or "WEBP".
+        palette: Quantize to a palette image before encoding.
+        colors: The maximum number of palette entries when ``palette`` is set.
+        instrumentation: Optional Instrumentation receiving the "encode"
+            phase. Defaults to the one registered with set_instrumentation().
+        piece_count: The number of pieces on the board, reported with the
+            "encode" phase, or None if not known.
+        arrow_count: The number of arrows drawn, reported with the "encode"
+            phase.
+        **params: Extra keyword arguments passed to Image.save(), such as
+            ``compress_level`` for PNG or ``lossless`` for WebP.
+
+    Returns:
+        The encoded image.
+    """
+    if instrumentation is None:
+        instrumentation = get_instrumentation()
+    with span(instrumentation, "encode", image.width // 8, piece_count, arrow_count):
+        if palette:
+            image = quantize_board(image, colors)
+        buffer = io.BytesIO()
+        image.save(buffer, format, **params)
+        return buffer.getvalue()
+
+
+def _encode_render(
+    image: Image.Image,
+    render_options: Mapping[str, Any],
+    format: str,
+    encode_params: Mapping[str, Any],
+) -> bytes:
+    """Encode a rendered position, reporting its piece and arrow counts.
+
+    The FEN is only parsed again for the piece count when an instrumentation
+    will receive it.
+
+    Args:
+        image: The rendered board.
+        render_options: The fen_to_image() options it was rendered with.
+        format: A Pillow format name such as "PNG" or "WEBP".
+        encode_params: Keyword arguments for encode_image().
+
+    Returns:
+        The encoded image.
+    """
+    piece_count = None
+    if encode_params.get("instrumentation") is not None or get_instrumentation() is not None:
+        piece_count = Position.from_fen(render_options["fen"]).piece_count()
+    arrows = render_options.get("arrows")
+    return encode_image(
+        image,
+        format,
+        piece_count=piece_count,
+        arrow_count=len(arrows) if arrows else 0,
+        **encode_params,
+    )
+
+
+def _render_bytes(
+    render_options: Dict[str, Any],
+    format: str,
+    encode_params: Dict[str, Any],
+    cache: Optional[RenderCache],
+) -> bytes:
+    """Render and encode a position, going through a render cache if given.
+
+    Args:
+        render_options: Keyword arguments for fen_to_image().
+        format: A Pillow format name such as "PNG" or "WEBP".
+        encode_params: Keyword arguments for encode_image().
+        cache: An optional render cache.
+
+    Returns:
+        The encoded image.
+    """
+    key = None
+    if cache is not None:
+        key = render_key(format=format, encode_params=encode_params, **render_options)
+        if key is not None:
+            data = cache.get(key)
+            if data is not None:
+                return data
+    data = _encode_render(fen_to_image(**render_options), render_options, format, encode_params)
+    if key is not None:
+        cache.put(key, data)  # type: ignore
+    return data
+
+
+def fen_to_png_bytes(
+    fen: str,
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    compress_level: int = 6,
+    palette: bool = False,
+    colors: int = 256,
+    optimize: bool = False,
+    cache: Optional[RenderCache] = None,
+) -> bytes:
+    """Render a position and return it as PNG bytes.
+
+    Accepts the same rendering options as fen_to_image.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        compress_level: zlib compression level from 0 (fastest) to 9
+            (smallest). Defaults to 6.
+        palette: Write a palette PNG with at most ``colors`` colors.
+            Several times smaller than RGB for typical boards.
+        colors: The maximum number of palette entries when ``palette`` is set.
+        optimize: Let the encoder search for the smallest output.
+            Much slower, and overrides ``compress_level``.
+        cache: Optional MemoryRenderCache or DiskRenderCache. Repeated
+            requests for the same render return the cached bytes.
+
+    Returns:
+        The encoded PNG.
+    """
+    render_options = {
+        "fen": fen,
+        "square_length": square_length,
+        "piece_set": piece_set,
+        "dark_color": dark_color,
+        "light_color": light_color,
+        "arrow_set": arrow_set,
+        "arrows": arrows,
+        "flipped": flipped,
+        "last_move": last_move,
+        "coordinates": coordinates,
+    }
+    encode_params = {
+        "palette": palette,
+        "colors": colors,
+        "compress_level": compress_level,
+        "optimize": optimize,
+    }
+    return _render_bytes(render_options, "PNG", encode_params, cache)
+
+
+def fen_to_webp_bytes(
+    fen: str,
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    lossless: bool = True,
+    quality: int = 80,
+    method: int = 4,
+    cache: Optional[RenderCache] = None,
+) -> bytes:
+    """Render a position and return it as WebP bytes.
+
+    Accepts the same rendering options as fen_to_image.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        lossless: Encode losslessly. Defaults to True.
+        quality: For lossy encoding, the quality from 0 to 100. For
+            lossless encoding, the compression effort.
+        method: Encoder speed/size trade-off from 0 (fast) to 6 (small).
+        cache: Optional MemoryRenderCache or DiskRenderCache. Repeated
+            requests for the same render return the cached bytes.
+
+    Returns:
+        The encoded WebP image.
+
+    Raises:
+        KeyError: If Pillow was built without WebP support.
+    """
+    render_options = {
+        "fen": fen,
+        "square_length": square_length,
+        "piece_set": piece_set,
+        "dark_color": dark_color,
+        "light_color": light_color,
+        "arrow_set": arrow_set,
+        "arrows": arrows,
+        "flipped": flipped,
+        "last_move": last_move,
+        "coordinates": coordinates,
+    }
+    encode_params = {"lossless": lossless, "quality": quality, "method": method}
+    return _render_bytes(render_options, "WEBP", encode_params, cache)
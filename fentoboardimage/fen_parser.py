@@ -2,7 +2,8 @@
 """FEN string parser for chess positions.
 
 This module provides the FenParser class for parsing FEN (Forsyth-Edwards Notation)
-strings into board representations that can be used for rendering chess positions.
+strings into board representations that can be used for rendering chess positions,
+and the compact Position type used by the renderer.
 
 Example:
     ```python
@@ -16,7 +17,8 @@ Example:
 
 from __future__ import annotations
 
-from typing import List
+import re
+from typing import Iterator, List, Tuple
 
 # Valid piece characters (faster set lookup than regex)
 _PIECES = frozenset('kqbnrpKQBNRP')
@@ -33,6 +35,130 @@ _SPACES = {
     '8': [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
 }
 
+# Digit expansions for Position.from_fen(); str.replace is several times
+# faster than a translate table with multi-character values
+_DIGIT_SPACES = tuple((str(n), " " * n) for n in range(1, 9))
+_VALID_PLACEMENT = re.compile(r"(?:[kqbnrpKQBNRP ]{8}/){7}[kqbnrpKQBNRP ]{8}")
+
+_EMPTY = ord(" ")
+
+
+class Position:
+    """A compact, immutable piece placement.
+
+    The board is stored as 64 bytes, one ASCII piece character per square
+    (a space for an empty square), in FEN order: index 0 is a8 and index 63
+    is h1. Positions are hashable and compare equal when their pieces match,
+    so they can be used in cache keys and sets.
+
+    Attributes:
+        board: The 64 square bytes.
+
+    Example:
+        ```python
+        position = Position.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        position[4, 4]  # Square e4
+        # Output: 'P'
+        position.flipped()[3, 3]  # The same square, seen from black's side
+        # Output: 'P'
+        ```
+    """
+
+    __slots__ = ("board",)
+
+    def __init__(self, board: bytes) -> None:
+        """Initialize a position from its square bytes.
+
+        Args:
+            board: 64 bytes in FEN order, as produced by from_fen().
+
+        Raises:
+            ValueError: If ``board`` is not 64 bytes long.
+        """
+        if len(board) != 64:
+            raise ValueError(f"A position has 64 squares, got {len(board)}")
+        self.board: bytes = bytes(board)
+
+    @classmethod
+    def from_fen(cls, fen: str) -> Position:
+        """Parse the piece placement field of a FEN string.
+
+        Args:
+            fen: A FEN string, or just its piece placement field.
+
+        Returns:
+            The parsed position.
+
+        Raises:
+            ValueError: If the placement does not describe eight ranks of
+                eight squares or contains characters other than pieces,
+                digits and slashes.
+        """
+        placement = fen.split(" ", 1)[0]
+        expanded = placement
+        for digit, spaces in _DIGIT_SPACES:
+            if digit in expanded:
+                expanded = expanded.replace(digit, spaces)
+        if _VALID_PLACEMENT.fullmatch(expanded) is None:
+            raise ValueError(f"Invalid FEN piece placement: {placement!r}")
+        position = cls.__new__(cls)
+        position.board = expanded.replace("/", "").encode("ascii")
+        return position
+
+    def __getitem__(self, square: Tuple[int, int]) -> str:
+        """Return the piece on an (x, y) square, or a space if it is empty."""
+        x, y = square
+        return chr(self.board[y * 8 + x])
+
+    def flipped(self) -> Position:
+        """Return the position rotated to black's perspective.
+
+        Square (x, y) moves to (7 - x, 7 - y), which reverses the board.
+        """
+        position = Position.__new__(Position)
+        position.board = self.board[::-1]
+        return position
+
+    def pieces(self) -> Iterator[Tuple[Tuple[int, int], str]]:
+        """Iterate over the occupied squares.
+
+        Yields:
+            ((x, y), piece) for each occupied square, in FEN order.
+        """
+        for index, value in enumerate(self.board):
+            if value != _EMPTY:
+                yield (index & 7, index >> 3), chr(value)
+
+    def piece_count(self) -> int:
+        """Return the number of occupied squares."""
+        return 64 - self.board.count(_EMPTY)
+
+    def placement(self) -> str:
+        """Return the piece placement field of the FEN for this position."""
+        ranks = []
+        for start in range(0, 64, 8):
+            rank = self.board[start:start + 8].decode("ascii")
+            for n in range(8, 0, -1):
+                rank = rank.replace(" " * n, str(n))
+            ranks.append(rank)
+        return "/".join(ranks)
+
+    def to_list(self) -> List[List[str]]:
+        """Return the board in the nested list form of FenParser.parse()."""
+        squares = self.board.decode("ascii")
+        return [list(squares[start:start + 8]) for start in range(0, 64, 8)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.board == other.board
+
+    def __hash__(self) -> int:
+        return hash(self.board)
+
+    def __repr__(self) -> str:
+        return f"Position({self.placement()!r})"
+
 
 class FenParser:
     """Parses FEN strings into board representations.
@@ -92,6 +218,19 @@ class FenParser:
         board_str = self.fen_str.split(" ", 1)[0]
         return [self._parse_rank(rank) for rank in board_str.split("/")]
 
+    def position(self) -> Position:
+        """Parse the FEN string into a compact Position.
+
+        Unlike parse(), this validates the piece placement.
+
+        Returns:
+            The parsed position.
+
+        Raises:
+            ValueError: If the piece placement is malformed.
+        """
+        return Position.from_fen(self.fen_str)
+
     def _parse_rank(self, rank: str) -> List[str]:
         """Parse a single rank from FEN notation (optimized single-pass).
 
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""Rendering consecutive positions of a game.
+
+Consecutive positions in a game differ by only a few squares. GameRenderer
+keeps the previous frame and repaints only the squares whose contents
+changed, instead of repainting the whole board for every ply.
+
+Example:
+    ```python
+    from fentoboardimage import GameRenderer, load_pieces_folder, positions_from_uci
+
+    renderer = GameRenderer(60, load_pieces_folder("./pieces"), "#D18B47", "#FFCE9E")
+    for ply, (fen, (before, after)) in enumerate(positions_from_uci(moves)):
+        move = {"before": before, "after": after, "darkColor": "#aaa23a", "lightColor": "#cdd26a"}
+        frame = renderer.render(fen, last_move=move)
+        frame.save(f"ply_{ply:03}.png")
+    ```
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .fen_parser import Position
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    BoardPosition,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    _coordinate_layer,
+    _draw_coordinates,
+    _find_piece_alphas,
+    _is_light_square,
+    _normalize_arrows,
+    _normalize_last_move,
+    checker_board_template,
+    indices_to_square,
+    paint_all_arrows,
+    square_to_indices,
+)
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+"""The FEN of the standard starting position."""
+
+# Castling right lost when a piece moves from or to each corner square
+_CORNER_RIGHTS = {56: "Q", 63: "K", 0: "q", 7: "k"}
+
+# Two on-board squares and an optional promotion piece
+_UCI_MOVE = re.compile(r"[a-h][1-8][a-h][1-8][qrbnQRBN]?")
+
+
+def positions_from_uci(
+    moves: Iterable[str],
+    start_fen: str = STARTING_FEN,
+) -> Iterator[Tuple[str, Tuple[str, str]]]:
+    """Play a sequence of UCI moves and yield the resulting positions.
+
+    Moves are applied without checking that they are legal. Castling (the
+    king moving two files), en passant captures and promotions are handled,
+    and the castling, en passant and move counter fields are kept up to date.
+
+    Args:
+        moves: Moves in UCI long algebraic notation, e.g. "e2e4" or "e7e8q".
+        start_fen: The position before the first move.
+
+    Yields:
+        A (fen, (from_square, to_square)) tuple after each move. The squares
+        can be used as the "before" and "after" of a last move highlight.
+
+    Raises:
+        ValueError: If a move is malformed, names a square off the board or
+            an invalid promotion piece, or its from-square is empty.
+
+    Example:
+        ```python
+        for fen, (before, after) in positions_from_uci(["e2e4", "c7c5"]):
+            print(fen)
+        ```
+    """
+    fields = start_fen.split()
+    board = bytearray(Position.from_fen(start_fen).board)
+    side = fields[1] if len(fields) > 1 else "w"
+    castling = fields[2] if len(fields) > 2 else "-"
+    halfmove = int(fields[4]) if len(fields) > 4 else 0
+    fullmove = int(fields[5]) if len(fields) > 5 else 1
+    empty = ord(" ")
+
+    for move in moves:
+        if _UCI_MOVE.fullmatch(move) is None:
+            raise ValueError(f"Invalid UCI move: {move!r}")
+        from_x, from_y = square_to_indices(move[:2])
+        to_x, to_y = square_to_indices(move[2:4])
+        origin = from_y * 8 + from_x
+        target = to_y * 8 + to_x
+        piece = chr(board[origin])
+        if piece == " ":
+            raise ValueError(f"No piece on {move[:2]} for move {move!r}")
+        captured = board[target] != empty
+        is_pawn = piece in "Pp"
+
+        if is_pawn and from_x != to_x and not captured:
+            # En passant: the captured pawn sits beside the moving pawn
+            board[from_y * 8 + to_x] = empty
+            captured = True
+        if piece in "Kk" and abs(to_x - from_x) == 2:
+            rook = from_y * 8 + (7 if to_x > from_x else 0)
+            board[(origin + target) // 2] = board[rook]
+            board[rook] = empty
+        board[target] = board[origin]
+        board[origin] = empty
+        if len(move) == 5:
+            promoted = move[4].upper() if piece.isupper() else move[4].lower()
+            board[target] = ord(promoted)
+
+        if piece == "K":
+            castling = castling.replace("K", "").replace("Q", "")
+        elif piece == "k":
+            castling = castling.replace("k", "").replace("q", "")
+        for corner in (origin, target):
+            if corner in _CORNER_RIGHTS:
+                castling = castling.replace(_CORNER_RIGHTS[corner], "")
+        castling = castling or "-"
+        en_passant = "-"
+        if is_pawn and abs(to_y - from_y) == 2:
+            en_passant = indices_to_square((from_x, (from_y + to_y) // 2))
+        halfmove = 0 if is_pawn or captured else halfmove + 1
+        if side == "b":
+            fullmove += 1
+        side = "b" if side == "w" else "w"
+
+        placement = Position(bytes(board)).placement()
+        yield f"{placement} {side} {castling} {en_passant} {halfmove} {fullmove}", (move[:2], move[2:4])
+
+
+class GameRenderer:
+    """Renders a sequence of positions, repainting only changed squares.
+
+    The renderer keeps a clean frame with the checkerboard, coordinates and
+    pieces of the previous position. For each new position it diffs the
+    parsed boards and repaints only the squares that changed. The last move
+    highlight and arrows are overlays: they are applied to a copy of the
+    clean frame, so they never have to be erased from it.
+
+    Frames are identical to fen_to_image output with the same options.
+
+    Attributes:
+        square_length: The length of each square in pixels.
+        flipped: Whether boards are rendered from black's perspective.
+        repainted: Number of squares repainted by the last render() call.
+    """
+
+    def __init__(
+        self,
+        square_length: int,
+        piece_set: Callable[[Image.Image], PieceImages],
+        dark_color: str,
+        light_color: str,
+        arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+        flipped: bool = False,
+        coordinates: Optional[Coordinates] = None,
+    ) -> None:
+        """Initialize the renderer and paint the empty board.
+
+        Args:
+            square_length: The length of each square in pixels.
+            piece_set: A piece loader function from load_pieces_folder().
+            dark_color: The color for dark squares as a hex string.
+            light_color: The color for light squares as a hex string.
+            arrow_set: Optional arrow loader function from load_arrows_folder().
+            flipped: If True, render the boards from black's perspective.
+            coordinates: Optional configuration for drawing coordinates.
+        """
+        self.square_length = square_length
+        self.flipped = flipped
+        self.repainted = 0
+        self._coordinates = coordinates
+        self._background = checker_board_template(square_length, dark_color, light_color).copy()
+        # Coordinate masks by the square they were cut from
+        self._coordinate_masks: Dict[BoardPosition, Tuple[BoardPosition, Image.Image]] = {}
+        if coordinates is not None:
+            _draw_coordinates(self._background, coordinates, square_length)
+            for corner, mask in _coordinate_layer(coordinates, square_length):
+                square = (corner[0] // square_length, corner[1] // square_length)
+                self._coordinate_masks[square] = (corner, mask)
+        self._piece_images = piece_set(self._background)
+        self._piece_alphas = _find_piece_alphas(self._piece_images)
+        self._arrow_images: Optional[ArrowImages] = None
+        if arrow_set is not None:
+            self._arrow_images = arrow_set(self._background)
+        self._clean: Optional[Image.Image] = None
+        self._position: Optional[Position] = None
+
+    def reset(self) -> None:
+        """Forget the previous frame, so the next render paints every square."""
+        self._clean = None
+        self._position = None
+
+    def render(
+        self,
+        fen: str,
+        last_move: Optional[LastMove] = None,
+        arrows: Optional[List[ArrowInput]] = None,
+    ) -> Image.Image:
+        """Render the next position.
+
+        Args:
+            fen: A FEN string representing the chess position.
+            last_move: Optional dictionary for highlighting the last move.
+            arrows: Optional list of arrows to draw. Ignored if the renderer
+                has no arrow set.
+
+        Returns:
+            A new PIL Image of the rendered chess position.
+        """
+        position = Position.from_fen(fen)
+        if self.flipped:
+            position = position.flipped()
+
+        if self._clean is None or self._position is None:
+            self._clean = self._background.copy()
+            changed = range(64)
+        else:
+            previous = self._position.board
+            board = position.board
+            changed = [index for index in range(64) if board[index] != previous[index]]
+        for index in changed:
+            self._paint_square(self._clean, (index & 7, index >> 3), position)
+        self._position = position
+        self.repainted = len(changed)
+
+        frame = self._clean.copy()
+        move = _normalize_last_move(last_move, self.flipped)
+        if move is not None:
+            for key in ("before", "after"):
+                square: BoardPosition = move[key]  # type: ignore
+                color = move["lightColor"] if _is_light_square(square) else move["darkColor"]
+                self._paint_square(frame, square, position, color)
+        if self._arrow_images is not None and arrows:
+            normalized = _normalize_arrows(arrows, self.flipped)
+            frame = paint_all_arrows(frame, normalized, self._arrow_images)  # type: ignore
+        return frame
+
+    def _paint_square(
+        self,
+        board: Image.Image,
+        square: BoardPosition,
+        position: Position,
+        highlight: Optional[str] = None,
+    ) -> None:
+        """Repaint one square: background, coordinate labels and piece.
+
+        Args:
+            board: The PIL Image to paint on.
+            square: The (x, y) board coordinates of the square.
+            position: The position holding the square's piece.
+            highlight: Optional color replacing the square's background.
+        """
+        length = self.square_length
+        x, y = square
+        box = (x * length, y * length, (x + 1) * length, (y + 1) * length)
+        if highlight is None:
+            tile = self._background.crop(box)
+        else:
+            tile = Image.new("RGB", (length, length), highlight)
+            coordinate_mask = self._coordinate_masks.get(square)
+            if coordinate_mask is not None:
+                # The same mask piece used for the background
+                (left, top), mask = coordinate_mask
+                tile.paste(self._coordinates["dark_color"], (left - box[0], top - box[1]), mask)  # type: ignore
+        piece = position[x, y]
+        if piece != " ":
+            image = self._piece_images[piece]
+            if self._piece_alphas is not None and piece in self._piece_alphas:
+                alpha = self._piece_alphas[piece]
+            else:
+                alpha = image.getchannel("A")
+            tile.paste(image, (0, 0), alpha)
+        board.paste(tile, box)
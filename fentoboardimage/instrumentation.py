@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""Timing and tracing hooks for the phases of a render.
+
+An Instrumentation object receives a start and an end event for each phase
+of a render, such as parsing the FEN, resolving piece images or painting
+arrows. Pass one to fen_to_image() or fen_to_images(), or register a global
+one with set_instrumentation() to also cover renders made through other
+functions, such as fen_to_png_bytes().
+
+Example:
+    ```python
+    from fentoboardimage import PhaseTimer, fen_to_image, load_pieces_folder
+
+    timer = PhaseTimer()
+    fen_to_image(fen, 60, load_pieces_folder("./pieces"), "#D18B47", "#FFCE9E", instrumentation=timer)
+    print(timer.totals())
+    # Output: {'parse': 4.1e-06, 'checkerboard': 2.3e-05, 'piece_resolve': 0.0011, ...}
+    ```
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from typing import ContextManager, Dict, List, NamedTuple, Optional, Tuple
+
+PHASES = (
+    "parse",
+    "checkerboard",
+    "last_move",
+    "coordinates",
+    "piece_resolve",
+    "arrow_resolve",
+    "piece_paint",
+    "arrow_paint",
+    "encode",
+)
+"""The render phases, in the order they usually run."""
+
+
+class RenderEvent(NamedTuple):
+    """A render phase reported to an Instrumentation.
+
+    Attributes:
+        phase: One of PHASES.
+        square_length: The length of each square in pixels.
+        piece_count: The number of pieces on the board, or None where it is
+            not known: before the FEN is parsed, and for the shared
+            background phases of fen_to_images().
+        arrow_count: The number of arrows drawn.
+    """
+
+    phase: str
+    square_length: int
+    piece_count: Optional[int]
+    arrow_count: int
+
+
+class Instrumentation:
+    """Receives an event at the start and end of each render phase.
+
+    The default methods do nothing; subclass and override them. Phases
+    that do not apply to a render, such as coordinates when none are
+    configured, are not reported. The end event is also sent when the
+    phase raises.
+    """
+
+    def start(self, event: RenderEvent) -> None:
+        """Called when a phase starts.
+
+        Args:
+            event: The phase and the size of the render.
+        """
+
+    def end(self, event: RenderEvent, seconds: float) -> None:
+        """Called when a phase ends.
+
+        Args:
+            event: The same event passed to start().
+            seconds: The wall time the phase took.
+        """
+
+
+class PhaseTimer(Instrumentation):
+    """Instrumentation that records the duration of every phase.
+
+    Safe to share between threads.
+
+    Attributes:
+        records: A list of (event, seconds) pairs in the order phases ended.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty timer."""
+        self.records: List[Tuple[RenderEvent, float]] = []
+        self._lock = threading.Lock()
+
+    def end(self, event: RenderEvent, seconds: float) -> None:
+        with self._lock:
+            self.records.append((event, seconds))
+
+    def totals(self) -> Dict[str, float]:
+        """Return the total seconds spent in each phase, in PHASES order."""
+        totals = dict.fromkeys(PHASES, 0.0)
+        with self._lock:
+            for event, seconds in self.records:
+                totals[event.phase] += seconds
+        return {phase: seconds for phase, seconds in totals.items() if seconds}
+
+    def clear(self) -> None:
+        """Forget every recorded phase."""
+        with self._lock:
+            self.records.clear()
+
+
+_global_instrumentation: Optional[Instrumentation] = None
+
+
+def set_instrumentation(instrumentation: Optional[Instrumentation]) -> Optional[Instrumentation]:
+    """Register the instrumentation used by renders that are not given one.
+
+    Args:
+        instrumentation: The instrumentation to register, or None to remove it.
+
+    Returns:
+        The previously registered instrumentation, so it can be restored.
+    """
+    global _global_instrumentation
+    previous = _global_instrumentation
+    _global_instrumentation = instrumentation
+    return previous
+
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    """Return the instrumentation registered with set_instrumentation()."""
+    return _global_instrumentation
+
+
+class _Span:
+    """Context manager reporting one phase to an Instrumentation."""
+
+    __slots__ = ("instrumentation", "event", "started")
+
+    def __init__(self, instrumentation: Instrumentation, event: RenderEvent) -> None:
+        self.instrumentation = instrumentation
+        self.event = event
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.instrumentation.start(self.event)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.instrumentation.end(self.event, time.perf_counter() - self.started)
+
+
+# Returned by span() when nothing is listening; nullcontext is reusable
+_NO_SPAN: ContextManager[None] = contextlib.nullcontext()
+
+
+def span(
+    instrumentation: Optional[Instrumentation],
+    phase: str,
+    square_length: int,
+    piece_count: Optional[int] = None,
+    arrow_count: int = 0,
+) -> ContextManager[None]:
+    """Return a context manager that reports a phase.
+
+    Args:
+        instrumentation: Where to report the phase, or None to report nothing.
+        phase: One of PHASES.
+        square_length: The length of each square in pixels.
+        piece_count: The number of pieces, if known.
+        arrow_count: The number of arrows.
+
+    Returns:
+        A context manager timing its body.
+    """
+    if instrumentation is None:
+        return _NO_SPAN
+    return _Span(instrumentation, RenderEvent(phase, square_length, piece_count, arrow_count))
@@ -23,12 +23,16 @@ Example:
 
 from __future__ import annotations
 
+import functools
 import math
 import os
 from typing import (
     Any,
     Callable,
+    ContextManager,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -38,7 +42,9 @@ from typing import (
 
 from PIL import Image, ImageDraw, ImageFont
 
-from .fen_parser import FenParser
+from .cache import CacheStats, IdentityCache, LazyImageMap, LRUCache
+from .fen_parser import Position
+from .instrumentation import Instrumentation, get_instrumentation, span
 
 # Type aliases for better readability
 FontLoaderWithSize = Callable[[int], Union[ImageFont.ImageFont, ImageFont.FreeTypeFont]]
@@ -326,25 +332,154 @@ def paint_checker_board(
             )
 
     if last_move is not None:
-        before = last_move["before"]
-        after = last_move["after"]
-        before_color = last_move["lightColor"] if _is_light_square(before) else last_move["darkColor"]  # type: ignore
-        after_color = last_move["lightColor"] if _is_light_square(after) else last_move["darkColor"]  # type: ignore
+        board = paint_last_move(board, last_move)
 
-        # Highlight last move squares
-        bx, by = before[0] * square_size, before[1] * square_size  # type: ignore
-        ax, ay = after[0] * square_size, after[1] * square_size  # type: ignore
-        draw.rectangle([(bx, by), (bx + square_size - 1, by + square_size - 1)], before_color)
-        draw.rectangle([(ax, ay), (ax + square_size - 1, ay + square_size - 1)], after_color)
+    return board
+
+
+def paint_last_move(
+    board: Image.Image,
+    last_move: LastMove,
+) -> Image.Image:
+    """Highlight the squares of the last move on a painted checkerboard.
+
+    Args:
+        board: The PIL Image of the board to paint on.
+        last_move: Dictionary containing last move highlighting info, with
+            'before' and 'after' given as board indices.
+
+    Returns:
+        The modified board image with the last move highlighted.
+    """
+    square_size: float = board.size[0] / 8
+    draw = ImageDraw.Draw(board)
+    before = last_move["before"]
+    after = last_move["after"]
+    before_color = last_move["lightColor"] if _is_light_square(before) else last_move["darkColor"]  # type: ignore
+    after_color = last_move["lightColor"] if _is_light_square(after) else last_move["darkColor"]  # type: ignore
+
+    # Highlight last move squares
+    bx, by = before[0] * square_size, before[1] * square_size  # type: ignore
+    ax, ay = after[0] * square_size, after[1] * square_size  # type: ignore
+    draw.rectangle([(bx, by), (bx + square_size - 1, by + square_size - 1)], before_color)
+    draw.rectangle([(ax, ay), (ax + square_size - 1, ay + square_size - 1)], after_color)
 
     return board
 
 
-# Module-level caches for piece and arrow images
-piece_cache: Dict[str, PieceImages] = {}
-resized_cache: Dict[str, PieceImages] = {}
+# Maximum number of empty checkerboards kept by checker_board_template()
+CHECKER_BOARD_CACHE_SIZE = 16
+
+# LRU cache of empty checkerboards keyed by (square_length, dark_color, light_color)
+_checker_board_cache: LRUCache[Image.Image] = LRUCache(max_entries=CHECKER_BOARD_CACHE_SIZE)
+
+
+def checker_board_template(
+    square_length: int,
+    dark_color: str,
+    light_color: str,
+) -> Image.Image:
+    """Return a pre-rendered empty checkerboard.
+
+    Boards are painted once per (square_length, dark_color, light_color)
+    and kept in a small LRU cache holding at most CHECKER_BOARD_CACHE_SIZE
+    boards. The returned image is shared, so copy() it before painting.
+
+    Args:
+        square_length: The length of each square in pixels.
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+
+    Returns:
+        The cached PIL Image of the empty checkerboard.
+
+    Example:
+        ```python
+        board = checker_board_template(100, "#D18B47", "#FFCE9E").copy()
+        ```
+    """
+
+    def paint() -> Image.Image:
+        template = Image.new("RGB", (square_length * 8, square_length * 8), light_color)
+        return paint_checker_board(template, dark_color)
+
+    return _checker_board_cache.get_or_create((square_length, dark_color, light_color), paint)
+
+
+# Module-level caches for piece images, keyed by path and (path, board size)
+piece_cache: LRUCache[PieceImages] = LRUCache(max_entries=32)
+resized_cache: LRUCache[PieceImages] = LRUCache(max_entries=64, max_bytes=128 * 1024 * 1024)
 # Cache for pre-extracted alpha channels (avoids repeated image.split() calls)
-alpha_cache: Dict[str, Dict[str, Image.Image]] = {}
+# per resized piece dictionary. Entries count the dictionary they keep alive,
+# so pieces evicted from resized_cache stay within a byte limit.
+alpha_cache: IdentityCache[Dict[str, Image.Image]] = IdentityCache(
+    max_entries=64, max_bytes=160 * 1024 * 1024
+)
+
+
+class _PieceSetLoader:
+    """Piece loader returned by load_pieces_folder().
+
+    Resizes the loaded piece images to the square size of a board. This is a
+    class rather than a closure so that piece sets can be pickled and sent to
+    worker processes, which reload the images from ``path``.
+
+    The resized images and their alpha channels are LazyImageMaps, so each
+    piece is only decoded, resized and split when a board uses it.
+    """
+
+    __slots__ = ("path", "cache", "piece_images")
+
+    def __init__(self, path: str, cache: bool, piece_images: PieceImages) -> None:
+        self.path = path
+        self.cache = cache
+        self.piece_images = piece_images
+
+    def __call__(self, board: Image.Image) -> PieceImages:
+        cache_key = (self.path, board.size[0])
+        cached = resized_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        else:
+            piece_size = int(board.size[0] / 8)
+            sources = self.piece_images
+
+            def resize(piece: str) -> Image.Image:
+                return sources[piece].resize((piece_size, piece_size))
+
+            resized: PieceImages = LazyImageMap(  # type: ignore
+                {piece: functools.partial(resize, piece) for piece in sources},
+                nbytes=len(sources) * piece_size * piece_size * 4,
+            )
+            # Alpha channels are extracted once per piece, so pastes never
+            # have to split() the piece images
+            alphas = LazyImageMap(
+                {piece: functools.partial(_alpha_channel, resized, piece) for piece in sources},
+                nbytes=len(sources) * piece_size * piece_size,
+            )
+            if self.cache:
+                resized_cache.put(cache_key, resized)
+                alpha_cache.put(resized, alphas)
+            return resized
+
+    @property
+    def cache_key(self) -> Tuple[str, str]:
+        """A stable identity for this piece set, used in render cache keys."""
+        return ("pieces", os.path.abspath(self.path))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (load_pieces_folder, (self.path, self.cache))
+
+
+def _alpha_channel(images: PieceImages, piece: str) -> Image.Image:
+    """Extract the alpha channel of one piece image."""
+    return images[piece].getchannel("A")
+
+
+def _decode_piece(path: str) -> Image.Image:
+    """Decode a piece image file as RGBA."""
+    with Image.open(path) as image:
+        return image.convert("RGBA")
 
 
 def load_pieces_folder(
@@ -354,7 +489,9 @@ def load_pieces_folder(
     """Load chess piece images from a folder.
 
     Loads piece images from the specified folder structure and returns
-    a function that can resize them for a specific board size.
+    a function that can resize them for a specific board size. Images are
+    decoded and resized on first use, so a board only pays for the piece
+    types it contains.
 
     The folder must have the following structure::
 
@@ -390,9 +527,8 @@ def load_pieces_folder(
         king_image = piece_images["K"]  # White king
         ```
     """
-    if path in piece_cache:
-        piece_images = piece_cache[path]
-    else:
+    piece_images = piece_cache.get(path)
+    if piece_images is None:
         white_path = os.path.join(path, "white")
         black_path = os.path.join(path, "black")
 
@@ -402,42 +538,27 @@ def load_pieces_folder(
         def b_path(piece: str) -> str:
             return os.path.join(black_path, piece + ".png")
 
-        piece_images: PieceImages = {
-            "p": Image.open(b_path("Pawn")).convert("RGBA"),
-            "P": Image.open(w_path("Pawn")).convert("RGBA"),
-            "r": Image.open(b_path("Rook")).convert("RGBA"),
-            "R": Image.open(w_path("Rook")).convert("RGBA"),
-            "n": Image.open(b_path("Knight")).convert("RGBA"),
-            "N": Image.open(w_path("Knight")).convert("RGBA"),
-            "b": Image.open(b_path("Bishop")).convert("RGBA"),
-            "B": Image.open(w_path("Bishop")).convert("RGBA"),
-            "q": Image.open(b_path("Queen")).convert("RGBA"),
-            "Q": Image.open(w_path("Queen")).convert("RGBA"),
-            "k": Image.open(b_path("King")).convert("RGBA"),
-            "K": Image.open(w_path("King")).convert("RGBA"),
+        files = {
+            "p": b_path("Pawn"),
+            "P": w_path("Pawn"),
+            "r": b_path("Rook"),
+            "R": w_path("Rook"),
+            "n": b_path("Knight"),
+            "N": w_path("Knight"),
+            "b": b_path("Bishop"),
+            "B": w_path("Bishop"),
+            "q": b_path("Queen"),
+            "Q": w_path("Queen"),
+            "k": b_path("King"),
+            "K": w_path("King"),
         }
+        piece_images = LazyImageMap(  # type: ignore
+            {piece: functools.partial(_decode_piece, file) for piece, file in files.items()}
+        )
         if cache:
-            piece_cache[path] = piece_images
+            piece_cache.put(path, piece_images)
 
-    def load(board: Image.Image) -> PieceImages:
-        cache_key = f"{path}-{board.size[0]}"
-        if cache_key in resized_cache:
-            return resized_cache[cache_key]
-        else:
-            piece_size = int(board.size[0] / 8)
-            resized: PieceImages = {}
-            alphas: Dict[str, Image.Image] = {}
-            for piece in piece_images:
-                resized_img = piece_images[piece].resize((piece_size, piece_size))
-                resized[piece] = resized_img
-                # Pre-extract alpha channel to avoid repeated split() calls
-                _, _, _, alphas[piece] = resized_img.split()
-            if cache:
-                resized_cache[cache_key] = resized
-                alpha_cache[cache_key] = alphas
-            return resized
-
-    return load
+    return _PieceSetLoader(path, cache, piece_images)
 
 
 def paint_piece(
@@ -473,91 +594,84 @@ def paint_piece(
 
 def paint_all_pieces(
     board: Image.Image,
-    parsed: List[List[str]],
+    parsed: Union[Position, List[List[str]]],
     piece_images: PieceImages,
     piece_alphas: Optional[Dict[str, Image.Image]] = None,
+    origin: BoardPosition = (0, 0),
+    square_length: Optional[int] = None,
 ) -> Image.Image:
     """Paint all pieces from a parsed FEN position onto the board.
 
     Args:
         board: The PIL Image of the board to paint on.
-        parsed: A 2D list of piece characters from FenParser.parse().
+        parsed: A Position, or a 2D list of piece characters from
+            FenParser.parse().
         piece_images: A dictionary mapping piece characters to PIL Images.
         piece_alphas: Optional pre-extracted alpha channels for efficiency.
+        origin: The pixel position of the board's top left corner, for
+            painting a board that is part of a larger image.
+        square_length: The length of each square in pixels. Defaults to
+            an eighth of the image width.
 
     Returns:
         The modified board image with all pieces painted.
     """
     height, width = board.size
-    piece_size = int(width / 8)
+    piece_size = int(width / 8) if square_length is None else square_length
+    left, top = origin
 
-    for y in range(len(parsed)):
-        for x in range(len(parsed[y])):
-            piece = parsed[y][x]
-            if piece != " ":
-                image = piece_images[piece]
-                # Use cached alpha if available, otherwise extract it
-                if piece_alphas is not None and piece in piece_alphas:
-                    alpha = piece_alphas[piece]
-                else:
-                    _, _, _, alpha = image.split()
-                box = (x * piece_size, y * piece_size,
-                       (x + 1) * piece_size, (y + 1) * piece_size)
-                board.paste(image, box, alpha)
+    if isinstance(parsed, Position):
+        occupied: Iterable[Tuple[BoardPosition, str]] = parsed.pieces()
+    else:
+        occupied = (
+            ((x, y), piece)
+            for y, row in enumerate(parsed)
+            for x, piece in enumerate(row)
+            if piece != " "
+        )
+    for (x, y), piece in occupied:
+        image = piece_images[piece]
+        # Use cached alpha if available, otherwise extract it
+        if piece_alphas is not None and piece in piece_alphas:
+            alpha = piece_alphas[piece]
+        else:
+            _, _, _, alpha = image.split()
+        box = (left + x * piece_size, top + y * piece_size,
+               left + (x + 1) * piece_size, top + (y + 1) * piece_size)
+        board.paste(image, box, alpha)
     return board
 
 
-# Module-level caches for arrow images
-arrows_cache: Dict[str, ArrowImages] = {}
-resized_arrows_cache: Dict[str, ArrowImages] = {}
-
-
-def load_arrows_folder(
-    path: str,
-    cache: bool = True,
-) -> Callable[[Image.Image], ArrowImages]:
-    """Load arrow images from a folder.
+# Module-level caches for arrow images, keyed by path and (path, board size)
+arrows_cache: LRUCache[ArrowImages] = LRUCache(max_entries=32)
+resized_arrows_cache: LRUCache[ArrowImages] = LRUCache(max_entries=64, max_bytes=128 * 1024 * 1024)
 
-    Loads arrow sprite images for drawing arrows on the board.
-    The folder must contain Knight.png and Up.png files.
 
-    Args:
-        path: Path to the folder containing arrow images.
-        cache: Whether to cache loaded images for reuse. Defaults to True.
+class _ArrowSetLoader:
+    """Arrow loader returned by load_arrows_folder().
 
-    Returns:
-        A function that takes a board image and returns a dictionary
-        of appropriately sized arrow images.
-
-    Example:
-        ```python
-        arrows = load_arrows_folder("./arrows")
-        board = Image.new("RGB", (800, 800), "white")
-        arrow_images = arrows(board)
-        ```
+    Resizes the loaded arrow sprites to the square size of a board. Like
+    _PieceSetLoader, it pickles by reloading the sprites from ``path``.
     """
-    if path in arrows_cache:
-        arrows = arrows_cache[path]
-    else:
 
-        def arrow_path(name: str) -> str:
-            return os.path.join(path, name + ".png")
+    __slots__ = ("path", "cache", "arrows")
 
-        arrows: ArrowImages = {
-            "one": Image.open(arrow_path("Knight")).convert("RGBA"),
-            "up": Image.open(arrow_path("Up")).convert("RGBA"),
-        }
+    def __init__(self, path: str, cache: bool, arrows: ArrowImages) -> None:
+        self.path = path
+        self.cache = cache
+        self.arrows = arrows
 
-    def load(board: Image.Image) -> ArrowImages:
-        cache_key = f"{path}-{board.size[0]}"
-        if cache_key in resized_arrows_cache:
-            return resized_arrows_cache[cache_key]
+    def __call__(self, board: Image.Image) -> ArrowImages:
+        cache_key = (self.path, board.size[0])
+        cached = resized_arrows_cache.get(cache_key)
+        if cached is not None:
+            return cached
         else:
             square_size = int(board.size[0] / 8)
             resized: ArrowImages = {}
-            base_one = arrows["one"].resize((square_size * 3, square_size * 2))
+            base_one = self.arrows["one"].resize((square_size * 3, square_size * 2))
             resized["one"] = base_one
-            resized["up"] = arrows["up"].resize((square_size, square_size * 3))
+            resized["up"] = self.arrows["up"].resize((square_size, square_size * 3))
 
             # Pre-compute all 8 knight arrow variants with alpha channels
             # This avoids repeated transpose() and split() calls in paint_all_arrows
@@ -581,15 +695,63 @@ def load_arrows_folder(
             )
             resized["knight_-2_-1"] = base_one
 
-            if cache:
-                resized_arrows_cache[cache_key] = resized
+            if self.cache:
+                resized_arrows_cache.put(cache_key, resized)
             return resized
 
-    return load
+    @property
+    def cache_key(self) -> Tuple[str, str]:
+        """A stable identity for this arrow set, used in render cache keys."""
+        return ("arrows", os.path.abspath(self.path))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (load_arrows_folder, (self.path, self.cache))
+
+
+def load_arrows_folder(
+    path: str,
+    cache: bool = True,
+) -> Callable[[Image.Image], ArrowImages]:
+    """Load arrow images from a folder.
 
+    Loads arrow sprite images for drawing arrows on the board.
+    The folder must contain Knight.png and Up.png files.
 
-# Cache for generated arrows by (arrow_id, length, piece_size)
-_generated_arrow_cache: Dict[Tuple[int, float, int], Image.Image] = {}
+    Args:
+        path: Path to the folder containing arrow images.
+        cache: Whether to cache loaded images for reuse. Defaults to True.
+
+    Returns:
+        A function that takes a board image and returns a dictionary
+        of appropriately sized arrow images.
+
+    Example:
+        ```python
+        arrows = load_arrows_folder("./arrows")
+        board = Image.new("RGB", (800, 800), "white")
+        arrow_images = arrows(board)
+        ```
+    """
+    arrows = arrows_cache.get(path)
+    if arrows is None:
+
+        def arrow_path(name: str) -> str:
+            return os.path.join(path, name + ".png")
+
+        arrows: ArrowImages = {
+            "one": Image.open(arrow_path("Knight")).convert("RGBA"),
+            "up": Image.open(arrow_path("Up")).convert("RGBA"),
+        }
+        if cache:
+            arrows_cache.put(path, arrows)
+
+    return _ArrowSetLoader(path, cache, arrows)
+
+
+# Cache for generated arrows by source arrow, length and piece_size
+_generated_arrow_cache: IdentityCache[Image.Image] = IdentityCache(
+    max_entries=256, max_bytes=64 * 1024 * 1024
+)
 
 
 def _generate_arrow(
@@ -610,10 +772,9 @@ def _generate_arrow(
     Returns:
         A PIL Image of the generated arrow.
     """
-    # Use arrow's id as cache key component (same arrow object = same cache)
-    cache_key = (id(arrow), length, piece_size)
-    if cache_key in _generated_arrow_cache:
-        return _generated_arrow_cache[cache_key]
+    cached = _generated_arrow_cache.get(arrow, (length, piece_size))
+    if cached is not None:
+        return cached
 
     image = arrow
     resized = Image.new("RGBA", (piece_size, int(piece_size * length)))
@@ -627,10 +788,58 @@ def _generate_arrow(
         body = body.resize((piece_size, int(piece_size * (length - 2))))
         resized.paste(body, (0, piece_size))
 
-    _generated_arrow_cache[cache_key] = resized
+    _generated_arrow_cache.put(arrow, resized, (length, piece_size))
     return resized
 
 
+def clear_caches() -> None:
+    """Clear every module-level image cache.
+
+    Drops loaded and resized piece and arrow images, generated arrows and
+    checkerboard templates, and resets their hit and miss counters.
+    Loaders that were already created keep their source images.
+    """
+    for cache in _caches().values():
+        cache.clear()
+
+
+def cache_stats() -> Dict[str, CacheStats]:
+    """Return hit, miss and size counters for every module-level cache.
+
+    Returns:
+        A dictionary mapping cache names to CacheStats snapshots.
+
+    Example:
+        ```python
+        stats = cache_stats()
+        print(stats["resized_cache"].hits, stats["resized_cache"].bytes)
+        ```
+    """
+    return {name: cache.stats() for name, cache in _caches().items()}
+
+
+# Caches defined by optional modules, such as the NumPy engine, add
+# themselves here so clear_caches() and cache_stats() include them
+_registered_caches: Dict[str, Union[LRUCache[Any], IdentityCache[Any]]] = {}
+
+
+def _caches() -> Dict[str, Union[LRUCache[Any], IdentityCache[Any]]]:
+    """Return the module-level caches by name."""
+    return {
+        **_registered_caches,
+        "piece_cache": piece_cache,
+        "resized_cache": resized_cache,
+        "alpha_cache": alpha_cache,
+        "arrows_cache": arrows_cache,
+        "resized_arrows_cache": resized_arrows_cache,
+        "generated_arrow_cache": _generated_arrow_cache,
+        "arrow_sprite_cache": _arrow_sprite_cache,
+        "checker_board_cache": _checker_board_cache,
+        "font_cache": font_cache,
+        "coordinate_layer_cache": coordinate_layer_cache,
+    }
+
+
 Arrow = Tuple[BoardPosition, BoardPosition]
 """A tuple of (start, end) board positions representing an arrow."""
 
@@ -638,6 +847,178 @@ ArrowInput = Union[Tuple[str, str], Tuple[BoardPosition, BoardPosition], List[An
 """Arrow input can be algebraic notation strings or board position tuples."""
 
 
+# Deltas drawn with the pre-rotated knight sprites of an arrow set
+_KNIGHT_DELTAS = frozenset(
+    [(-2, 1), (-1, 2), (1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1)]
+)
+
+# Rotation applied to the 45 degree diagonal arrow for each (dx, dy) sign
+_DIAGONAL_TRANSPOSE = {
+    (1, 1): Image.ROTATE_180,
+    (1, -1): Image.ROTATE_270,
+    (-1, 1): Image.ROTATE_90,
+}
+
+# Finished straight and diagonal arrow sprites by up sprite, delta and
+# piece_size
+_arrow_sprite_cache: IdentityCache[Image.Image] = IdentityCache(
+    max_entries=512, max_bytes=64 * 1024 * 1024
+)
+
+
+def _finished_arrow(
+    arrow_set: ArrowImages,
+    delta: BoardPosition,
+    piece_size: int,
+) -> Optional[Image.Image]:
+    """Return the sprite that draws an arrow spanning ``delta`` squares.
+
+    Straight and diagonal arrows are generated, rotated and cached, so an
+    arrow of a given direction and length is only built once per arrow set
+    and square size.
+
+    Args:
+        arrow_set: A dictionary of arrow images from load_arrows_folder.
+        delta: The (x, y) distance from the start to the end square.
+        piece_size: The size of one square in pixels.
+
+    Returns:
+        The RGBA sprite, or None if no arrow can span ``delta``.
+    """
+    if delta in _KNIGHT_DELTAS:
+        return arrow_set[f"knight_{delta[0]}_{delta[1]}"]
+    up = arrow_set["up"]
+    cached = _arrow_sprite_cache.get(up, (delta, piece_size))
+    if cached is not None:
+        return cached
+
+    delta_x, delta_y = delta
+    if delta_x == 0:
+        image = _generate_arrow(up, abs(delta_y) + 1, piece_size)
+        if delta_y > 0:
+            image = image.transpose(Image.ROTATE_180)
+    elif delta_y == 0:
+        image = _generate_arrow(up, abs(delta_x) + 1, piece_size).transpose(Image.ROTATE_270)
+        if delta_x < 0:
+            image = image.transpose(Image.ROTATE_180)
+    elif abs(delta_x) == abs(delta_y):
+        length = math.sqrt((abs(delta_x) + 0.5) ** 2 + (abs(delta_y) + 0.5) ** 2)
+        image = _generate_arrow(up, length, piece_size).rotate(45, expand=True)
+        transpose = _DIAGONAL_TRANSPOSE.get((1 if delta_x > 0 else -1, 1 if delta_y > 0 else -1))
+        if transpose is not None:
+            image = image.transpose(transpose)
+    else:
+        return None
+    _arrow_sprite_cache.put(up, image, (delta, piece_size))
+    return image
+
+
+def _arrow_sprites(
+    board_width: int,
+    arrow_configuration: List[Arrow],
+    arrow_set: ArrowImages,
+) -> List[Tuple[Image.Image, BoardPosition]]:
+    """Resolve arrows to the sprites that draw them.
+
+    Args:
+        board_width: The width of the board in pixels.
+        arrow_configuration: A list of (start, end) position tuples.
+        arrow_set: A dictionary of arrow images from load_arrows_folder.
+
+    Returns:
+        An RGBA sprite and the pixel position of its top left corner for
+        each arrow, in drawing order.
+
+    Raises:
+        ValueError: If an arrow has an invalid start/end combination.
+    """
+    piece_size = int(board_width / 8)
+    sprites: List[Tuple[Image.Image, BoardPosition]] = []
+    for start, end in arrow_configuration:
+        delta = (end[0] - start[0], end[1] - start[1])
+        image = _finished_arrow(arrow_set, delta, piece_size)
+        if image is None:
+            raise ValueError(
+                f"Invalid arrow target: start({start}) end({end})"
+            )
+        # Every sprite starts at the top left of the box spanned by the
+        # start and end squares
+        corner = (min(start[0], end[0]) * piece_size, min(start[1], end[1]) * piece_size)
+        sprites.append((image, corner))
+    return sprites
+
+
+def _check_arrows(arrow_configuration: List[Arrow]) -> None:
+    """Check that every arrow can be drawn.
+
+    Arrows must be knight moves or straight or diagonal lines, the shapes
+    the arrow sprites of an arrow set can draw.
+
+    Args:
+        arrow_configuration: A list of (start, end) position tuples.
+
+    Raises:
+        ValueError: If an arrow has an invalid start/end combination.
+    """
+    for start, end in arrow_configuration:
+        delta_x, delta_y = end[0] - start[0], end[1] - start[1]
+        if (
+            (delta_x, delta_y) not in _KNIGHT_DELTAS
+            and delta_x != 0
+            and delta_y != 0
+            and abs(delta_x) != abs(delta_y)
+        ):
+            raise ValueError(f"Invalid arrow target: start({start}) end({end})")
+
+
+def _arrow_overlay(
+    sprites: List[Tuple[Image.Image, BoardPosition]],
+    rows: Optional[Tuple[int, int]] = None,
+) -> Optional[Tuple[Image.Image, BoardPosition]]:
+    """Accumulate arrow sprites into a single RGBA overlay.
+
+    The overlay covers the union of the sprites, so it can be composited
+    onto the board with one paste however many arrows there are.
+
+    Args:
+        sprites: RGBA sprites and their top left corners, in drawing order.
+        rows: Optional (top, bottom) range of board rows. Only the part of
+            the overlay within these rows is built; pasting it gives the
+            same pixels as pasting the whole overlay.
+
+    Returns:
+        The overlay and its top left corner, or None if there are no sprites
+        (within ``rows``).
+    """
+    if not sprites:
+        return None
+    if len(sprites) == 1 and rows is None:
+        return sprites[0]
+    if rows is not None:
+        top, bottom = rows
+        clipped = [
+            (
+                image.crop((0, max(top - y, 0), image.width, min(bottom - y, image.height))),
+                (x, max(y, top)),
+            )
+            for image, (x, y) in sprites
+            if y < bottom and y + image.height > top
+        ]
+        if not clipped:
+            return None
+        if len(sprites) == 1:
+            return clipped[0]
+        sprites = clipped
+    left = min(x for _, (x, _) in sprites)
+    top = min(y for _, (_, y) in sprites)
+    right = max(x + image.width for image, (x, _) in sprites)
+    bottom = max(y + image.height for image, (_, y) in sprites)
+    overlay = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    for image, (x, y) in sprites:
+        overlay.alpha_composite(image, (x - left, y - top))
+    return overlay, (left, top)
+
+
 def paint_all_arrows(
     board: Image.Image,
     arrow_configuration: List[Arrow],
@@ -646,7 +1027,8 @@ def paint_all_arrows(
     """Paint all arrows on the board.
 
     Supports knight-move arrows, straight arrows (horizontal, vertical),
-    and diagonal arrows of any length.
+    and diagonal arrows of any length. The arrows are accumulated into one
+    overlay, which is composited onto the board once.
 
     Args:
         board: The PIL Image of the board to paint on.
@@ -659,86 +1041,11 @@ def paint_all_arrows(
     Raises:
         ValueError: If an arrow has an invalid start/end combination.
     """
-    height, width = board.size
-    piece_size = int(width / 8)
-
-    def position(val: int) -> int:
-        return int(val * piece_size)
-
-    # Knight move cache keys: maps delta to (cache_key, use_target_x, use_target_y)
-    # Boolean flags indicate whether to use target coords instead of start coords
-    knight_deltas = {
-        (-2, 1): ("knight_-2_1", True, False),
-        (-1, 2): ("knight_-1_2", True, False),
-        (1, 2): ("knight_1_2", False, False),
-        (2, 1): ("knight_2_1", False, False),
-        (2, -1): ("knight_2_-1", False, True),
-        (1, -2): ("knight_1_-2", False, True),
-        (-1, -2): ("knight_-1_-2", True, True),
-        (-2, -1): ("knight_-2_-1", True, True),
-    }
-
-    for arrow in arrow_configuration:
-        start = arrow[0]
-        end = arrow[1]
-        delta = (end[0] - start[0], end[1] - start[1])
-        start_x = position(start[0])
-        start_y = position(start[1])
-        target_x = position(end[0])
-        target_y = position(end[1])
-
-        if delta in knight_deltas:
-            # Use pre-computed knight arrow variant
-            cache_key, use_target_x, use_target_y = knight_deltas[delta]
-            paste_x = target_x if use_target_x else start_x
-            paste_y = target_y if use_target_y else start_y
-            image = arrow_set[cache_key]
-            _, _, _, alpha = image.split()
-            Image.Image.paste(board, image, (paste_x, paste_y), alpha)
-        elif delta[0] == 0:
-            image = _generate_arrow(arrow_set["up"], abs(delta[1]) + 1, piece_size)
-            if delta[1] > 0:
-                image = image.transpose(Image.ROTATE_180)
-                _, _, _, alpha = image.split()
-                Image.Image.paste(board, image, (start_x, start_y), alpha)
-            else:
-                _, _, _, alpha = image.split()
-                Image.Image.paste(board, image, (target_x, target_y), alpha)
-        elif delta[1] == 0:
-            image = _generate_arrow(
-                arrow_set["up"], abs(delta[0]) + 1, piece_size
-            ).transpose(Image.ROTATE_270)
-            if delta[0] < 0:
-                image = image.transpose(Image.ROTATE_180)
-                _, _, _, alpha = image.split()
-                Image.Image.paste(board, image, (target_x, target_y), alpha)
-            else:
-                _, _, _, alpha = image.split()
-                Image.Image.paste(board, image, (start_x, start_y), alpha)
-        elif abs(delta[0]) == abs(delta[1]):
-            length = math.sqrt((abs(delta[0]) + 0.5) ** 2 + (abs(delta[1]) + 0.5) ** 2)
-            arrow_img = _generate_arrow(arrow_set["up"], length, piece_size).rotate(
-                45, expand=True
-            )
-            if delta[0] > 0 and delta[1] > 0:
-                arrow_img = arrow_img.transpose(Image.ROTATE_180)
-                _, _, _, alpha = arrow_img.split()
-                Image.Image.paste(board, arrow_img, (start_x, start_y), alpha)
-            elif delta[0] > 0 and delta[1] < 0:
-                arrow_img = arrow_img.transpose(Image.ROTATE_270)
-                _, _, _, alpha = arrow_img.split()
-                Image.Image.paste(board, arrow_img, (start_x, target_y), alpha)
-            elif delta[0] < 0 and delta[1] > 0:
-                arrow_img = arrow_img.transpose(Image.ROTATE_90)
-                _, _, _, alpha = arrow_img.split()
-                Image.Image.paste(board, arrow_img, (target_x, start_y), alpha)
-            elif delta[0] < 0 and delta[1] < 0:
-                _, _, _, alpha = arrow_img.split()
-                Image.Image.paste(board, arrow_img, (target_x, target_y), alpha)
-        else:
-            raise ValueError(
-                f"Invalid arrow target: start({start}) end({end})"
-            )
+    overlay = _arrow_overlay(_arrow_sprites(board.size[0], arrow_configuration, arrow_set))
+    if overlay is not None:
+        image, corner = overlay
+        # An RGBA mask uses its alpha band, without splitting the image
+        board.paste(image, corner, image)
     return board
 
 
@@ -828,6 +1135,39 @@ def paint_coordinates_inside_board(
     return board
 
 
+# Loaded fonts keyed by (path, size)
+font_cache: LRUCache[FontType] = LRUCache(max_entries=64)
+
+
+class _FontFileLoader:
+    """Font loader returned by load_font_file().
+
+    A picklable callable that loads the font at a given size. Fonts are
+    cached per size, so the file is only parsed once per size.
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, size: int) -> FontType:
+        def load() -> FontType:
+            if ".ttf" in self.path:
+                return ImageFont.truetype(self.path, size=size)
+            return ImageFont.load(self.path)
+
+        return font_cache.get_or_create((self.path, size), load)
+
+    @property
+    def cache_key(self) -> Tuple[str, str]:
+        """A stable identity for this font, used in render cache keys."""
+        return ("font", os.path.abspath(self.path))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (load_font_file, (self.path,))
+
+
 def load_font_file(path: str) -> FontLoaderWithSize:
     """Load a font file for use with coordinates.
 
@@ -844,12 +1184,405 @@ def load_font_file(path: str) -> FontLoaderWithSize:
         >>> font = font_loader(24)  # Get font at size 24
     """
 
-    def loader(size: int) -> FontType:
-        if ".ttf" in path:
-            return ImageFont.truetype(path, size=size)
-        return ImageFont.load(path)
+    return _FontFileLoader(path)
+
 
-    return loader
+def _normalize_last_move(
+    last_move: Optional[LastMove],
+    flipped: bool,
+) -> Optional[LastMove]:
+    """Resolve a last move configuration to board indices.
+
+    Algebraic squares are converted to indices and flipped for black's
+    perspective. A new dictionary is returned, the caller's is left untouched.
+
+    Args:
+        last_move: The last move configuration passed by the caller.
+        flipped: Whether the board is rendered from black's perspective.
+
+    Returns:
+        The normalized last move configuration, or None.
+    """
+    if last_move is None:
+        return None
+    normalized: LastMove = dict(last_move)  # type: ignore
+    for key in ("before", "after"):
+        square = normalized[key]  # type: ignore
+        if isinstance(square, str):
+            square = square_to_indices(square)
+        if flipped:
+            square = flip_coord_tuple(square)  # type: ignore
+        normalized[key] = square  # type: ignore
+    return normalized
+
+
+def _normalize_arrows(
+    arrows: Optional[List[ArrowInput]],
+    flipped: bool,
+) -> Optional[List[Arrow]]:
+    """Resolve arrow inputs to (start, end) board index tuples.
+
+    Args:
+        arrows: The arrows passed by the caller, in algebraic notation or indices.
+        flipped: Whether the board is rendered from black's perspective.
+
+    Returns:
+        A new list of arrows as board index tuples, or None.
+    """
+    if arrows is None:
+        return None
+    normalized: List[Arrow] = []
+    for arrow in arrows:
+        start, end = arrow[0], arrow[1]
+        if isinstance(start, str):
+            start = square_to_indices(start)
+        if isinstance(end, str):
+            end = square_to_indices(end)
+        if flipped:
+            start, end = flip_coord_tuple(start), flip_coord_tuple(end)
+        normalized.append((start, end))
+    return normalized
+
+
+def _layout_coordinates(
+    coordinates: Coordinates,
+    square_length: float,
+) -> Tuple[FontType, List[Tuple[BoardPosition, CoordinateFnReturnType]]]:
+    """Load the coordinate font and place every coordinate label.
+
+    Args:
+        coordinates: The coordinate configuration.
+        square_length: The length of each square in pixels, or in points
+            for PDF output, where it need not be a whole number.
+
+    Returns:
+        The font, and a list of (square, label) pairs where square is the
+        board index the position function was called for.
+    """
+    size = 1 if coordinates["size"] is None else coordinates["size"]
+    font = coordinates["font"](size)
+    labels: List[Tuple[BoardPosition, CoordinateFnReturnType]] = []
+    for x in range(0, 8):
+        for y in range(0, 8):
+            coord_str = indices_to_square((x, y))
+            text_objects = coordinates["position_fn"](
+                coord_str,
+                (x * square_length, y * square_length),
+                square_length,
+                font,
+            )
+            if text_objects is not None:
+                for text in text_objects:
+                    labels.append(((x, y), text))
+    return font, labels
+
+
+CoordinateLayer = List[Tuple[Tuple[int, int], Image.Image]]
+"""Coordinate text as alpha masks and the board position of their corners."""
+
+# Pre-rendered coordinate text masks, keyed by font, size, position
+# function and square length
+coordinate_layer_cache: LRUCache[CoordinateLayer] = LRUCache(
+    max_entries=64, max_bytes=32 * 1024 * 1024
+)
+
+
+def _coordinate_layer(coordinates: Coordinates, square_length: int) -> CoordinateLayer:
+    """Render every coordinate label into cached alpha masks.
+
+    The labels are drawn in white on a black "L" image, which gives the
+    same coverage values as drawing them in color, so pasting the text
+    color through the mask matches drawing the labels onto the board.
+    The mask is split into one piece per square, each cropped to its
+    text, so compositing only touches pixels near the labels.
+
+    Args:
+        coordinates: The coordinate configuration.
+        square_length: The length of each square in pixels.
+
+    Returns:
+        The non-empty mask pieces and their top left corners on the board.
+    """
+    font_loader = coordinates["font"]
+    cache_key = (
+        # Loaders without a stable key are keyed by the object itself,
+        # which keeps it alive while the entry exists
+        getattr(font_loader, "cache_key", font_loader),
+        coordinates["size"],
+        coordinates["position_fn"],
+        square_length,
+    )
+
+    def render() -> CoordinateLayer:
+        mask = Image.new("L", (square_length * 8, square_length * 8), 0)
+        draw = ImageDraw.Draw(mask)
+        font, labels = _layout_coordinates(coordinates, square_length)
+        for _, text in labels:
+            draw.text(text["coordinate"], text["text"], font=font, fill=255)
+        layer: CoordinateLayer = []
+        for y in range(8):
+            for x in range(8):
+                left, top = x * square_length, y * square_length
+                tile = mask.crop((left, top, left + square_length, top + square_length))
+                box = tile.getbbox()
+                if box is not None:
+                    layer.append(((left + box[0], top + box[1]), tile.crop(box)))
+        return layer
+
+    return coordinate_layer_cache.get_or_create(cache_key, render)
+
+
+def _draw_coordinates(
+    board: Image.Image,
+    coordinates: Coordinates,
+    square_length: int,
+) -> Image.Image:
+    """Draw coordinate text onto the board.
+
+    Args:
+        board: The PIL Image of the board to draw on.
+        coordinates: The coordinate configuration.
+        square_length: The length of each square in pixels.
+
+    Returns:
+        The modified board image.
+    """
+    color = coordinates["dark_color"]
+    for corner, mask in _coordinate_layer(coordinates, square_length):
+        board.paste(color, corner, mask)
+    return board
+
+
+def _find_piece_alphas(piece_images: PieceImages) -> Optional[Dict[str, Image.Image]]:
+    """Find the pre-extracted alpha channels for a resized piece set.
+
+    Args:
+        piece_images: A dictionary returned by a piece loader.
+
+    Returns:
+        The cached alpha channels, or None if the set was not cached.
+    """
+    return alpha_cache.get(piece_images)
+
+
+ENGINES = ("pillow", "numpy")
+"""The compositing engines accepted by fen_to_image()."""
+
+
+class _PreparedRender:
+    """Assets and background resolved once for rendering many positions.
+
+    Holds everything in a render that does not depend on the piece
+    placement: the painted checkerboard (with last move and coordinates),
+    the resized piece and arrow images, and the normalized arrows.
+    """
+
+    __slots__ = (
+        "background",
+        "owns_background",
+        "piece_images",
+        "piece_alphas",
+        "arrow_images",
+        "arrow_overlay",
+        "arrows",
+        "flipped",
+        "composite",
+        "composite_sprites",
+        "background_array",
+        "square_length",
+        "arrow_count",
+        "instrumentation",
+    )
+
+    def __init__(
+        self,
+        square_length: int,
+        piece_set: Callable[[Image.Image], PieceImages],
+        dark_color: str,
+        light_color: str,
+        arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+        arrows: Optional[List[ArrowInput]] = None,
+        flipped: bool = False,
+        last_move: Optional[LastMove] = None,
+        coordinates: Optional[Coordinates] = None,
+        engine: str = "pillow",
+        instrumentation: Optional[Instrumentation] = None,
+        piece_count: Optional[int] = None,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        self.square_length = square_length
+        self.arrow_count = len(arrows) if arrows else 0
+        self.instrumentation = instrumentation
+
+        def phase(name: str) -> ContextManager[None]:
+            return span(instrumentation, name, square_length, piece_count, self.arrow_count)
+
+        with phase("checkerboard"):
+            board = checker_board_template(square_length, dark_color, light_color)
+            # The shared template is only copied when something is drawn on
+            # it; render_into() can then paste it without a copy
+            self.owns_background = last_move is not None or coordinates is not None
+            if self.owns_background:
+                board = board.copy()
+        if last_move is not None:
+            with phase("last_move"):
+                board = paint_last_move(board, _normalize_last_move(last_move, flipped))  # type: ignore
+        if coordinates is not None:
+            with phase("coordinates"):
+                board = _draw_coordinates(board, coordinates, square_length)
+        self.background: Image.Image = board
+        with phase("piece_resolve"):
+            self.piece_images: PieceImages = piece_set(board)
+            self.piece_alphas = _find_piece_alphas(self.piece_images)
+        self.arrows = _normalize_arrows(arrows, flipped)
+        self.arrow_images: Optional[ArrowImages] = None
+        self.arrow_overlay: Optional[Tuple[Image.Image, BoardPosition]] = None
+        if arrow_set is not None and self.arrows is not None:
+            with phase("arrow_resolve"):
+                self.arrow_images = arrow_set(board)
+                # The arrows are the same for every position, so they are
+                # accumulated into one overlay up front
+                self.arrow_overlay = _arrow_overlay(
+                    _arrow_sprites(board.size[0], self.arrows, self.arrow_images)
+                )
+        self.flipped = flipped
+        self.composite: Optional[Callable[..., None]] = None
+        self.composite_sprites: Optional[Callable[..., None]] = None
+        self.background_array: Any = None
+        if engine == "numpy":
+            # Imported here because NumPy is optional
+            from .numpy_engine import board_array, composite_pieces, composite_sprites
+
+            self.composite = composite_pieces
+            self.composite_sprites = composite_sprites
+            self.background_array = board_array(board)
+
+    def render(self, fen: str, copy: bool = True) -> Image.Image:
+        """Render a single position on top of the prepared background.
+
+        Args:
+            fen: A FEN string representing the chess position.
+            copy: Paint on a copy of the background. Pass False only
+                when the background will not be used again.
+
+        Returns:
+            A PIL Image of the rendered chess position.
+        """
+        position = _parse_position(
+            fen, self.flipped, self.instrumentation, self.square_length, self.arrow_count
+        )
+        return self.render_position(position, copy)
+
+    def render_position(self, position: Position, copy: bool = True) -> Image.Image:
+        """Render an already parsed position; see render().
+
+        Args:
+            position: The pieces to paint, already flipped if needed.
+            copy: Paint on a copy of the background.
+
+        Returns:
+            A PIL Image of the rendered chess position.
+        """
+        instrumentation = self.instrumentation
+        piece_count = None
+        if instrumentation is not None:
+            piece_count = position.piece_count()
+
+        def phase(name: str) -> ContextManager[None]:
+            return span(instrumentation, name, self.square_length, piece_count, self.arrow_count)
+
+        overlay = self.arrow_overlay
+        if self.composite is not None:
+            # Imported here because NumPy is optional
+            import numpy as np
+
+            pixels = np.empty_like(self.background_array)
+            with phase("piece_paint"):
+                self.composite(pixels, self.background_array, position, self.piece_images)
+            if overlay is not None:
+                with phase("arrow_paint"):
+                    self.composite_sprites(pixels, [overlay])  # type: ignore
+            return Image.fromarray(pixels)
+        if copy or not self.owns_background:
+            board = self.background.copy()
+        else:
+            board = self.background
+        with phase("piece_paint"):
+            board = paint_all_pieces(board, position, self.piece_images, self.piece_alphas)
+        if overlay is not None:
+            with phase("arrow_paint"):
+                image, corner = overlay
+                board.paste(image, corner, image)
+        return board
+
+    def render_into(self, canvas: Any, origin: BoardPosition, position: Position) -> None:
+        """Paint a parsed position into part of a larger image.
+
+        Args:
+            canvas: An RGB or RGBA PIL Image, or a writable (H, W, 3) uint8
+                NumPy array.
+            origin: The pixel position of the board's top left corner.
+            position: The pieces to paint, already flipped if needed.
+
+        Raises:
+            ValueError: If the canvas has an unsupported mode or shape, or
+                the board does not fit inside it at ``origin``.
+        """
+        instrumentation = self.instrumentation
+        piece_count = None
+        if instrumentation is not None:
+            piece_count = position.piece_count()
+
+        def phase(name: str) -> ContextManager[None]:
+            return span(instrumentation, name, self.square_length, piece_count, self.arrow_count)
+
+        size = self.background.size[0]
+        left, top = origin
+        overlay = self.arrow_overlay
+        if not isinstance(canvas, Image.Image):
+            # Imported here because NumPy is optional
+            from .numpy_engine import board_array, canvas_region, composite_pieces, composite_sprites
+
+            region = canvas_region(canvas, origin, size)
+            if self.background_array is None:
+                self.background_array = board_array(self.background)
+            with phase("piece_paint"):
+                composite_pieces(region, self.background_array, position, self.piece_images)
+            if overlay is not None:
+                with phase("arrow_paint"):
+                    composite_sprites(region, [overlay])
+            return
+        if canvas.mode not in ("RGB", "RGBA"):
+            raise ValueError(f"Cannot render into a {canvas.mode} image, expected RGB or RGBA")
+        if left < 0 or top < 0 or left + size > canvas.width or top + size > canvas.height:
+            raise ValueError(
+                f"A {size}px board at {origin} does not fit in a {canvas.size} canvas"
+            )
+        canvas.paste(self.background, origin)
+        with phase("piece_paint"):
+            paint_all_pieces(
+                canvas, position, self.piece_images, self.piece_alphas, origin, self.square_length
+            )
+        if overlay is not None:
+            with phase("arrow_paint"):
+                image, corner = overlay
+                canvas.paste(image, (left + corner[0], top + corner[1]), image)
+
+
+def _parse_position(
+    fen: str,
+    flipped: bool,
+    instrumentation: Optional[Instrumentation],
+    square_length: int,
+    arrow_count: int,
+) -> Position:
+    """Parse a FEN into the Position to paint, reporting the parse phase."""
+    with span(instrumentation, "parse", square_length, None, arrow_count):
+        position = Position.from_fen(fen)
+        if flipped:
+            position = position.flipped()
+    return position
 
 
 def fen_to_image(
@@ -863,6 +1596,8 @@ def fen_to_image(
     flipped: bool = False,
     last_move: Optional[LastMove] = None,
     coordinates: Optional[Coordinates] = None,
+    engine: str = "pillow",
+    instrumentation: Optional[Instrumentation] = None,
 ) -> Image.Image:
     """Generate a chess board image from a FEN string.
 
@@ -886,10 +1621,20 @@ def fen_to_image(
         last_move: Optional dictionary for highlighting the last move.
             Should contain 'before', 'after', 'darkColor', and 'lightColor' keys.
         coordinates: Optional configuration for drawing coordinates on the board.
+        engine: "pillow" pastes pieces and arrows one at a time. "numpy"
+            blends them with NumPy (an optional dependency) and produces
+            identical output.
+        instrumentation: Optional Instrumentation receiving a start and end
+            event for each render phase. Defaults to the one registered
+            with set_instrumentation(), if any.
 
     Returns:
         A PIL Image of the rendered chess position.
 
+    Raises:
+        ValueError: If the piece placement field of ``fen`` is malformed or
+            ``engine`` is unknown.
+
     Example:
         Basic usage:
 
@@ -924,77 +1669,166 @@ def fen_to_image(
         )
         ```
     """
-    board = Image.new("RGB", (square_length * 8, square_length * 8), light_color)
-    parsed_board = FenParser(fen).parse()
+    if instrumentation is None:
+        instrumentation = get_instrumentation()
+    # Parse first, so every later phase can report the piece count
+    position = _parse_position(
+        fen, flipped, instrumentation, square_length, len(arrows) if arrows else 0
+    )
+    prepared = _PreparedRender(
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        arrows=arrows,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+        engine=engine,
+        instrumentation=instrumentation,
+        piece_count=None if instrumentation is None else position.piece_count(),
+    )
+    return prepared.render_position(position, copy=False)
 
-    # Convert arrow coordinates from algebraic notation to indices
-    if arrows is not None:
-        for arrow in arrows:
-            if isinstance(arrow[0], str):
-                arrow[0] = square_to_indices(arrow[0])  # type: ignore
-            if isinstance(arrow[1], str):
-                arrow[1] = square_to_indices(arrow[1])  # type: ignore
 
-    # Convert last move coordinates from algebraic notation to indices
-    if last_move is not None:
-        if isinstance(last_move["before"], str):
-            last_move["before"] = square_to_indices(last_move["before"])
-        if isinstance(last_move["after"], str):
-            last_move["after"] = square_to_indices(last_move["after"])
-
-    # Flip the board for black's perspective
-    if flipped:
-        parsed_board.reverse()
-        for row in parsed_board:
-            row.reverse()
-        if last_move is not None:
-            last_move["before"] = flip_coord_tuple(last_move["before"])  # type: ignore
-            last_move["after"] = flip_coord_tuple(last_move["after"])  # type: ignore
-        if arrows is not None:
-            for index, arrow in enumerate(arrows):
-                arrows[index] = (
-                    flip_coord_tuple(arrow[0]),  # type: ignore
-                    flip_coord_tuple(arrow[1]),  # type: ignore
-                )
+def render_into(
+    canvas: Any,
+    origin: BoardPosition,
+    fen: str,
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    instrumentation: Optional[Instrumentation] = None,
+) -> Any:
+    """Render a chess position directly into an existing image.
 
-    board = paint_checker_board(board, dark_color, last_move)
-
-    # Draw coordinates if configured
-    if coordinates is not None:
-        draw = ImageDraw.Draw(board)
-        size = 1 if coordinates["size"] is None else coordinates["size"]
-        font = coordinates["font"](size)
-        for x in range(0, 8):
-            for y in range(0, 8):
-                coord_str = indices_to_square((x, y))
-                text_objects = coordinates["position_fn"](
-                    coord_str,
-                    (x * square_length, y * square_length),
-                    square_length,
-                    font,
-                )
-                if text_objects is not None:
-                    for text in text_objects:
-                        draw.text(
-                            text["coordinate"],
-                            text["text"],
-                            font=font,
-                            fill=coordinates["dark_color"],
-                        )
-
-    piece_images = piece_set(board)
-    # Look up cached alpha channels by finding the matching resized_cache entry
-    piece_alphas = None
-    for cache_key, cached_images in resized_cache.items():
-        if cached_images is piece_images:
-            piece_alphas = alpha_cache.get(cache_key)
-            break
-    board = paint_all_pieces(board, parsed_board, piece_images, piece_alphas)
-
-    if arrow_set is not None and arrows is not None:
-        board = paint_all_arrows(board, arrows, arrow_set(board))  # type: ignore
+    Paints the same board as fen_to_image, but into a region of a page or
+    card image instead of a new image, which saves allocating the board
+    and pasting it. Everything inside the board's square is overwritten;
+    the rest of the canvas is left untouched.
 
-    return board
+    Args:
+        canvas: The image to paint into: an RGB or RGBA PIL Image, or a
+            writable (H, W, 3) uint8 NumPy array, e.g. a view of a raw
+            buffer made with ``numpy.frombuffer(buffer, numpy.uint8)``
+            and reshaped. Arrays are painted with the numpy engine.
+        origin: The (x, y) pixel position of the board's top left corner.
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw; see fen_to_image.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        instrumentation: Optional Instrumentation; see fen_to_image.
+
+    Returns:
+        The canvas.
+
+    Raises:
+        ValueError: If the piece placement field of ``fen`` is malformed,
+            the canvas has an unsupported mode or shape, or the board does
+            not fit inside the canvas at ``origin``.
+
+    Example:
+        ```python
+        card = Image.new("RGB", (1200, 630), "#312E2B")
+        render_into(card, (40, 35), fen, 70, load_pieces_folder("./pieces"), "#D18B47", "#FFCE9E")
+        ```
+    """
+    if instrumentation is None:
+        instrumentation = get_instrumentation()
+    position = _parse_position(
+        fen, flipped, instrumentation, square_length, len(arrows) if arrows else 0
+    )
+    prepared = _PreparedRender(
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        arrows=arrows,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+        instrumentation=instrumentation,
+        piece_count=None if instrumentation is None else position.piece_count(),
+    )
+    prepared.render_into(canvas, origin, position)
+    return canvas
+
+
+def fen_to_images(
+    fens: Iterable[str],
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    engine: str = "pillow",
+    instrumentation: Optional[Instrumentation] = None,
+) -> Iterator[Image.Image]:
+    """Generate chess board images for many FEN strings.
+
+    Accepts the same options as fen_to_image, applied to every position.
+    The checkerboard, last move highlight, coordinates, piece images and
+    arrow images are resolved once, and each position only pays for
+    painting its pieces (and arrows) onto a copy of that background.
+
+    Args:
+        fens: An iterable of FEN strings. It is consumed lazily.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows drawn on every board.
+        flipped: If True, render the boards from black's perspective.
+        last_move: Optional last move highlight drawn on every board.
+        coordinates: Optional configuration for drawing coordinates.
+        engine: The compositing engine, "pillow" or "numpy"; see fen_to_image.
+        instrumentation: Optional Instrumentation; see fen_to_image. The
+            background phases are reported once, without a piece count.
+
+    Yields:
+        A PIL Image for each FEN string, in input order.
+
+    Example:
+        ```python
+        pieces = load_pieces_folder("./pieces")
+        for index, board in enumerate(fen_to_images(fens, 40, pieces, "#D18B47", "#FFCE9E")):
+            board.save(f"puzzle_{index}.png")
+        ```
+    """
+    prepared = _PreparedRender(
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        arrows=arrows,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+        engine=engine,
+        instrumentation=instrumentation if instrumentation is not None else get_instrumentation(),
+    )
+    for fen in fens:
+        yield prepared.render(fen)
 
 
 # Backwards compatibility aliases (deprecated, use snake_case versions)
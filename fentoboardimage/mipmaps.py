@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""Piece sets loaded from several source resolutions.
+
+load_pieces_folder() resizes every board size from the one resolution in
+its folder, so a 20px thumbnail is resampled straight from a print-size
+source. load_pieces_mipmaps() keeps a pyramid of resolutions, either
+folders of the same set drawn at different sizes, halvings built from the
+smallest folder, or both. Each board size is resized from the nearest
+source at least as large as its squares, with Image.reduce() when the
+source is an exact multiple of the square size.
+
+Example:
+    ```python
+    from fentoboardimage import load_pieces_mipmaps
+
+    pieces = load_pieces_mipmaps(["./pieces512", "./pieces256", "./pieces128"])
+    thumbnail = fen_to_image(fen, 20, pieces, "#D18B47", "#FFCE9E")
+    ```
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, List, Sequence, Tuple, Union
+
+from PIL import Image
+
+from .cache import LRUCache
+from .main import (
+    PieceImages,
+    _registered_caches,
+    alpha_cache,
+    load_pieces_folder,
+    resized_cache,
+)
+
+# Loaded pyramids keyed by (folder paths, min_size), largest level first
+mipmap_cache: LRUCache[List[PieceImages]] = LRUCache(max_entries=16)
+_registered_caches["mipmap_cache"] = mipmap_cache
+
+
+def _level_size(level: PieceImages) -> int:
+    """Return the size of a pyramid level, taken from its widest piece."""
+    return max(image.width for image in level.values())
+
+
+def build_pyramid(
+    levels: Sequence[PieceImages],
+    min_size: int = 16,
+) -> List[PieceImages]:
+    """Sort piece set levels and extend them with halvings of the smallest.
+
+    Args:
+        levels: The same piece set at one or more resolutions.
+        min_size: Halve the smallest level with Image.reduce(2) while the
+            result is at least this many pixels wide.
+
+    Returns:
+        The levels, largest first.
+
+    Raises:
+        ValueError: If ``levels`` is empty.
+    """
+    if not levels:
+        raise ValueError("A piece pyramid needs at least one level")
+    pyramid = sorted(levels, key=_level_size, reverse=True)
+    while _level_size(pyramid[-1]) // 2 >= min_size:
+        pyramid.append({piece: image.reduce(2) for piece, image in pyramid[-1].items()})
+    return pyramid
+
+
+def _resize_from_pyramid(pyramid: List[PieceImages], piece_size: int) -> PieceImages:
+    """Resize a piece set from the nearest pyramid level at least as large.
+
+    Args:
+        pyramid: Piece set levels, largest first.
+        piece_size: The target square size in pixels.
+
+    Returns:
+        The resized piece images.
+    """
+    level = pyramid[0]
+    for candidate in pyramid:
+        if _level_size(candidate) < piece_size:
+            break
+        level = candidate
+    resized: PieceImages = {}
+    for piece, image in level.items():
+        if image.size == (piece_size, piece_size):
+            resized[piece] = image
+        elif image.width == image.height and image.width % piece_size == 0:
+            # Exact integer factors use a box filter, which is both
+            # faster and sharper than a bicubic resize
+            resized[piece] = image.reduce(image.width // piece_size)
+        else:
+            resized[piece] = image.resize((piece_size, piece_size))
+    return resized
+
+
+class _MipmapPieceLoader:
+    """Piece loader returned by load_pieces_mipmaps()."""
+
+    __slots__ = ("paths", "cache", "min_size", "pyramid")
+
+    def __init__(
+        self,
+        paths: Tuple[str, ...],
+        cache: bool,
+        min_size: int,
+        pyramid: List[PieceImages],
+    ) -> None:
+        self.paths = paths
+        self.cache = cache
+        self.min_size = min_size
+        self.pyramid = pyramid
+
+    def __call__(self, board: Image.Image) -> PieceImages:
+        cache_key = (self.cache_key, board.size[0])
+        cached = resized_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        resized = _resize_from_pyramid(self.pyramid, int(board.size[0] / 8))
+        if self.cache:
+            resized_cache.put(cache_key, resized)
+            alpha_cache.put(
+                resized, {piece: image.getchannel("A") for piece, image in resized.items()}
+            )
+        return resized
+
+    @property
+    def piece_images(self) -> PieceImages:
+        """The largest level of the pyramid."""
+        return self.pyramid[0]
+
+    @property
+    def cache_key(self) -> Tuple[Any, ...]:
+        """A stable identity for this piece set, used in render cache keys."""
+        return ("mipmaps", tuple(os.path.abspath(path) for path in self.paths), self.min_size)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (load_pieces_mipmaps, (list(self.paths), self.cache, self.min_size))
+
+
+def load_pieces_mipmaps(
+    paths: Union[str, Sequence[str]],
+    cache: bool = True,
+    min_size: int = 16,
+) -> Callable[[Image.Image], PieceImages]:
+    """Load a piece set from one or more resolutions of the same pieces.
+
+    Each folder has the layout expected by load_pieces_folder(). The
+    smallest folder is halved with Image.reduce(2) down to ``min_size``,
+    so a single folder also gives a full pyramid. For each board, the
+    pieces are resized from the smallest level that is at least as large
+    as a square.
+
+    Args:
+        paths: A piece folder, or folders holding the same set at
+            different resolutions, in any order.
+        cache: Whether to cache loaded and resized images for reuse.
+        min_size: The smallest level built by halving, in pixels.
+
+    Returns:
+        A function that takes a board image and returns a dictionary
+        mapping piece characters to appropriately sized PIL Images.
+
+    Raises:
+        ValueError: If ``paths`` is empty.
+
+    Example:
+        ```python
+        pieces = load_pieces_mipmaps("./pieces")
+        piece_images = pieces(Image.new("RGB", (160, 160)))
+        ```
+    """
+    folders = (paths,) if isinstance(paths, str) else tuple(paths)
+    if not folders:
+        raise ValueError("load_pieces_mipmaps needs at least one folder")
+    key = (tuple(os.path.abspath(path) for path in folders), min_size)
+    pyramid = mipmap_cache.get(key)
+    if pyramid is None:
+        levels: List[PieceImages] = [
+            load_pieces_folder(path, cache=False).piece_images  # type: ignore
+            for path in folders
+        ]
+        pyramid = build_pyramid(levels, min_size)
+        if cache:
+            mipmap_cache.put(key, pyramid)
+    return _MipmapPieceLoader(folders, cache, min_size, pyramid)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+"""A NumPy compositing engine for rendering boards.
+
+The default engine pastes each piece and arrow onto the board with
+Image.paste(). This engine instead keeps the board as a uint8 array and
+holds each piece set as stacked premultiplied sprites, so every occupied
+square is blended in one vectorized operation. The board is converted back
+to a PIL Image once at the end.
+
+Blending uses the same integer arithmetic as Pillow's paste with a mask,
+so the output is identical to the default engine.
+
+NumPy is an optional dependency, installed with the ``numpy`` extra.
+
+Example:
+    ```python
+    board = fen_to_image(fen, 60, pieces, "#D18B47", "#FFCE9E", engine="numpy")
+    ```
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Tuple
+
+from PIL import Image
+
+from .cache import IdentityCache
+from .fen_parser import Position
+from .main import BoardPosition, PieceImages, _registered_caches
+from .vectorized import _require_numpy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore
+
+if TYPE_CHECKING:
+    import numpy
+
+_PIECE_ORDER = "KQRBNPkqrbnp"
+
+SpriteTable = Tuple["numpy.ndarray", "numpy.ndarray", "numpy.ndarray"]
+
+# Premultiplied sprite tables per resized piece dictionary
+sprite_table_cache: IdentityCache[SpriteTable] = IdentityCache(
+    max_entries=64, max_bytes=64 * 1024 * 1024
+)
+_registered_caches["sprite_table_cache"] = sprite_table_cache
+
+
+def _sprite_table(piece_images: PieceImages, piece_size: int) -> SpriteTable:
+    """Stack a resized piece set into premultiplied sprite arrays.
+
+    Pillow blends a masked paste as ``(dst * (255 - a) + src * a + 128)``
+    divided by 255 with a shift trick. ``src * a + 128`` only depends on the
+    sprite, so it is precomputed along with ``255 - a``. The sum never
+    exceeds 255 * 255 + 128, so the blend fits in 16 bit integers.
+
+    Args:
+        piece_images: A dictionary returned by a piece loader.
+        piece_size: The size of one square in pixels.
+
+    Returns:
+        The premultiplied color terms with shape (12, S, S, 3), the inverse
+        alphas with shape (12, S, S, 1), both uint16, and a 256-entry table
+        mapping piece bytes to their index in the stack.
+
+    Raises:
+        ValueError: If a piece image does not match the square size.
+    """
+    cached = sprite_table_cache.get(piece_images)
+    if cached is not None:
+        return cached
+
+    premultiplied = np.full((len(_PIECE_ORDER), piece_size, piece_size, 3), 128, dtype=np.uint16)
+    inverse = np.full((len(_PIECE_ORDER), piece_size, piece_size, 1), 255, dtype=np.uint16)
+    index = np.zeros(256, dtype=np.intp)
+    for position, piece in enumerate(_PIECE_ORDER):
+        index[ord(piece)] = position
+        image = piece_images.get(piece)
+        if image is None:
+            continue
+        if image.size != (piece_size, piece_size):
+            raise ValueError(
+                f"Piece image {piece!r} is {image.size}, expected {(piece_size, piece_size)}"
+            )
+        rgba = np.asarray(image.convert("RGBA"), dtype=np.uint16)
+        alpha = rgba[:, :, 3:]
+        premultiplied[position] = rgba[:, :, :3] * alpha + 128
+        inverse[position] = 255 - alpha
+    table = (premultiplied, inverse, index)
+    sprite_table_cache.put(piece_images, table)
+    return table
+
+
+def _blend(
+    destination: "numpy.ndarray",
+    premultiplied: "numpy.ndarray",
+    inverse: "numpy.ndarray",
+) -> "numpy.ndarray":
+    """Blend sprites over destination pixels like Pillow's masked paste."""
+    total = destination * inverse
+    total += premultiplied
+    return ((total + (total >> 8)) >> 8).astype(np.uint8)
+
+
+def _composite_sprite(
+    pixels: "numpy.ndarray",
+    sprite: Image.Image,
+    corner: BoardPosition,
+) -> None:
+    """Blend one RGBA sprite onto the board array, clipped to the board."""
+    height, width = pixels.shape[:2]
+    rgba = np.asarray(sprite.convert("RGBA"))
+    x, y = corner
+    left, top = max(x, 0), max(y, 0)
+    right, bottom = min(x + rgba.shape[1], width), min(y + rgba.shape[0], height)
+    if left >= right or top >= bottom:
+        return
+    source = rgba[top - y:bottom - y, left - x:right - x].astype(np.uint16)
+    alpha = source[:, :, 3:]
+    region = pixels[top:bottom, left:right]
+    region[...] = _blend(region, source[:, :, :3] * alpha + 128, 255 - alpha)
+
+
+def board_array(board: Image.Image) -> "numpy.ndarray":
+    """Convert a board background to the array form used by composite().
+
+    Args:
+        board: The RGB board background.
+
+    Returns:
+        A read-only (H, W, 3) uint8 array.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If the board is not a square RGB image made of 8x8 squares.
+    """
+    _require_numpy("The numpy engine")
+    if board.mode != "RGB" or board.size[0] != board.size[1] or board.size[0] % 8:
+        raise ValueError(f"The numpy engine renders square RGB boards, got {board.mode} {board.size}")
+    return np.asarray(board)
+
+
+def canvas_region(canvas: "numpy.ndarray", origin: BoardPosition, size: int) -> "numpy.ndarray":
+    """Return the view of a canvas array that a board is painted into.
+
+    Args:
+        canvas: A writable (H, W, 3) uint8 array.
+        origin: The (x, y) pixel position of the board's top left corner.
+        size: The width and height of the board in pixels.
+
+    Returns:
+        A (size, size, 3) view of the canvas.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If the canvas is not a writable RGB array, or the board
+            does not fit inside it at ``origin``.
+    """
+    _require_numpy("The numpy engine")
+    if (
+        not isinstance(canvas, np.ndarray)
+        or canvas.dtype != np.uint8
+        or canvas.ndim != 3
+        or canvas.shape[2] != 3
+    ):
+        raise ValueError("Canvas arrays must be (H, W, 3) uint8 arrays")
+    if not canvas.flags.writeable:
+        raise ValueError("Canvas array is read-only")
+    left, top = origin
+    height, width = canvas.shape[:2]
+    if left < 0 or top < 0 or left + size > width or top + size > height:
+        raise ValueError(f"A {size}px board at {origin} does not fit in a {width}x{height} canvas")
+    return canvas[top:top + size, left:left + size]
+
+
+def composite_pieces(
+    pixels: "numpy.ndarray",
+    background: "numpy.ndarray",
+    position: Position,
+    piece_images: PieceImages,
+) -> None:
+    """Paint a board background and its pieces into an array.
+
+    Args:
+        pixels: The (H, W, 3) array to paint, possibly a view of a larger
+            canvas from canvas_region().
+        background: The board background from board_array().
+        position: The pieces to paint, already flipped if needed.
+        piece_images: A dictionary returned by a piece loader.
+    """
+    piece_size = background.shape[0] // 8
+    pixels[...] = background
+
+    codes = np.frombuffer(position.board, dtype=np.uint8)
+    occupied = np.flatnonzero(codes != ord(" "))
+    if len(occupied):
+        premultiplied, inverse, index = _sprite_table(piece_images, piece_size)
+        sprite_index = index[codes[occupied]]
+        rows, files = occupied >> 3, occupied & 7
+        # View the board as an 8x8 grid of squares; indexing the two grid
+        # axes gathers every occupied square as a (K, S, S, 3) stack
+        # (splitting axes always gives a view, even of a canvas region)
+        squares = pixels.reshape(8, piece_size, 8, piece_size, 3)
+        squares[rows, :, files] = _blend(
+            squares[rows, :, files], premultiplied[sprite_index], inverse[sprite_index]
+        )
+
+
+def composite_sprites(
+    pixels: "numpy.ndarray",
+    sprites: List[Tuple[Image.Image, BoardPosition]],
+) -> None:
+    """Blend arrow sprites onto a painted board array.
+
+    Args:
+        pixels: The (H, W, 3) array to paint, as painted by composite_pieces().
+        sprites: Arrow sprites and their top left corners, in drawing order.
+    """
+    for sprite, corner in sprites:
+        _composite_sprite(pixels, sprite, corner)
+
+
+def composite_into(
+    pixels: "numpy.ndarray",
+    background: "numpy.ndarray",
+    position: Position,
+    piece_images: PieceImages,
+    sprites: List[Tuple[Image.Image, BoardPosition]],
+) -> None:
+    """Paint a board background, pieces and arrow sprites into an array.
+
+    Args:
+        pixels: The (H, W, 3) array to paint, possibly a view of a larger
+            canvas from canvas_region().
+        background: The board background from board_array().
+        position: The pieces to paint, already flipped if needed.
+        piece_images: A dictionary returned by a piece loader.
+        sprites: Arrow sprites and their top left corners, in drawing order.
+    """
+    composite_pieces(pixels, background, position, piece_images)
+    composite_sprites(pixels, sprites)
+
+
+def composite(
+    background: "numpy.ndarray",
+    position: Position,
+    piece_images: PieceImages,
+    sprites: List[Tuple[Image.Image, BoardPosition]],
+) -> Image.Image:
+    """Paint pieces and arrow sprites onto a copy of a board background.
+
+    Args:
+        background: The board background from board_array(). It is not
+            modified, so it can be converted once and reused.
+        position: The pieces to paint, already flipped if needed.
+        piece_images: A dictionary returned by a piece loader.
+        sprites: Arrow sprites and their top left corners, in drawing order.
+
+    Returns:
+        A new RGB image of the board.
+    """
+    pixels = np.empty_like(background)
+    composite_into(pixels, background, position, piece_images, sprites)
+    return Image.fromarray(pixels)
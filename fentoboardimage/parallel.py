@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""Multi-process bulk rendering of chess positions.
+
+This module provides render_many(), which renders a stream of positions to
+encoded image bytes, optionally sharding the work across a pool of worker
+processes.
+
+Example:
+    ```python
+    from fentoboardimage import render_many, load_pieces_folder
+
+    pieces = load_pieces_folder("./pieces")
+    for index, png in enumerate(render_many(fens, 40, pieces, "#D18B47", "#FFCE9E", workers=8)):
+        with open(f"diagram_{index}.png", "wb") as f:
+            f.write(png)
+    ```
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from PIL import Image
+
+from .encoding import _encode_render
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    _PreparedRender,
+    fen_to_image,
+)
+
+RenderJob = Union[str, Mapping[str, Any]]
+"""A FEN string, or a mapping with a "fen" key and per-job overrides.
+
+Overrides may set "arrows", "flipped" and "last_move"; other options are
+shared by the whole run.
+"""
+
+# Per-process render state, set up by _init_worker()
+_worker_options: Dict[str, Any] = {}
+_worker_prepared: Optional[_PreparedRender] = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Resolve the shared render options once per worker process.
+
+    Preparing the render loads and resizes the piece and arrow sets, so the
+    module-level image caches are warm before the first job arrives.
+
+    Args:
+        options: Keyword arguments shared by every fen_to_image() call.
+    """
+    global _worker_options, _worker_prepared
+    _worker_options = options
+    _worker_prepared = _PreparedRender(**options)
+
+
+def _encode_job(
+    job: RenderJob,
+    prepared: _PreparedRender,
+    options: Dict[str, Any],
+    format: str,
+    params: Mapping[str, Any],
+) -> bytes:
+    """Render and encode one job.
+
+    Args:
+        job: A FEN string or a mapping with per-job overrides.
+        prepared: The shared render, used for plain FEN strings.
+        options: Keyword arguments shared by every fen_to_image() call.
+        format: A Pillow format name such as "PNG" or "WEBP".
+        params: Extra keyword arguments passed to encode_image().
+
+    Returns:
+        The encoded image.
+    """
+    job_options = dict(options)
+    if isinstance(job, str):
+        job_options["fen"] = job
+        image = prepared.render(job)
+    else:
+        job_options.update(job)
+        image = fen_to_image(**job_options)
+    return _encode_render(image, job_options, format, params)
+
+
+def _render_chunk(
+    jobs: List[RenderJob],
+    format: str,
+    params: Mapping[str, Any],
+    catch_errors: bool = False,
+) -> List[Union[bytes, Exception]]:
+    """Render and encode a chunk of jobs.
+
+    Args:
+        jobs: The jobs to render.
+        format: A Pillow format name such as "PNG" or "WEBP".
+        params: Extra keyword arguments passed to encode_image().
+        catch_errors: If True, a job that fails is returned as its
+            exception instead of failing the whole chunk.
+
+    Returns:
+        The encoded images, in job order.
+    """
+    prepared = _worker_prepared
+    if not catch_errors:
+        return [_encode_job(job, prepared, _worker_options, format, params) for job in jobs]  # type: ignore
+    results: List[Union[bytes, Exception]] = []
+    for job in jobs:
+        try:
+            results.append(_encode_job(job, prepared, _worker_options, format, params))  # type: ignore
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+def _chunks(jobs: Iterable[RenderJob], size: int) -> Iterator[List[RenderJob]]:
+    """Split an iterable of jobs into lists of at most ``size`` jobs."""
+    iterator = iter(jobs)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_many(
+    jobs: Iterable[RenderJob],
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    workers: int = 1,
+    format: str = "PNG",
+    chunksize: int = 16,
+    on_error: Optional[Callable[[int, Exception], None]] = None,
+    **save_params: Any,
+) -> Iterator[bytes]:
+    """Render many positions to encoded image bytes.
+
+    With ``workers`` greater than 1 the jobs are sharded across a process
+    pool. Each worker loads and resizes the piece and arrow sets once when it
+    starts, and sends back encoded bytes rather than pickled images. Jobs are
+    submitted in a bounded window, so the input is consumed lazily and
+    results are yielded in input order.
+
+    Piece sets, arrow sets and fonts from the load_* functions can be sent
+    to workers. Custom loaders and coordinate position functions must be
+    picklable (module-level functions are) when ``workers`` is above 1.
+
+    Args:
+        jobs: FEN strings, or mappings with a "fen" key and per-job
+            "arrows", "flipped" or "last_move" overrides.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows drawn on every board.
+        flipped: If True, render the boards from black's perspective.
+        last_move: Optional last move highlight drawn on every board.
+        coordinates: Optional configuration for drawing coordinates.
+        workers: Number of worker processes. 1 renders in this process.
+        format: A Pillow format name such as "PNG" or "WEBP".
+        chunksize: Number of jobs sent to a worker at a time.
+        on_error: Optional function called with the index of a job and the
+            exception it raised. The job is then skipped and rendering goes
+            on; without it, the first failing job raises.
+        **save_params: Extra keyword arguments passed to encode_image(),
+            such as ``palette=True`` or ``compress_level=1``.
+
+    Yields:
+        The encoded image for each job, in input order. Jobs reported to
+        ``on_error`` yield nothing.
+
+    Raises:
+        ValueError: If ``workers`` or ``chunksize`` is less than 1.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    options: Dict[str, Any] = {
+        "square_length": square_length,
+        "piece_set": piece_set,
+        "dark_color": dark_color,
+        "light_color": light_color,
+        "arrow_set": arrow_set,
+        "arrows": arrows,
+        "flipped": flipped,
+        "last_move": last_move,
+        "coordinates": coordinates,
+    }
+
+    if workers == 1:
+        prepared = _PreparedRender(**options)
+        for index, job in enumerate(jobs):
+            try:
+                data = _encode_job(job, prepared, options, format, save_params)
+            except Exception as error:
+                if on_error is None:
+                    raise
+                on_error(index, error)
+                continue
+            yield data
+        return
+
+    def results(chunk: List[Union[bytes, Exception]], start: int) -> Iterator[bytes]:
+        for index, result in enumerate(chunk, start):
+            if isinstance(result, Exception):
+                on_error(index, result)  # type: ignore
+            else:
+                yield result
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(options,),
+    ) as executor:
+        pending: Deque[Any] = deque()
+        done = 0
+        for chunk in _chunks(jobs, chunksize):
+            pending.append(
+                executor.submit(_render_chunk, chunk, format, save_params, on_error is not None)
+            )
+            # Keep a couple of chunks queued per worker without reading ahead
+            if len(pending) >= workers * 2:
+                finished = pending.popleft().result()
+                yield from results(finished, done)
+                done += len(finished)
+        while pending:
+            finished = pending.popleft().result()
+            yield from results(finished, done)
+            done += len(finished)
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+"""PDF export of diagrams and diagram books.
+
+Converting rendered rasters to PDF embeds one full bitmap per diagram.
+fen_to_pdf() and fens_to_pdf() instead write the board as vector shapes
+and each piece type as one image XObject, drawn on every square, in every
+diagram and on every page that uses it. The checkerboard, last move
+highlight and coordinates are one form XObject shared by all diagrams, so
+a book grows by a few hundred bytes of drawing operators per diagram.
+
+Lengths are in PDF points (1/72 inch).
+
+Example:
+    ```python
+    from fentoboardimage import fens_to_pdf, load_pieces_folder
+
+    book = fens_to_pdf(
+        fens,
+        square_length=20,
+        piece_set=load_pieces_folder("./pieces"),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+        columns=2,
+        captions=[f"Puzzle {n}" for n in range(1, len(fens) + 1)],
+        page_size=(595, 842),
+    )
+    with open("puzzles.pdf", "wb") as f:
+        f.write(book)
+    ```
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageColor
+
+from .fen_parser import Position
+from .main import (
+    Coordinates,
+    LastMove,
+    PieceImages,
+    _is_light_square,
+    _layout_coordinates,
+    _normalize_last_move,
+)
+from .sheet import _SheetLayout
+
+# Font resources: labels use the standard Helvetica fonts, which every
+# reader provides, so no font file is embedded
+_LABEL_FONT = (
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold"
+    b" /Encoding /WinAnsiEncoding >>"
+)
+_CAPTION_FONT = (
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica"
+    b" /Encoding /WinAnsiEncoding >>"
+)
+
+
+class _PdfWriter:
+    """Collects numbered PDF objects and writes the file structure."""
+
+    def __init__(self) -> None:
+        self.objects: Dict[int, bytes] = {}
+        self.count = 0
+
+    def reserve(self) -> int:
+        """Allocate an object number to be filled in later with add()."""
+        self.count += 1
+        return self.count
+
+    def add(self, body: bytes, number: Optional[int] = None) -> int:
+        """Store an object, under a reserved number or a new one."""
+        if number is None:
+            number = self.reserve()
+        self.objects[number] = body
+        return number
+
+    def stream(self, entries: bytes, data: bytes, number: Optional[int] = None) -> int:
+        """Store a Flate compressed stream object."""
+        data = zlib.compress(data)
+        header = b"<< %s /Filter /FlateDecode /Length %d >>" % (entries, len(data))
+        return self.add(header + b"\nstream\n" + data + b"\nendstream", number)
+
+    def write(self, root: int) -> bytes:
+        """Serialize every object, the cross-reference table and trailer."""
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number in range(1, self.count + 1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n%s\nendobj\n" % (number, self.objects[number])
+        xref = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (self.count + 1)
+        for offset in offsets:
+            output += b"%010d 00000 n \n" % offset
+        output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            self.count + 1,
+            root,
+            xref,
+        )
+        return bytes(output)
+
+
+def _number(value: float) -> bytes:
+    """Format a number for a content stream without a trailing .0."""
+    return (f"{value:.3f}".rstrip("0").rstrip(".") or "0").encode("ascii")
+
+
+def _fill_color(color: str) -> bytes:
+    """Return the operator setting a fill color given in any PIL format."""
+    red, green, blue = ImageColor.getrgb(color)[:3]
+    return b"%s %s %s rg" % (_number(red / 255), _number(green / 255), _number(blue / 255))
+
+
+def _text(value: str) -> bytes:
+    """Encode a PDF string literal."""
+    raw = value.encode("cp1252", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _piece_image(writer: _PdfWriter, image: Image.Image, number: int) -> None:
+    """Store a piece as an RGB image XObject with its alpha as a soft mask."""
+    rgba = image.convert("RGBA")
+    width, height = rgba.size
+    mask = writer.stream(
+        b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8" % (width, height),
+        rgba.getchannel("A").tobytes(),
+    )
+    writer.stream(
+        b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+        b"/BitsPerComponent 8 /SMask %d 0 R" % (width, height, mask),
+        rgba.convert("RGB").tobytes(),
+        number,
+    )
+
+
+def _board_form(
+    writer: _PdfWriter,
+    square_length: float,
+    dark_color: str,
+    light_color: str,
+    last_move: Optional[LastMove],
+    coordinates: Optional[Coordinates],
+    label_font: int,
+) -> int:
+    """Store the checkerboard, highlights and coordinates as a form XObject.
+
+    The form is drawn with its origin at the bottom left of the board.
+    """
+    size = square_length * 8
+
+    def square(x: int, y: int) -> bytes:
+        # Board rows count down from the top, PDF coordinates up from the bottom
+        return b"%s %s %s %s re" % (
+            _number(x * square_length),
+            _number(size - (y + 1) * square_length),
+            _number(square_length),
+            _number(square_length),
+        )
+
+    operations = [_fill_color(light_color), b"0 0 %s %s re f" % (_number(size), _number(size))]
+    operations.append(_fill_color(dark_color))
+    operations += [square(x, y) for y in range(8) for x in range(8) if not _is_light_square((x, y))]
+    operations.append(b"f")
+    if last_move is not None:
+        for key in ("before", "after"):
+            x, y = last_move[key]  # type: ignore
+            color = last_move["lightColor"] if _is_light_square((x, y)) else last_move["darkColor"]
+            operations += [_fill_color(color), square(x, y), b"f"]
+    if coordinates is not None:
+        # Labels are placed where fen_to_image draws them, measured with the
+        # configured font; Pillow positions text by the top of its ascender
+        font, labels = _layout_coordinates(coordinates, square_length)
+        font_size = 1 if coordinates["size"] is None else coordinates["size"]
+        ascent = font.getmetrics()[0] if hasattr(font, "getmetrics") else font_size
+        operations += [b"BT", b"/F1 %s Tf" % _number(font_size)]
+        operations.append(_fill_color(coordinates["dark_color"]))
+        for _, text in labels:
+            x, y = text["coordinate"]
+            operations.append(b"1 0 0 1 %s %s Tm" % (_number(x), _number(size - y - ascent)))
+            operations.append(_text(text["text"]) + b" Tj")
+        operations.append(b"ET")
+    return writer.stream(
+        b"/Type /XObject /Subtype /Form /BBox [0 0 %s %s] /Resources << /Font << /F1 %d 0 R >> >>"
+        % (_number(size), _number(size), label_font),
+        b"\n".join(operations),
+    )
+
+
+def fens_to_pdf(
+    fens: Iterable[str],
+    square_length: float,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    columns: int = 2,
+    gutter: float = 20,
+    captions: Optional[Sequence[Optional[str]]] = None,
+    page_size: Optional[Tuple[float, float]] = None,
+    caption_size: float = 10,
+    caption_color: str = "#000000",
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    piece_pixels: Optional[int] = None,
+) -> bytes:
+    """Write many diagrams to a PDF document.
+
+    Diagrams are laid out on pages like render_sheet(): row by row,
+    ``columns`` per row, separated and surrounded by ``gutter`` points.
+
+    Args:
+        fens: An iterable of FEN strings.
+        square_length: The length of each square in points.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        columns: The number of diagrams per row.
+        gutter: The space between diagrams and around the grid, in points.
+        captions: Optional text drawn in Helvetica under each diagram, by
+            position in ``fens``, aligned with the diagram's left edge.
+        page_size: The (width, height) of each page in points, e.g.
+            (595, 842) for A4. If None, a single page just large enough
+            for every diagram is made.
+        caption_size: The caption font size in points.
+        caption_color: The caption text color.
+        flipped: If True, render the diagrams from black's perspective.
+        last_move: Optional last move highlight drawn on every diagram.
+        coordinates: Optional configuration for drawing coordinates. The
+            font is used to place the labels, which are drawn in
+            Helvetica Bold.
+        piece_pixels: The resolution of the embedded piece images, in
+            pixels per square. Defaults to four pixels per point (288 dpi).
+
+    Returns:
+        The PDF document as bytes.
+
+    Raises:
+        ValueError: If ``columns`` is less than 1, ``gutter`` is negative,
+            a page cannot hold a single row, there are fewer captions than
+            diagrams, or a FEN is malformed.
+    """
+    if columns < 1:
+        raise ValueError(f"columns must be at least 1, got {columns}")
+    if gutter < 0:
+        raise ValueError(f"gutter must not be negative, got {gutter}")
+    fens = list(fens)
+    caption_height = 0.0 if captions is None else caption_size + gutter / 2
+    layout = _SheetLayout(
+        square_length * 8, caption_height, columns, gutter, page_size, len(fens)  # type: ignore
+    )
+    page_width, page_height = layout.page_size
+    if piece_pixels is None:
+        piece_pixels = max(1, round(square_length * 4))
+    piece_images = piece_set(Image.new("RGB", (piece_pixels * 8, piece_pixels * 8), None))
+
+    writer = _PdfWriter()
+    catalog = writer.reserve()
+    pages = writer.reserve()
+    resources = writer.reserve()
+    label_font = writer.add(_LABEL_FONT)
+    caption_font = writer.add(_CAPTION_FONT)
+    board = _board_form(
+        writer,
+        square_length,
+        dark_color,
+        light_color,
+        _normalize_last_move(last_move, flipped),
+        coordinates,
+        label_font,
+    )
+    # Image XObjects are numbered when a piece is first drawn and written
+    # once at the end, so pieces that never appear are not embedded
+    images: Dict[str, int] = {}
+    page_numbers: List[int] = []
+    operations: List[bytes] = []
+    scale = _number(square_length)
+
+    def finish_page() -> None:
+        content = writer.stream(b"", b"\n".join(operations))
+        page_numbers.append(
+            writer.add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources %d 0 R "
+                b"/Contents %d 0 R >>"
+                % (pages, _number(page_width), _number(page_height), resources, content)
+            )
+        )
+        operations.clear()
+
+    for index, fen in enumerate(fens):
+        slot = index % layout.per_page
+        if slot == 0 and index:
+            finish_page()
+        position = Position.from_fen(fen)
+        if flipped:
+            position = position.flipped()
+        left, top = layout.slot(slot)
+        bottom = page_height - top - layout.board_size
+        operations.append(b"q 1 0 0 1 %s %s cm /Board Do" % (_number(left), _number(bottom)))
+        for (x, y), piece in position.pieces():
+            if piece not in images:
+                images[piece] = writer.reserve()
+            operations.append(
+                b"q %s 0 0 %s %s %s cm /P%s Do Q"
+                % (
+                    scale,
+                    scale,
+                    _number(x * square_length),
+                    _number((7 - y) * square_length),
+                    piece.encode("ascii") + (b"w" if piece.isupper() else b"b"),
+                )
+            )
+        operations.append(b"Q")
+        if captions is not None:
+            if index >= len(captions):
+                raise ValueError(f"No caption for diagram {index}; got {len(captions)} captions")
+            caption = captions[index]
+            if caption:
+                operations.append(
+                    b"BT /F2 %s Tf %s 1 0 0 1 %s %s Tm %s Tj ET"
+                    % (
+                        _number(caption_size),
+                        _fill_color(caption_color),
+                        _number(left),
+                        _number(bottom - gutter / 2 - caption_size * 0.8),
+                        _text(caption),
+                    )
+                )
+    finish_page()
+
+    for piece, number in images.items():
+        _piece_image(writer, piece_images[piece], number)
+    xobjects = b" ".join(
+        b"/P%s %d 0 R" % (piece.encode("ascii") + (b"w" if piece.isupper() else b"b"), number)
+        for piece, number in images.items()
+    )
+    writer.add(
+        b"<< /XObject << /Board %d 0 R %s >> /Font << /F2 %d 0 R >> >>"
+        % (board, xobjects, caption_font),
+        resources,
+    )
+    writer.add(
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % number for number in page_numbers), len(page_numbers)),
+        pages,
+    )
+    writer.add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages, catalog)
+    return writer.write(catalog)
+
+
+def fen_to_pdf(
+    fen: str,
+    square_length: float,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    piece_pixels: Optional[int] = None,
+) -> bytes:
+    """Write a single diagram to a one page PDF document.
+
+    The page is exactly the size of the board. See fens_to_pdf() for the
+    arguments.
+
+    Returns:
+        The PDF document as bytes.
+
+    Example:
+        ```python
+        pdf = fen_to_pdf(fen, 30, load_pieces_folder("./pieces"), "#D18B47", "#FFCE9E")
+        ```
+    """
+    return fens_to_pdf(
+        [fen],
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        columns=1,
+        gutter=0,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+        piece_pixels=piece_pixels,
+    )
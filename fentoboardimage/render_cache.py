@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""Caches of encoded renders, keyed by a normalized render request.
+
+Rendering the same position with the same options always produces the same
+image, so encoded results can be reused. This module computes a canonical
+key for a render request and provides an in-memory LRU backend and an
+on-disk directory backend for the encoded bytes.
+
+Example:
+    ```python
+    from fentoboardimage import fen_to_png_bytes, load_pieces_folder, MemoryRenderCache
+
+    cache = MemoryRenderCache(max_entries=10000)
+    png = fen_to_png_bytes(
+        fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        square_length=60,
+        piece_set=load_pieces_folder("./pieces"),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+        cache=cache,
+    )
+    ```
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from typing import Any, Callable, Hashable, List, Mapping, Optional, Union
+
+from .cache import CacheStats, LRUCache
+from .fen_parser import Position
+from .main import (
+    ArrowInput,
+    Coordinates,
+    LastMove,
+    _normalize_arrows,
+    _normalize_last_move,
+)
+
+# Bump when a change to the renderer alters the output for the same request,
+# so stale entries in persistent caches are not served.
+RENDER_KEY_VERSION = 1
+
+
+def _asset_key(asset: Any) -> Optional[Hashable]:
+    """Return a stable identity for a loader or position function.
+
+    Loaders from the load_* functions expose a ``cache_key`` property.
+    Module-level functions are identified by their qualified name.
+
+    Args:
+        asset: A piece, arrow or font loader, or a coordinate position function.
+
+    Returns:
+        A hashable identity, or None if the asset has no stable identity.
+    """
+    key = getattr(asset, "cache_key", None)
+    if key is not None:
+        return key
+    qualname = getattr(asset, "__qualname__", None)
+    module = getattr(asset, "__module__", None)
+    if qualname is None or module is None or "<" in qualname:
+        # Lambdas and nested functions may differ between definitions
+        return None
+    return ("function", module, qualname)
+
+
+def render_key(
+    fen: str,
+    square_length: int,
+    piece_set: Callable[..., Any],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[..., Any]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    format: str = "PNG",
+    encode_params: Optional[Mapping[str, Any]] = None,
+) -> Optional[str]:
+    """Compute the cache key of a render request.
+
+    Only the piece placement field of the FEN is used, after parsing, so
+    FENs that differ only in side to move, castling rights, move counters
+    or digit grouping share a key. Arrows and the last move are compared
+    after conversion to board indices.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw.
+        flipped: If True, the board is rendered from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        format: The encoded image format.
+        encode_params: Options passed to encode_image().
+
+    Returns:
+        A hex digest identifying the rendered bytes, or None if the request
+        uses an asset without a stable identity (such as a lambda) and so
+        cannot be cached.
+
+    Raises:
+        ValueError: If the piece placement field of ``fen`` is malformed.
+    """
+    placement = Position.from_fen(fen).board.decode("ascii")
+    assets = [_asset_key(piece_set)]
+    arrow_key: Any = None
+    if arrow_set is not None and arrows is not None:
+        assets.append(_asset_key(arrow_set))
+        arrow_key = _normalize_arrows(arrows, flipped)
+    coordinates_key: Any = None
+    if coordinates is not None:
+        assets.append(_asset_key(coordinates["font"]))
+        assets.append(_asset_key(coordinates["position_fn"]))
+        coordinates_key = (
+            coordinates["size"],
+            coordinates["dark_color"],
+            coordinates["light_color"],
+        )
+    if any(asset is None for asset in assets):
+        return None
+    normalized_move = _normalize_last_move(last_move, flipped)
+    move_key: Any = None
+    if normalized_move is not None:
+        move_key = (
+            tuple(normalized_move["before"]),  # type: ignore
+            tuple(normalized_move["after"]),  # type: ignore
+            normalized_move["darkColor"],
+            normalized_move["lightColor"],
+        )
+    request = (
+        RENDER_KEY_VERSION,
+        placement,
+        square_length,
+        dark_color.lower(),
+        light_color.lower(),
+        flipped,
+        move_key,
+        arrow_key,
+        coordinates_key,
+        tuple(assets),
+        format.upper(),
+        tuple(sorted((encode_params or {}).items())),
+    )
+    return hashlib.sha256(repr(request).encode("utf-8")).hexdigest()
+
+
+class MemoryRenderCache:
+    """An in-memory LRU cache of encoded renders.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 4096,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: The maximum number of renders kept, or None for no limit.
+            max_bytes: The maximum total size of the encoded renders, or None
+                for no limit.
+        """
+        self._cache: LRUCache[bytes] = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the encoded render for a key, or None."""
+        return self._cache.get(key)
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an encoded render."""
+        self._cache.put(key, data)
+
+    def clear(self) -> None:
+        """Remove every cached render."""
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        """Return the cache's hit, miss and size counters."""
+        return self._cache.stats()
+
+
+class DiskRenderCache:
+    """A directory of encoded renders, one file per key.
+
+    Files are written to a temporary name and renamed into place, so
+    several processes can share a directory. The directory is not size
+    limited; prune it externally (for example by file age) if needed.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the cache, creating the directory if needed.
+
+        Args:
+            directory: Path of the directory holding cached renders.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Shard by key prefix to keep directories small
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the encoded render for a key, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an encoded render."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def clear(self) -> None:
+        """Remove every cached render."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                os.unlink(os.path.join(root, name))
+
+
+RenderCache = Union[MemoryRenderCache, DiskRenderCache]
+"""A render cache backend. Any object with matching get() and put() methods works."""
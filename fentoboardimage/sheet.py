@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""Contact sheets and puzzle book pages of many diagrams.
+
+render_sheet() lays diagrams out on a grid of pages. The checkerboard,
+piece images and arrow images are resolved once for the whole sheet, and
+each diagram is painted straight into its slot on the page with
+render_into(), so no intermediate board image is allocated per diagram.
+
+Example:
+    ```python
+    from fentoboardimage import load_font_file, load_pieces_folder, render_sheet
+
+    pages = render_sheet(
+        fens,
+        square_length=40,
+        piece_set=load_pieces_folder("./pieces"),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+        columns=2,
+        captions=[f"Puzzle {n}" for n in range(1, len(fens) + 1)],
+        caption_font=load_font_file("./fonts/Roboto-Bold.ttf"),
+        page_size=(1240, 1754),
+    )
+    for number, page in enumerate(pages, 1):
+        page.save(f"page_{number:04}.png")
+    ```
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .instrumentation import Instrumentation, get_instrumentation
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    Coordinates,
+    FontLoaderWithSize,
+    FontType,
+    LastMove,
+    PieceImages,
+    _parse_position,
+    _PreparedRender,
+)
+
+
+class _SheetLayout:
+    """Slot positions of the diagrams on a page."""
+
+    __slots__ = (
+        "page_size",
+        "board_size",
+        "cell_height",
+        "columns",
+        "rows",
+        "left",
+        "top",
+        "gutter",
+    )
+
+    def __init__(
+        self,
+        board_size: int,
+        caption_height: int,
+        columns: int,
+        gutter: int,
+        page_size: Optional[Tuple[int, int]],
+        count: int,
+    ) -> None:
+        self.board_size = board_size
+        self.cell_height = board_size + caption_height
+        self.columns = columns
+        self.gutter = gutter
+        grid_width = columns * board_size + (columns + 1) * gutter
+        if page_size is None:
+            self.rows = max(1, -(-count // columns))
+            page_size = (grid_width, self.rows * (self.cell_height + gutter) + gutter)
+        else:
+            self.rows = int((page_size[1] - gutter) // (self.cell_height + gutter))
+            if grid_width > page_size[0] or self.rows < 1:
+                raise ValueError(
+                    f"A {page_size} page cannot hold a {columns} column grid of "
+                    f"{board_size}px diagrams"
+                )
+        self.page_size = page_size
+        # Center the grid horizontally on pages wider than it
+        self.left = (page_size[0] - grid_width) // 2 + gutter
+        self.top = gutter
+
+    @property
+    def per_page(self) -> int:
+        """The number of diagrams on a full page."""
+        return self.columns * self.rows
+
+    def slot(self, index: int) -> Tuple[int, int]:
+        """Return the top left corner of the board in a slot of a page."""
+        row, column = divmod(index, self.columns)
+        return (
+            self.left + column * (self.board_size + self.gutter),
+            self.top + row * (self.cell_height + self.gutter),
+        )
+
+
+def render_sheet(
+    fens: Iterable[str],
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    columns: int = 2,
+    gutter: int = 20,
+    captions: Optional[Sequence[Optional[str]]] = None,
+    page_size: Optional[Tuple[int, int]] = None,
+    background: str = "#FFFFFF",
+    caption_font: Optional[FontLoaderWithSize] = None,
+    caption_size: int = 16,
+    caption_color: str = "#000000",
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    instrumentation: Optional[Instrumentation] = None,
+) -> Iterator[Image.Image]:
+    """Lay out many diagrams on one page or a sequence of pages.
+
+    Diagrams fill the page row by row, ``columns`` per row, separated and
+    surrounded by ``gutter`` pixels. The board options are those of
+    fen_to_image and apply to every diagram.
+
+    Args:
+        fens: An iterable of FEN strings. It is consumed lazily when
+            ``page_size`` is given.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        columns: The number of diagrams per row.
+        gutter: The space between diagrams and around the grid, in pixels.
+        captions: Optional text drawn centered under each diagram, by
+            position in ``fens``. None entries leave a diagram uncaptioned.
+        page_size: The (width, height) of each page. Pages hold as many
+            rows as fit, and the grid is centered horizontally. If None,
+            a single page just large enough for every diagram is made.
+        background: The page color.
+        caption_font: A font loader from load_font_file(). Defaults to
+            Pillow's built-in font.
+        caption_size: The caption font size, passed to ``caption_font``.
+        caption_color: The caption text color.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows drawn on every diagram.
+        flipped: If True, render the diagrams from black's perspective.
+        last_move: Optional last move highlight drawn on every diagram.
+        coordinates: Optional configuration for drawing coordinates.
+        instrumentation: Optional Instrumentation; see fen_to_image.
+
+    Yields:
+        Each page as an RGB PIL Image. The last page keeps the full page
+        size even when it is not full.
+
+    Raises:
+        ValueError: If ``columns`` is less than 1, ``gutter`` is negative,
+            a page cannot hold a single row, there are fewer captions than
+            diagrams, or a FEN is malformed.
+    """
+    if columns < 1:
+        raise ValueError(f"columns must be at least 1, got {columns}")
+    if gutter < 0:
+        raise ValueError(f"gutter must not be negative, got {gutter}")
+
+    font: Optional[FontType] = None
+    caption_height = 0
+    if captions is not None:
+        font = ImageFont.load_default() if caption_font is None else caption_font(caption_size)
+        # The caption line plus a gap half the gutter wide above it
+        caption_height = font.getbbox("Ag")[3] + gutter // 2 + 1
+
+    if page_size is None:
+        fens = list(fens)
+        count = len(fens)
+    else:
+        count = 0
+    layout = _SheetLayout(square_length * 8, caption_height, columns, gutter, page_size, count)
+
+    if instrumentation is None:
+        instrumentation = get_instrumentation()
+    prepared = _PreparedRender(
+        square_length,
+        piece_set,
+        dark_color,
+        light_color,
+        arrow_set=arrow_set,
+        arrows=arrows,
+        flipped=flipped,
+        last_move=last_move,
+        coordinates=coordinates,
+        instrumentation=instrumentation,
+    )
+    arrow_count = len(arrows) if arrows else 0
+
+    page: Optional[Image.Image] = None
+    draw: Optional[ImageDraw.ImageDraw] = None
+    slot = 0
+    for index, fen in enumerate(fens):
+        if page is None:
+            page = Image.new("RGB", layout.page_size, background)
+            draw = ImageDraw.Draw(page)
+            slot = 0
+        left, top = layout.slot(slot)
+        position = _parse_position(fen, flipped, instrumentation, square_length, arrow_count)
+        prepared.render_into(page, (left, top), position)
+
+        if captions is not None:
+            if index >= len(captions):
+                raise ValueError(f"No caption for diagram {index}; got {len(captions)} captions")
+            caption = captions[index]
+            if caption:
+                width = draw.textlength(caption, font=font)  # type: ignore
+                x = left + (layout.board_size - width) / 2
+                y = top + layout.board_size + gutter // 2
+                draw.text((x, y), caption, font=font, fill=caption_color)  # type: ignore
+
+        slot += 1
+        if slot == layout.per_page:
+            yield page
+            page = None
+    if page is not None:
+        yield page
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+"""SVG output of chess positions.
+
+fen_to_svg() renders the same board as fen_to_image() as an SVG document
+instead of a raster image. The checkerboard is a single pattern fill, each
+piece type used on the board is defined once as a <symbol> and placed with
+<use>, and arrows are vector paths, so documents stay small and scale
+cleanly to any resolution.
+
+Pieces come either from a raster piece loader, embedded as PNG images, or
+from a folder of SVG pieces loaded with load_pieces_svg().
+
+Example:
+    ```python
+    from fentoboardimage import fen_to_svg, load_pieces_svg
+
+    svg = fen_to_svg(fen, 45, load_pieces_svg("./pieces_svg"), "#D18B47", "#FFCE9E")
+    with open("board.svg", "w") as f:
+        f.write(svg)
+    ```
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image
+
+from .cache import IdentityCache, LRUCache
+from .fen_parser import Position
+from .main import (
+    ArrowInput,
+    BoardPosition,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    _check_arrows,
+    _is_light_square,
+    _layout_coordinates,
+    _normalize_arrows,
+    _normalize_last_move,
+    _registered_caches,
+)
+
+_SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+_XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+
+SvgPieces = Dict[str, Tuple[str, str]]
+"""A dictionary mapping piece characters to an SVG viewBox and its markup."""
+
+# The same file names as load_pieces_folder()
+_PIECE_FILES = {
+    "p": ("black", "Pawn"),
+    "P": ("white", "Pawn"),
+    "r": ("black", "Rook"),
+    "R": ("white", "Rook"),
+    "n": ("black", "Knight"),
+    "N": ("white", "Knight"),
+    "b": ("black", "Bishop"),
+    "B": ("white", "Bishop"),
+    "q": ("black", "Queen"),
+    "Q": ("white", "Queen"),
+    "k": ("black", "King"),
+    "K": ("white", "King"),
+}
+
+# Element ids and the references to them in SVG piece markup, which
+# ElementTree always writes with double quoted attributes
+_ID_REFERENCE = re.compile(r"""\bid="|\bhref="#|url\(['"]?#""")
+
+# Parsed SVG piece folders keyed by absolute path
+svg_piece_cache: LRUCache[SvgPieces] = LRUCache(max_entries=32)
+_registered_caches["svg_piece_cache"] = svg_piece_cache
+
+# Base64 PNG data of raster pieces by resized piece dictionary and piece
+svg_png_cache: IdentityCache[str] = IdentityCache(
+    max_entries=256, max_bytes=16 * 1024 * 1024
+)
+_registered_caches["svg_png_cache"] = svg_png_cache
+
+
+def _strip_namespace(element: ET.Element) -> None:
+    """Remove the SVG namespace from an element tree, in place."""
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.tag.startswith("{" + _SVG_NAMESPACE + "}"):
+            node.tag = node.tag[len(_SVG_NAMESPACE) + 2:]
+
+
+def _parse_svg_piece(path: str) -> Tuple[str, str]:
+    """Read an SVG file into its viewBox and the markup of its children.
+
+    Raises:
+        ValueError: If the file is not an SVG document or has neither a
+            viewBox nor a width and height.
+    """
+    root = ET.parse(path).getroot()
+    _strip_namespace(root)
+    if root.tag != "svg":
+        raise ValueError(f"{path} is not an SVG document")
+    view_box = root.get("viewBox")
+    if view_box is None:
+        width, height = root.get("width"), root.get("height")
+        if width is None or height is None:
+            raise ValueError(f"{path} has no viewBox, width or height")
+        view_box = f"0 0 {width.rstrip('px')} {height.rstrip('px')}"
+    markup = "".join(ET.tostring(child, encoding="unicode") for child in root)
+    return view_box, markup
+
+
+def _scope_ids(markup: str, prefix: str) -> str:
+    """Prefix the ids in SVG piece markup and every reference to them.
+
+    Args:
+        markup: The markup of an SVG piece, from load_pieces_svg().
+        prefix: The prefix for its ids, unique to the piece and document.
+
+    Returns:
+        The markup with ``id`` attributes, ``href="#..."`` links and
+        ``url(#...)`` references rewritten.
+    """
+    return _ID_REFERENCE.sub(lambda match: match.group(0) + prefix, markup)
+
+
+def load_pieces_svg(path: str, cache: bool = True) -> SvgPieces:
+    """Load a folder of SVG piece images for fen_to_svg().
+
+    The folder has the same layout as for load_pieces_folder(), with .svg
+    files instead of .png files.
+
+    Args:
+        path: Path to the folder containing 'white' and 'black' subfolders.
+        cache: Whether to cache the parsed pieces for reuse.
+
+    Returns:
+        A dictionary mapping piece characters to their viewBox and markup.
+
+    Raises:
+        ValueError: If a file is not a usable SVG document.
+
+    Example:
+        ```python
+        pieces = load_pieces_svg("./pieces_svg")
+        svg = fen_to_svg(fen, 45, pieces, "#D18B47", "#FFCE9E")
+        ```
+    """
+    key = os.path.abspath(path)
+    pieces = svg_piece_cache.get(key)
+    if pieces is None:
+        pieces = {
+            piece: _parse_svg_piece(os.path.join(path, color, name + ".svg"))
+            for piece, (color, name) in _PIECE_FILES.items()
+        }
+        if cache:
+            svg_piece_cache.put(key, pieces)
+    return pieces
+
+
+def _png_data(piece_images: PieceImages, piece: str) -> str:
+    """Return a raster piece as base64 PNG data, cached per piece set."""
+    cached = svg_png_cache.get(piece_images, piece)
+    if cached is not None:
+        return cached
+    output = io.BytesIO()
+    piece_images[piece].save(output, "PNG", optimize=True)
+    data = base64.b64encode(output.getvalue()).decode("ascii")
+    svg_png_cache.put(piece_images, data, piece)
+    return data
+
+
+def _number(value: float) -> str:
+    """Format a coordinate without a trailing .0."""
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _arrow_path(start: BoardPosition, end: BoardPosition, square_length: int, head: float) -> str:
+    """Build the path of an arrow shaft, stopping where its head starts.
+
+    Knight moves bend once, first along their longer side. Other arrows
+    are straight lines between square centers. An arrow that starts and
+    ends on the same square points up across it, as the arrow sprites of
+    fen_to_image draw it.
+    """
+
+    def center(square: Tuple[float, float]) -> Tuple[float, float]:
+        return ((square[0] + 0.5) * square_length, (square[1] + 0.5) * square_length)
+
+    delta_x, delta_y = end[0] - start[0], end[1] - start[1]
+    points = [center(start)]
+    tip = center(end)
+    if start == end:
+        points = [(tip[0], tip[1] + square_length / 2)]
+        tip = (tip[0], tip[1] - square_length / 2)
+    elif {abs(delta_x), abs(delta_y)} == {1, 2}:
+        corner = (end[0], start[1]) if abs(delta_x) > abs(delta_y) else (start[0], end[1])
+        points.append(center(corner))
+    last = points[-1]
+    length = math.hypot(tip[0] - last[0], tip[1] - last[1])
+    ratio = (length - head) / length
+    points.append((last[0] + (tip[0] - last[0]) * ratio, last[1] + (tip[1] - last[1]) * ratio))
+    return "M" + " L".join(f"{_number(x)},{_number(y)}" for x, y in points)
+
+
+def fen_to_svg(
+    fen: str,
+    square_length: int,
+    piece_set: Union[Callable[[Image.Image], PieceImages], Mapping[str, Tuple[str, str]]],
+    dark_color: str,
+    light_color: str,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    arrow_color: str = "#15781B",
+    id_prefix: str = "",
+) -> str:
+    """Generate an SVG document of a chess position.
+
+    Takes the options of fen_to_image, except that arrows are drawn as
+    vector paths in ``arrow_color`` rather than from an arrow set.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in user units. The
+            document is 8 * square_length wide and high, and scales freely.
+        piece_set: Either a piece loader function from load_pieces_folder(),
+            whose images are embedded as PNG, or SVG pieces from
+            load_pieces_svg().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrows: Optional list of arrows to draw; see fen_to_image.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates. The
+            labels are placed with the configured font's metrics and drawn
+            as text in that font's family.
+        arrow_color: The arrow color as a hex string.
+        id_prefix: Prefix for the element ids in the document, to keep them
+            unique when several boards are inlined in one HTML page. Ids
+            inside SVG pieces, such as gradients and clip paths, are also
+            prefixed with the piece symbol's id, so pieces cannot clash
+            with each other either. Ids referenced from CSS in a piece's
+            <style> element are not rewritten.
+
+    Returns:
+        The SVG document as a string.
+
+    Raises:
+        ValueError: If the piece placement field of ``fen`` is malformed or
+            an arrow is neither a knight move nor a straight or diagonal
+            line, as for fen_to_image.
+
+    Example:
+        ```python
+        svg = fen_to_svg(fen, 45, load_pieces_folder("./pieces"), "#D18B47", "#FFCE9E")
+        ```
+    """
+    position = Position.from_fen(fen)
+    if flipped:
+        position = position.flipped()
+    size = square_length * 8
+    length = _number(square_length)
+    parts = [
+        f'<svg xmlns="{_SVG_NAMESPACE}" xmlns:xlink="{_XLINK_NAMESPACE}" '
+        f'width="{size}" height="{size}" viewBox="0 0 {size} {size}">',
+        "<defs>",
+        # Light squares are the background; the pattern tile holds the two
+        # dark squares of a 2x2 block
+        f'<pattern id="{id_prefix}board" width="{square_length * 2}" '
+        f'height="{square_length * 2}" patternUnits="userSpaceOnUse">'
+        f'<rect x="{length}" width="{length}" height="{length}" fill={quoteattr(dark_color)}/>'
+        f'<rect y="{length}" width="{length}" height="{length}" fill={quoteattr(dark_color)}/>'
+        "</pattern>",
+    ]
+
+    pieces = sorted(set(position.board.decode("ascii")) - {" "})
+    if callable(piece_set):
+        piece_images = piece_set(Image.new("RGB", (size, size), None))
+        for piece in pieces:
+            parts.append(
+                f'<symbol id="{id_prefix}{piece}" viewBox="0 0 {length} {length}">'
+                f'<image width="{length}" height="{length}" '
+                f'xlink:href="data:image/png;base64,{_png_data(piece_images, piece)}"/></symbol>'
+            )
+    else:
+        for piece in pieces:
+            view_box, markup = piece_set[piece]
+            markup = _scope_ids(markup, f"{id_prefix}{piece}-")
+            parts.append(f'<symbol id="{id_prefix}{piece}" viewBox="{view_box}">{markup}</symbol>')
+
+    normalized_arrows = _normalize_arrows(arrows, flipped)
+    if normalized_arrows:
+        _check_arrows(normalized_arrows)
+        # The head is drawn 2.5 shaft widths long, in stroke width units
+        parts.append(
+            f'<marker id="{id_prefix}arrowhead" viewBox="0 0 10 10" refX="0" refY="5" '
+            f'markerWidth="2.5" markerHeight="2.5" orient="auto">'
+            f'<path d="M0,0 L10,5 L0,10 z" fill={quoteattr(arrow_color)}/></marker>'
+        )
+    parts.append("</defs>")
+
+    parts.append(f'<rect width="{size}" height="{size}" fill={quoteattr(light_color)}/>')
+    parts.append(f'<rect width="{size}" height="{size}" fill="url(#{id_prefix}board)"/>')
+
+    move = _normalize_last_move(last_move, flipped)
+    if move is not None:
+        for key in ("before", "after"):
+            x, y = move[key]  # type: ignore
+            color = move["lightColor"] if _is_light_square((x, y)) else move["darkColor"]
+            parts.append(
+                f'<rect x="{x * square_length}" y="{y * square_length}" width="{length}" '
+                f'height="{length}" fill={quoteattr(color)}/>'
+            )
+
+    if coordinates is not None:
+        font, labels = _layout_coordinates(coordinates, square_length)
+        size_attr = 1 if coordinates["size"] is None else coordinates["size"]
+        family, style = font.getname() if hasattr(font, "getname") else ("sans-serif", "")
+        # Pillow places text by the top of its ascender; SVG by its baseline
+        ascent = font.getmetrics()[0] if hasattr(font, "getmetrics") else size_attr
+        weight = ' font-weight="bold"' if style and "Bold" in style else ""
+        parts.append(
+            f"<g font-family={quoteattr(family or 'sans-serif')} font-size=\"{size_attr}\"{weight} "
+            f"fill={quoteattr(coordinates['dark_color'])}>"
+        )
+        for _, text in labels:
+            x, y = text["coordinate"]
+            parts.append(
+                f'<text x="{_number(x)}" y="{_number(y + ascent)}">{escape(text["text"])}</text>'
+            )
+        parts.append("</g>")
+
+    for (x, y), piece in position.pieces():
+        parts.append(
+            f'<use xlink:href="#{id_prefix}{piece}" x="{x * square_length}" '
+            f'y="{y * square_length}" width="{length}" height="{length}"/>'
+        )
+
+    if normalized_arrows:
+        width = square_length * 0.2
+        parts.append(
+            f'<g fill="none" stroke={quoteattr(arrow_color)} stroke-width="{_number(width)}" '
+            f'stroke-linejoin="round" opacity="0.8">'
+        )
+        for start, end in normalized_arrows:
+            path = _arrow_path(start, end, square_length, width * 2.5)
+            parts.append(f'<path d="{path}" marker-end="url(#{id_prefix}arrowhead)"/>')
+        parts.append("</g>")
+
+    parts.append("</svg>")
+    return "".join(parts)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""Band by band rendering of very large boards.
+
+fen_to_image() allocates the whole board at once, which for print sizes
+(a square_length of 512 gives a 4096 pixel board) means tens of
+megabytes per image. render_bands() produces the same board as horizontal
+bands, painting only the squares, labels, pieces and arrows that cross
+each band, and write_png_bands() streams the bands into a PNG file. Peak
+memory is then bounded by the band size and the cached piece and arrow
+images, not by the output size.
+
+Example:
+    ```python
+    from fentoboardimage import load_pieces_folder, render_bands, write_png_bands
+
+    pieces = load_pieces_folder("./pieces512")
+    with open("poster.png", "wb") as f:
+        write_png_bands(f, render_bands(fen, 512, pieces, "#D18B47", "#FFCE9E"), (4096, 4096))
+    ```
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .fen_parser import Position
+from .main import (
+    ArrowImages,
+    ArrowInput,
+    BoardPosition,
+    Coordinates,
+    LastMove,
+    PieceImages,
+    _arrow_overlay,
+    _arrow_sprites,
+    _coordinate_layer,
+    _find_piece_alphas,
+    _is_light_square,
+    _normalize_arrows,
+    _normalize_last_move,
+)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Compressed image data is written out in chunks of about this many bytes
+_IDAT_SIZE = 1 << 16
+
+
+def render_bands(
+    fen: str,
+    square_length: int,
+    piece_set: Callable[[Image.Image], PieceImages],
+    dark_color: str,
+    light_color: str,
+    arrow_set: Optional[Callable[[Image.Image], ArrowImages]] = None,
+    arrows: Optional[List[ArrowInput]] = None,
+    flipped: bool = False,
+    last_move: Optional[LastMove] = None,
+    coordinates: Optional[Coordinates] = None,
+    band_height: Optional[int] = None,
+) -> Iterator[Image.Image]:
+    """Render a chess position as horizontal bands, top to bottom.
+
+    Stacking the bands gives the image fen_to_image returns with the same
+    options, pixel for pixel. Each band builds only its rows of the arrow
+    overlay.
+
+    Args:
+        fen: A FEN string representing the chess position.
+        square_length: The length of each square in pixels.
+        piece_set: A piece loader function from load_pieces_folder().
+        dark_color: The color for dark squares as a hex string.
+        light_color: The color for light squares as a hex string.
+        arrow_set: Optional arrow loader function from load_arrows_folder().
+        arrows: Optional list of arrows to draw; see fen_to_image.
+        flipped: If True, render the board from black's perspective.
+        last_move: Optional dictionary for highlighting the last move.
+        coordinates: Optional configuration for drawing coordinates.
+        band_height: The height of each band in pixels. Defaults to one
+            rank. The last band is shorter if it does not divide the board.
+
+    Yields:
+        RGB PIL Images, each as wide as the board.
+
+    Raises:
+        ValueError: If ``band_height`` is not positive or the piece
+            placement field of ``fen`` is malformed.
+    """
+    if band_height is None:
+        band_height = square_length
+    if band_height < 1:
+        raise ValueError(f"band_height must be positive, got {band_height}")
+    size = square_length * 8
+    position = Position.from_fen(fen)
+    if flipped:
+        position = position.flipped()
+
+    # Loaders only read the board size. An image created without a color
+    # is never written, so its memory is not committed.
+    probe = Image.new("RGB", (size, size), None)
+    piece_images = piece_set(probe)
+    piece_alphas = _find_piece_alphas(piece_images)
+    sprites: List[Tuple[Image.Image, BoardPosition]] = []
+    normalized_arrows = _normalize_arrows(arrows, flipped)
+    if arrow_set is not None and normalized_arrows is not None:
+        sprites = _arrow_sprites(size, normalized_arrows, arrow_set(probe))
+    highlights = {}
+    move = _normalize_last_move(last_move, flipped)
+    if move is not None:
+        for key in ("before", "after"):
+            square: BoardPosition = move[key]  # type: ignore
+            light = _is_light_square(square)
+            highlights[square] = move["lightColor"] if light else move["darkColor"]
+    labels = [] if coordinates is None else _coordinate_layer(coordinates, square_length)
+    label_color = None if coordinates is None else coordinates["dark_color"]
+
+    for top in range(0, size, band_height):
+        bottom = min(top + band_height, size)
+        band = Image.new("RGB", (size, bottom - top), light_color)
+        ranks = range(top // square_length, (bottom - 1) // square_length + 1)
+        for y in ranks:
+            box_top = max(y * square_length, top) - top
+            box_bottom = min((y + 1) * square_length, bottom) - top
+            for x in range(8):
+                color = highlights.get((x, y))
+                if color is None and not _is_light_square((x, y)):
+                    color = dark_color
+                if color is not None:
+                    box = (x * square_length, box_top, (x + 1) * square_length, box_bottom)
+                    band.paste(color, box)
+        for corner, mask in labels:
+            if corner[1] < bottom and corner[1] + mask.height > top:
+                band.paste(label_color, (corner[0], corner[1] - top), mask)
+        for y in ranks:
+            for x in range(8):
+                piece = position[x, y]
+                if piece == " ":
+                    continue
+                image = piece_images[piece]
+                if piece_alphas is not None and piece in piece_alphas:
+                    alpha = piece_alphas[piece]
+                else:
+                    alpha = image.getchannel("A")
+                band.paste(image, (x * square_length, y * square_length - top), alpha)
+        overlay = _arrow_overlay(sprites, (top, bottom))
+        if overlay is not None:
+            image, corner = overlay
+            band.paste(image, (corner[0], corner[1] - top), image)
+        yield band
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    """Frame PNG chunk data with its length and checksum."""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png_bands(
+    fp: BinaryIO,
+    bands: Iterable[Image.Image],
+    size: Tuple[int, int],
+    compress_level: int = 6,
+) -> None:
+    """Stream horizontal image bands into a PNG file.
+
+    Each band is compressed and written as soon as it arrives, so only one
+    band is held in memory at a time. Rows are stored unfiltered, which
+    compresses the flat squares of a board well but makes photographic
+    pieces larger than Pillow's adaptively filtered PNGs.
+
+    Args:
+        fp: A binary file object to write to.
+        bands: RGB images as wide as the image, top to bottom, such as
+            those from render_bands().
+        size: The (width, height) of the whole image.
+        compress_level: The zlib compression level, 0-9.
+
+    Raises:
+        ValueError: If a band is not RGB, has the wrong width, or the
+            bands do not add up to the image height.
+    """
+    width, height = size
+    fp.write(_PNG_SIGNATURE)
+    # 8 bit RGB, the only compression and filter methods, no interlacing
+    fp.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+    compressor = zlib.compressobj(compress_level)
+    pending = bytearray()
+    rows = 0
+    stride = width * 3
+    for band in bands:
+        if band.mode != "RGB" or band.width != width:
+            raise ValueError(f"Expected RGB bands {width} pixels wide, got {band.mode} {band.size}")
+        rows += band.height
+        if rows > height:
+            raise ValueError(f"Bands are taller than the image height of {height}")
+        raw = band.tobytes()
+        # Every row starts with its filter type, 0 for none
+        filtered = b"".join(
+            b"\0" + raw[offset:offset + stride] for offset in range(0, len(raw), stride)
+        )
+        pending += compressor.compress(filtered)
+        if len(pending) >= _IDAT_SIZE:
+            fp.write(_png_chunk(b"IDAT", bytes(pending)))
+            pending.clear()
+    if rows != height:
+        raise ValueError(f"Bands cover {rows} rows, expected {height}")
+    pending += compressor.flush()
+    fp.write(_png_chunk(b"IDAT", bytes(pending)))
+    fp.write(_png_chunk(b"IEND", b""))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+"""Vectorized bulk FEN parsing with NumPy.
+
+Parsing FENs one at a time costs a few microseconds of interpreter work per
+position. For datasets of millions of positions, parse_many() and
+parse_batch() parse a whole list at once: the FENs are joined into a single
+byte buffer and every step, from digit expansion to validation, runs as a
+NumPy array operation.
+
+NumPy is an optional dependency, installed with the ``numpy`` extra.
+
+Example:
+    ```python
+    from fentoboardimage.vectorized import parse_batch
+
+    batch = parse_batch(fens)
+    batch.boards.shape  # (len(fens), 8, 8)
+    batch.white_to_move[:3]
+    # Output: array([ True, False,  True])
+    ```
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore
+
+if TYPE_CHECKING:
+    import numpy
+
+_EMPTY = ord(" ")
+_SPACE = _EMPTY
+_NEWLINE = ord("\n")
+_SLASH = ord("/")
+_INVALID = 255
+
+CASTLING_ORDER = "KQkq"
+"""The column order of FenBatch.castling."""
+
+
+class FenBatch(NamedTuple):
+    """The parsed fields of a batch of FENs.
+
+    Attributes:
+        boards: uint8 array of shape (N, 8, 8) holding the ASCII code of the
+            piece on each square, or 32 (a space) for an empty square.
+            Rows run from rank 8 to rank 1, as in FEN and Position, so
+            ``boards[i].tobytes() == Position.from_fen(fens[i]).board``.
+        white_to_move: bool array of shape (N,).
+        castling: bool array of shape (N, 4) with the K, Q, k and q rights.
+        en_passant: int8 array of shape (N,) holding the en passant target
+            as a square index (y * 8 + x, with y = 0 on rank 8), or -1.
+    """
+
+    boards: "numpy.ndarray"
+    white_to_move: "numpy.ndarray"
+    castling: "numpy.ndarray"
+    en_passant: "numpy.ndarray"
+
+
+def _require_numpy(feature: str = "fentoboardimage.vectorized") -> None:
+    """Raise an informative error if NumPy is not installed.
+
+    Args:
+        feature: What needs NumPy, named in the error message.
+    """
+    if np is None:
+        raise ImportError(
+            f"{feature} requires NumPy; install it with "
+            "'pip install fentoboardimage[numpy]'"
+        )
+
+
+def _lookup_tables() -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """Build the per-byte lookup tables used by _parse().
+
+    Returns:
+        The number of squares each placement byte covers (_INVALID for bytes
+        that cannot appear in a placement), and the square value each byte
+        expands to (a space for digits).
+    """
+    widths = np.full(256, _INVALID, dtype=np.uint8)
+    squares = np.arange(256, dtype=np.uint8)
+    for piece in b"kqbnrpKQBNRP":
+        widths[piece] = 1
+    for digit in range(1, 9):
+        widths[ord(str(digit))] = digit
+        squares[ord(str(digit))] = _EMPTY
+    widths[_SLASH] = 0
+    return widths, squares
+
+
+if np is not None:
+    _WIDTHS, _SQUARES = _lookup_tables()
+
+
+def _raise_invalid(fens: Sequence[str], invalid: "numpy.ndarray") -> None:
+    """Raise a ValueError naming the first FEN flagged in ``invalid``."""
+    index = int(np.argmax(invalid))
+    raise ValueError(f"Invalid FEN piece placement at index {index}: {fens[index]!r}")
+
+
+def _parse(fens: Sequence[str], with_state: bool) -> FenBatch:
+    """Parse a batch of FENs; see parse_batch()."""
+    _require_numpy()
+    count = len(fens)
+    white_to_move = np.ones(count, dtype=bool)
+    castling = np.zeros((count, 4), dtype=bool)
+    en_passant = np.full(count, -1, dtype=np.int8)
+    if count == 0:
+        return FenBatch(np.empty((0, 8, 8), dtype=np.uint8), white_to_move, castling, en_passant)
+
+    data = np.frombuffer(("\n".join(fens) + "\n").encode("ascii"), dtype=np.uint8)
+    ends = np.flatnonzero(data == _NEWLINE)
+    if len(ends) != count:
+        raise ValueError("FEN strings must not contain newlines")
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Start of the n-th space separated field of each line, or its end
+    spaces = np.flatnonzero(data == _SPACE)
+    first_space = np.searchsorted(spaces, starts)
+
+    def separator(n: int) -> "numpy.ndarray":
+        index = first_space + n
+        found = np.full(count, len(data), dtype=np.int64)
+        in_range = index < len(spaces)
+        found[in_range] = spaces[index[in_range]]
+        return np.minimum(found, ends)
+
+    placement_end = separator(0)
+    lengths = placement_end - starts
+    if not lengths.all():
+        _raise_invalid(fens, lengths == 0)
+    # Mark the placement bytes: +1 at each start, -1 at each end
+    marks = np.zeros(len(data), dtype=np.int8)
+    marks[starts] = 1
+    marks[placement_end] = -1
+    chars = data[np.cumsum(marks, dtype=np.int8).view(bool)]
+
+    widths = _WIDTHS[chars]
+    line_ends = np.cumsum(lengths)
+    bad = np.flatnonzero(widths == _INVALID)
+    if len(bad):
+        invalid = np.zeros(count, dtype=bool)
+        invalid[np.searchsorted(line_ends, bad, side="right")] = True
+        _raise_invalid(fens, invalid)
+    # Each placement must be eight ranks of eight squares. Split the
+    # placements at their starts and slashes, and check the width of every
+    # segment and the number of segments and slashes per placement.
+    slashes = np.flatnonzero(chars == _SLASH)
+    rank_starts = np.union1d(line_ends - lengths, slashes)
+    rank_widths = np.add.reduceat(widths, rank_starts, dtype=np.int64)
+    rank_lines = np.searchsorted(line_ends, rank_starts, side="right")
+    invalid = np.bincount(rank_lines, minlength=count) != 8
+    invalid |= np.bincount(np.searchsorted(line_ends, slashes, side="right"), minlength=count) != 7
+    invalid[rank_lines[rank_widths != 8]] = True
+    if invalid.any():
+        _raise_invalid(fens, invalid)
+    boards = _SQUARES[np.repeat(chars, widths)].reshape(count, 8, 8)
+
+    if with_state:
+        side = placement_end + 1
+        present = side < ends
+        white_to_move[present] = data[side[present]] == ord("w")
+        rights_start = separator(1) + 1
+        rights_end = separator(2)
+        for offset in range(4):
+            index = rights_start + offset
+            present = index < rights_end
+            values = data[index[present]]
+            for column, right in enumerate(CASTLING_ORDER):
+                castling[present, column] |= values == ord(right)
+        target = separator(2) + 1
+        present = target + 1 < separator(3)
+        target = target[present]
+        files = data[target].astype(np.int64) - ord("a")
+        ranks = data[target + 1].astype(np.int64) - ord("1")
+        valid = (files >= 0) & (files < 8) & (ranks >= 0) & (ranks < 8)
+        en_passant[np.flatnonzero(present)[valid]] = (7 - ranks[valid]) * 8 + files[valid]
+
+    return FenBatch(boards, white_to_move, castling, en_passant)
+
+
+def parse_many(fens: Sequence[str]) -> "numpy.ndarray":
+    """Parse the piece placement of many FENs into one array.
+
+    Args:
+        fens: FEN strings, or just their piece placement fields.
+
+    Returns:
+        A uint8 array of shape (N, 8, 8) holding the ASCII code of the
+        piece on each square, or 32 for an empty square. Map it to piece
+        indices with a 256-entry lookup table, e.g. ``table[boards]``.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If a piece placement is malformed.
+    """
+    return _parse(fens, with_state=False).boards
+
+
+def parse_batch(fens: Sequence[str]) -> FenBatch:
+    """Parse the placement, side to move, castling and en passant fields.
+
+    Fields missing from a FEN default to white to move, no castling rights
+    and no en passant target.
+
+    Args:
+        fens: FEN strings.
+
+    Returns:
+        A FenBatch of arrays with one entry per FEN.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If a piece placement is malformed.
+    """
+    return _parse(fens, with_state=True)
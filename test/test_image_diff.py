@@ -1,3 +1,5 @@
+import io
+import tempfile
 import unittest
 import os
 import sys
@@ -6,10 +8,27 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from fentoboardimage import (
     fen_to_image,
+    fen_to_images,
+    render_into,
+    render_sheet,
+    render_bands,
+    write_png_bands,
+    load_font_file,
+    coordinate_position_fn,
+    GameRenderer,
+    game_to_animation,
+    uci_to_animation,
+    positions_from_uci,
+    render_many,
+    fen_to_png_bytes,
+    fen_to_webp_bytes,
     load_pieces_folder,
+    load_pieces_atlas,
+    save_pieces_atlas,
     load_arrows_folder,
 )
 from PIL import Image
+from PIL import features
 from PIL import ImageChops
 
 # Get the directory containing this test file
@@ -323,5 +342,504 @@ class TestFenToBoardImage(unittest.TestCase):
         self.assertTrue(images_are_close(arrows_flipped, i2))
 
 
+class TestFenToImages(unittest.TestCase):
+    def test_matches_fen_to_image(self):
+        fens = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44",
+            "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7",
+        ]
+        options = dict(
+            square_length=60,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#909090",
+            light_color="#fffefe",
+            arrow_set=load_arrows_folder(_test_path("arrows1")),
+            flipped=True,
+            last_move={
+                "before": "a1",
+                "after": "g7",
+                "darkColor": "#a9a238",
+                "lightColor": "#cdd269",
+            },
+        )
+        arrows = [["e2", "e4"], ["g1", "f3"], ["a1", "h8"]]
+        batch = list(fen_to_images(fens, arrows=arrows, **options))
+        self.assertEqual(len(batch), len(fens))
+        for fen, image in zip(fens, batch):
+            single = fen_to_image(fen=fen, arrows=arrows, **options)
+            self.assertEqual(ImageChops.difference(single, image).getbbox(), None)
+        # The caller's arrows and last move are not modified
+        self.assertEqual(arrows, [["e2", "e4"], ["g1", "f3"], ["a1", "h8"]])
+        self.assertEqual(options["last_move"]["before"], "a1")
+
+    def test_reference_board(self):
+        (image,) = fen_to_images(
+            ["8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44"],
+            square_length=125,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#79a65d",
+            light_color="#daf2cb",
+        )
+        image2 = Image.open(_test_path("boards/board1.png"))
+        self.assertEqual(ImageChops.difference(image, image2).getbbox(), None)
+
+    def test_numpy_engine_matches_pillow(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        fens = [
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44",
+        ]
+        for square_length, flipped in ((37, False), (60, True)):
+            options = dict(
+                square_length=square_length,
+                piece_set=load_pieces_folder(_test_path("pieces")),
+                dark_color="#909090",
+                light_color="#fffefe",
+                arrow_set=load_arrows_folder(_test_path("arrows1")),
+                arrows=[["e2", "e4"], ["g1", "f3"], ["a1", "h8"], ["h1", "h8"]],
+                flipped=flipped,
+            )
+            expected = fen_to_images(fens, **options)
+            images = fen_to_images(fens, engine="numpy", **options)
+            for image, reference in zip(images, expected):
+                self.assertEqual(ImageChops.difference(image, reference).getbbox(), None)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            fen_to_image(
+                fen="8/8/8/8/8/8/8/8 w - - 0 1",
+                square_length=20,
+                piece_set=load_pieces_folder(_test_path("pieces")),
+                dark_color="#909090",
+                light_color="#fffefe",
+                engine="cairo",
+            )
+
+
+class TestRenderInto(unittest.TestCase):
+    fen = "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7"
+
+    def options(self):
+        return dict(
+            square_length=30,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#D18B47",
+            light_color="#FFCE9E",
+            arrow_set=load_arrows_folder(_test_path("arrows1")),
+            arrows=[["e2", "e4"], ["g1", "f3"]],
+            last_move={
+                "before": "e2",
+                "after": "e4",
+                "darkColor": "#a9a238",
+                "lightColor": "#cdd269",
+            },
+        )
+
+    def test_matches_fen_to_image(self):
+        expected = fen_to_image(fen=self.fen, **self.options())
+        for mode in ("RGB", "RGBA"):
+            canvas = Image.new(mode, (300, 280), "#123456")
+            self.assertIs(render_into(canvas, (17, 23), self.fen, **self.options()), canvas)
+            board = canvas.crop((17, 23, 257, 263)).convert("RGB")
+            self.assertEqual(ImageChops.difference(board, expected).getbbox(), None)
+            # Pixels outside the board are untouched
+            self.assertEqual(canvas.getpixel((16, 23))[:3], (0x12, 0x34, 0x56))
+            self.assertEqual(canvas.getpixel((257, 262))[:3], (0x12, 0x34, 0x56))
+
+    def test_numpy_canvas(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        expected = fen_to_image(fen=self.fen, **self.options())
+        canvas = np.zeros((250, 260, 3), dtype=np.uint8)
+        render_into(canvas, (20, 10), self.fen, **self.options())
+        board = Image.fromarray(canvas[10:250, 20:260])
+        self.assertEqual(ImageChops.difference(board, expected).getbbox(), None)
+        self.assertFalse(canvas[:10].any())
+        self.assertFalse(canvas[:, :20].any())
+
+    def test_board_must_fit(self):
+        with self.assertRaises(ValueError):
+            render_into(Image.new("RGB", (250, 250)), (20, 20), self.fen, **self.options())
+        with self.assertRaises(ValueError):
+            render_into(Image.new("L", (250, 250)), (0, 0), self.fen, **self.options())
+
+
+class TestRenderSheet(unittest.TestCase):
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44",
+        "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7",
+    ]
+    options = dict(
+        square_length=20,
+        piece_set=load_pieces_folder(_test_path("pieces")),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+    )
+
+    def test_diagrams_match_fen_to_image(self):
+        (page,) = render_sheet(self.fens, columns=2, gutter=10, **self.options)
+        # Two rows of two 160px slots with 10px gutters
+        self.assertEqual(page.size, (350, 350))
+        for index, fen in enumerate(self.fens):
+            left = 10 + (index % 2) * 170
+            top = 10 + (index // 2) * 170
+            board = page.crop((left, top, left + 160, top + 160))
+            expected = fen_to_image(fen=fen, **self.options)
+            self.assertEqual(ImageChops.difference(board, expected).getbbox(), None)
+        # The empty fourth slot shows the page background
+        self.assertEqual(page.getpixel((250, 250)), (255, 255, 255))
+
+    def test_pages_and_captions(self):
+        pages = list(
+            render_sheet(
+                iter(self.fens),
+                columns=1,
+                gutter=10,
+                captions=["First", None, "Third"],
+                caption_font=load_font_file(_test_path("fonts/Roboto-Bold.ttf")),
+                caption_size=14,
+                page_size=(200, 400),
+                **self.options,
+            )
+        )
+        # Each row is a board and a caption, so two rows fit on a page
+        self.assertEqual([page.size for page in pages], [(200, 400), (200, 400)])
+        caption = pages[0].crop((20, 170, 180, 190))
+        self.assertNotEqual(caption.getextrema()[0], (255, 255))
+        blank = pages[0].crop((20, 370, 180, 390))
+        self.assertEqual(blank.getextrema()[0], (255, 255))
+
+    def test_rejects_bad_layouts(self):
+        with self.assertRaises(ValueError):
+            list(render_sheet(self.fens, columns=0, **self.options))
+        with self.assertRaises(ValueError):
+            list(render_sheet(self.fens, columns=3, page_size=(300, 1000), **self.options))
+        with self.assertRaises(ValueError):
+            list(render_sheet(self.fens, captions=["Only one"], **self.options))
+
+
+class TestRenderBands(unittest.TestCase):
+    fen = "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7"
+
+    def options(self):
+        return dict(
+            square_length=37,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#D18B47",
+            light_color="#FFCE9E",
+            arrow_set=load_arrows_folder(_test_path("arrows1")),
+            arrows=[["e2", "e4"], ["g1", "f3"]],
+            flipped=True,
+            last_move={
+                "before": "e2",
+                "after": "e4",
+                "darkColor": "#a9a238",
+                "lightColor": "#cdd269",
+            },
+            coordinates={
+                "font": load_font_file(_test_path("fonts/Roboto-Bold.ttf")),
+                "size": 12,
+                "dark_color": "#000000",
+                "light_color": "#FFFFFF",
+                "position_fn": coordinate_position_fn["every_square"],
+            },
+        )
+
+    def test_bands_match_fen_to_image(self):
+        expected = fen_to_image(fen=self.fen, **self.options())
+        # One rank per band, bands splitting squares, and a single band
+        for band_height in (None, 7, 1000):
+            image = Image.new("RGB", expected.size)
+            top = 0
+            for band in render_bands(self.fen, band_height=band_height, **self.options()):
+                self.assertEqual(band.width, expected.width)
+                image.paste(band, (0, top))
+                top += band.height
+            self.assertEqual(top, expected.height)
+            self.assertEqual(ImageChops.difference(image, expected).getbbox(), None)
+
+    def test_overlapping_arrows_match_fen_to_image(self):
+        options = self.options()
+        options["arrows"] = [["a1", "h8"], ["h1", "a8"], ["d1", "d8"], ["a4", "h4"], ["c3", "d5"]]
+        expected = fen_to_image(fen=self.fen, **options)
+        for band_height in (None, 7):
+            image = Image.new("RGB", expected.size)
+            top = 0
+            for band in render_bands(self.fen, band_height=band_height, **options):
+                image.paste(band, (0, top))
+                top += band.height
+            self.assertEqual(ImageChops.difference(image, expected).getbbox(), None)
+
+    def test_streamed_png(self):
+        expected = fen_to_image(fen=self.fen, **self.options())
+        output = io.BytesIO()
+        write_png_bands(output, render_bands(self.fen, band_height=50, **self.options()), expected.size)
+        output.seek(0)
+        with Image.open(output) as image:
+            self.assertEqual(image.size, expected.size)
+            self.assertEqual(ImageChops.difference(image.convert("RGB"), expected).getbbox(), None)
+
+    def test_rejects_bad_bands(self):
+        with self.assertRaises(ValueError):
+            list(render_bands(self.fen, band_height=0, **self.options()))
+        bands = render_bands(self.fen, **self.options())
+        with self.assertRaises(ValueError):
+            write_png_bands(io.BytesIO(), bands, (296, 300))
+
+
+class TestRenderMany(unittest.TestCase):
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "8/5N2/4p2p/5p1k/1p4rP/1P2Q1P1/P4P1K/5q2 w - - 15 44",
+        "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7",
+        "8/8/8/4k3/8/8/4K3/8 w - - 0 1",
+        {"fen": "8/8/8/4k3/8/8/4K3/8 w - - 0 1", "flipped": True, "arrows": [["e2", "e5"]]},
+    ]
+    options = dict(
+        square_length=40,
+        piece_set=load_pieces_folder(_test_path("pieces")),
+        dark_color="#909090",
+        light_color="#fffefe",
+        arrow_set=load_arrows_folder(_test_path("arrows1")),
+    )
+
+    def _check(self, outputs):
+        self.assertEqual(len(outputs), len(self.fens))
+        for job, data in zip(self.fens, outputs):
+            job = {"fen": job} if isinstance(job, str) else job
+            expected = fen_to_image(**dict(self.options, **job))
+            image = Image.open(io.BytesIO(data))
+            self.assertEqual(image.format, "PNG")
+            self.assertEqual(ImageChops.difference(expected, image).getbbox(), None)
+
+    def test_in_process(self):
+        self._check(list(render_many(self.fens, **self.options)))
+
+    def test_process_pool(self):
+        self._check(list(render_many(self.fens, workers=2, chunksize=2, **self.options)))
+
+    def test_on_error_skips_failed_jobs(self):
+        bad = {"fen": self.fens[0], "arrows": [["a1", "b4"]]}
+        jobs = [self.fens[0], bad, self.fens[1], bad]
+        for workers in (1, 2):
+            failed = []
+            outputs = list(
+                render_many(
+                    jobs,
+                    workers=workers,
+                    chunksize=1,
+                    on_error=lambda index, error: failed.append(index),
+                    **self.options,
+                )
+            )
+            self.assertEqual(failed, [1, 3])
+            self.assertEqual(len(outputs), 2)
+        with self.assertRaises(ValueError):
+            list(render_many(jobs, **self.options))
+
+
+class TestEncodedBytes(unittest.TestCase):
+    options = dict(
+        fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        square_length=100,
+        piece_set=load_pieces_folder(_test_path("pieces")),
+        dark_color="#D18B47",
+        light_color="#FFCE9E",
+    )
+
+    def test_png_bytes(self):
+        data = fen_to_png_bytes(compress_level=1, **self.options)
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.format, "PNG")
+        self.assertEqual(image.mode, "RGB")
+        expected = Image.open(_test_path("boards/board2.png"))
+        self.assertEqual(ImageChops.difference(image, expected).getbbox(), None)
+
+    def test_palette_png_bytes(self):
+        rgb = fen_to_png_bytes(**self.options)
+        data = fen_to_png_bytes(palette=True, **self.options)
+        self.assertLess(len(data), len(rgb))
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.mode, "P")
+        expected = Image.open(_test_path("boards/board2.png"))
+        self.assertTrue(images_are_close(image.convert("RGB"), expected, tolerance=16, max_diff_pixels=0.01))
+
+    @unittest.skipUnless(features.check("webp"), "Pillow built without WebP")
+    def test_lossless_webp_bytes(self):
+        data = fen_to_webp_bytes(**self.options)
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.format, "WEBP")
+        expected = Image.open(_test_path("boards/board2.png"))
+        self.assertEqual(ImageChops.difference(image.convert("RGB"), expected).getbbox(), None)
+
+
+GAME_FENS = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", None),
+    ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", ("e2", "e4")),
+    ("rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq c6 0 2", ("c7", "c5")),
+    ("rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2", ("g1", "f3")),
+    ("rnbqkbnr/pp1ppppp/8/8/3pP3/5N2/PPP2PPP/RNBQKB1R w KQkq - 0 3", ("c5", "d4")),
+    ("rnbqkbnr/pp1ppppp/8/8/3NP3/8/PPP2PPP/RNBQKB1R b KQkq - 0 3", ("f3", "d4")),
+]
+
+
+class TestGameRenderer(unittest.TestCase):
+    def _check_game(self, **options):
+        renderer = GameRenderer(**options)
+        for index, (fen, move) in enumerate(GAME_FENS):
+            last_move = None
+            arrows = None
+            if move is not None:
+                last_move = {
+                    "before": move[0],
+                    "after": move[1],
+                    "darkColor": "#a9a238",
+                    "lightColor": "#cdd269",
+                }
+                arrows = [[move[0], move[1]]]
+            frame = renderer.render(fen, last_move=last_move, arrows=arrows)
+            expected = fen_to_image(fen=fen, last_move=last_move, arrows=arrows, **options)
+            self.assertTrue(images_are_close(frame, expected), f"frame {index} differs")
+            if index > 0:
+                self.assertLess(renderer.repainted, 8)
+
+    def test_frames_match_fen_to_image(self):
+        self._check_game(
+            square_length=50,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#909090",
+            light_color="#fffefe",
+            arrow_set=load_arrows_folder(_test_path("arrows1")),
+        )
+
+    def test_flipped_with_coordinates(self):
+        self._check_game(
+            square_length=50,
+            piece_set=load_pieces_folder(_test_path("pieces")),
+            dark_color="#909090",
+            light_color="#fffefe",
+            arrow_set=load_arrows_folder(_test_path("arrows1")),
+            flipped=True,
+            coordinates={
+                "font": load_font_file(_test_path("fonts/Roboto-Bold.ttf")),
+                "size": 12,
+                "dark_color": "#202020",
+                "light_color": "#f0f0f0",
+                "position_fn": coordinate_position_fn["every_square"],
+            },
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestAnimation(unittest.TestCase):
+    moves = ["e2e4", "c7c5", "g1f3", "d7d6", "f1b5", "b8c6", "e1g1"]
+    options = dict(
+        square_length=50,
+        piece_set=load_pieces_folder(_test_path("pieces")),
+        dark_color="#909090",
+        light_color="#fffefe",
+        arrow_set=load_arrows_folder(_test_path("arrows1")),
+    )
+
+    def test_positions_from_uci(self):
+        positions = list(positions_from_uci(self.moves))
+        self.assertEqual(positions[0], ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", ("e2", "e4")))
+        self.assertEqual(positions[-1][0], "r1bqkbnr/pp2pppp/2np4/1Bp5/4P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 3 4")
+        en_passant = list(positions_from_uci(["e5d6"], "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"))
+        self.assertEqual(en_passant[0][0], "4k3/8/3P4/8/8/8/8/4K3 b - - 0 1")
+        promotion = list(positions_from_uci(["a7a8n"], "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"))
+        self.assertEqual(promotion[0][0], "N3k3/8/8/8/8/8/8/4K3 b - - 0 1")
+        with self.assertRaises(ValueError):
+            list(positions_from_uci(["e3e4"]))
+
+    def test_positions_from_uci_invalid_moves(self):
+        for move in ("e2e9", "e2i4", "e2e0", "e2e4x", "e2e4k", "E2E4", "e2e"):
+            with self.subTest(move=move), self.assertRaises(ValueError):
+                list(positions_from_uci([move]))
+        promotion = list(positions_from_uci(["a7a8Q"], "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"))
+        self.assertEqual(promotion[0][0], "Q3k3/8/8/8/8/8/8/4K3 b - - 0 1")
+
+    def _check_animation(self, format, expected_format):
+        data = uci_to_animation(self.moves, format=format, **self.options)
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.format, expected_format)
+        self.assertEqual(image.n_frames, len(self.moves) + 1)
+        fen, (before, after) = list(positions_from_uci(self.moves))[3]
+        image.seek(4)
+        expected = fen_to_image(
+            fen=fen,
+            arrows=[[before, after]],
+            last_move={"before": before, "after": after, "darkColor": "#aaa23a", "lightColor": "#cdd26a"},
+            **self.options,
+        )
+        self.assertTrue(images_are_close(image.convert("RGB"), expected, tolerance=32, max_diff_pixels=0.01))
+
+    def test_gif(self):
+        self._check_animation("GIF", "GIF")
+
+    def test_apng(self):
+        self._check_animation("APNG", "PNG")
+
+    @unittest.skipUnless(features.check("webp"), "Pillow built without WebP")
+    def test_webp(self):
+        self._check_animation("WEBP", "WEBP")
+
+    def test_game_to_animation_errors(self):
+        with self.assertRaises(ValueError):
+            game_to_animation([], **self.options)
+        with self.assertRaises(ValueError):
+            game_to_animation(["8/8/8/8/8/8/8/8 w - - 0 1"], format="BMP", **self.options)
+        # Per-frame options must cover every frame
+        fens = ["8/8/8/8/8/8/8/8 w - - 0 1"] * 3
+        with self.assertRaises(ValueError):
+            game_to_animation(fens, last_moves=[None, None], **self.options)
+        with self.assertRaises(ValueError):
+            game_to_animation(fens, arrows=[None] * 4, **self.options)
+
+
+class TestPieceAtlas(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "pieces.png")
+        save_pieces_atlas(_test_path("pieces"), self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_pieces_folder(self):
+        for square_length in (37, 100):
+            expected = fen_to_image(
+                fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                square_length=square_length,
+                piece_set=load_pieces_folder(_test_path("pieces")),
+                dark_color="#D18B47",
+                light_color="#FFCE9E",
+            )
+            image = fen_to_image(
+                fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                square_length=square_length,
+                piece_set=load_pieces_atlas(self.path),
+                dark_color="#D18B47",
+                light_color="#FFCE9E",
+            )
+            self.assertEqual(ImageChops.difference(image, expected).getbbox(), None)
+
+    def test_pickle(self):
+        import pickle
+
+        pieces = pickle.loads(pickle.dumps(load_pieces_atlas(self.path)))
+        self.assertEqual(pieces(Image.new("RGB", (160, 160)))["K"].size, (20, 20))
+
+    def test_rejects_plain_png(self):
+        with self.assertRaises(ValueError):
+            load_pieces_atlas(_test_path("boards/board2.png"))
@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from fentoboardimage import (
     FenParser,
+    Position,
     square_to_indices,
     indices_to_square,
     flip_coord_tuple,
@@ -29,6 +30,7 @@ from fentoboardimage.main import (
     indicesToSquare,
     flipCoordTuple,
 )
+from fentoboardimage import main as fbi_main
 
 
 class TestFenParser:
@@ -280,6 +282,127 @@ class TestCoordinatePositionFunctions:
         assert len(result) == 2
 
 
+class TestPosition:
+    """Tests for the compact Position type."""
+
+    def test_matches_fen_parser(self):
+        """Test that a position holds the same squares as FenParser.parse()."""
+        fen = "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4"
+        position = Position.from_fen(fen)
+        assert position.to_list() == FenParser(fen).parse()
+        assert position == FenParser(fen).position()
+        assert position[5, 1] == "Q"
+        assert position[0, 2] == " "
+
+    def test_flipped(self):
+        """Test that flipping maps (x, y) to (7 - x, 7 - y)."""
+        position = Position.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        flipped = position.flipped()
+        for y in range(8):
+            for x in range(8):
+                assert flipped[7 - x, 7 - y] == position[x, y]
+        assert flipped.flipped() == position
+
+    def test_placement_round_trip(self):
+        """Test that placement() rebuilds the FEN piece placement field."""
+        placement = "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR"
+        assert Position.from_fen(placement).placement() == placement
+        assert Position.from_fen("8/8/8/8/8/8/8/8 w - - 0 1").placement() == "8/8/8/8/8/8/8/8"
+
+    def test_hashable(self):
+        """Test that positions differing only in game state fields are equal."""
+        first = Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        second = Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR b - - 5 9")
+        assert first == second
+        assert len({first, second}) == 1
+
+    def test_pieces(self):
+        """Test that pieces() yields only occupied squares."""
+        position = Position.from_fen("8/P7/8/8/8/8/p7/8 w - - 0 1")
+        assert list(position.pieces()) == [((0, 1), "P"), ((0, 6), "p")]
+
+    @pytest.mark.parametrize("fen", ["8/8/8/8/8/8/8", "9/8/8/8/8/8/8/8", "x7/8/8/8/8/8/8/8"])
+    def test_invalid_placement(self, fen):
+        """Test that malformed placements raise ValueError."""
+        with pytest.raises(ValueError):
+            Position.from_fen(fen)
+
+    @pytest.mark.parametrize(
+        "fen",
+        ["pppppppp1/7/8/8/8/8/8/8", "88/8/8/8/8/8/8", "/8/8/8/8/8/8/8/8", "8/8/8/8/8/8/8/8/"],
+    )
+    def test_rank_lengths(self, fen):
+        """Test that every rank must hold eight squares, not just the board."""
+        with pytest.raises(ValueError):
+            Position.from_fen(fen)
+
+
+class TestVectorizedParsing:
+    """Tests for bulk FEN parsing with NumPy."""
+
+    FENS = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+        "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b Kq - 0 4",
+        "8/8/8/8/8/8/8/8",
+    ]
+
+    def test_boards_match_position(self):
+        """Test that each board holds the same bytes as Position."""
+        pytest.importorskip("numpy")
+        from fentoboardimage.vectorized import parse_many
+
+        boards = parse_many(self.FENS)
+        assert boards.shape == (4, 8, 8)
+        assert str(boards.dtype) == "uint8"
+        for board, fen in zip(boards, self.FENS):
+            assert board.tobytes() == Position.from_fen(fen).board
+
+    def test_state_fields(self):
+        """Test side to move, castling rights and en passant arrays."""
+        pytest.importorskip("numpy")
+        from fentoboardimage.vectorized import parse_batch
+
+        batch = parse_batch(self.FENS)
+        assert batch.white_to_move.tolist() == [True, False, False, True]
+        assert batch.castling.tolist() == [
+            [True, True, True, True],
+            [True, True, True, True],
+            [True, False, False, True],
+            [False, False, False, False],
+        ]
+        # e3 is x=4, y=5
+        assert batch.en_passant.tolist() == [-1, 44, -1, -1]
+
+    def test_empty_input(self):
+        """Test that an empty list parses to empty arrays."""
+        pytest.importorskip("numpy")
+        from fentoboardimage.vectorized import parse_many
+
+        assert parse_many([]).shape == (0, 8, 8)
+
+    @pytest.mark.parametrize("fen", ["8/8/8/8/8/8/8", "9/8/8/8/8/8/8/8", "x7/8/8/8/8/8/8/8", " w - - 0 1"])
+    def test_invalid_placement(self, fen):
+        """Test that the index of a malformed FEN is reported."""
+        pytest.importorskip("numpy")
+        from fentoboardimage.vectorized import parse_many
+
+        with pytest.raises(ValueError, match="index 1"):
+            parse_many([self.FENS[0], fen, self.FENS[1]])
+
+    @pytest.mark.parametrize(
+        "fen",
+        ["pppppppp1/7/8/8/8/8/8/8", "88/8/8/8/8/8/8", "/8/8/8/8/8/8/8/8", "8/8/8/8/8/8/8/8/"],
+    )
+    def test_rank_lengths(self, fen):
+        """Test that a placement with a rank of the wrong length is reported."""
+        pytest.importorskip("numpy")
+        from fentoboardimage.vectorized import parse_many
+
+        with pytest.raises(ValueError, match="index 1"):
+            parse_many([self.FENS[0], fen, self.FENS[1]])
+
+
 class TestFenParserEdgeCases:
     """Edge case tests for FenParser."""
 
@@ -413,3 +536,985 @@ class TestDeprecatedAliases:
         assert "standard" in CoordinatePositionFn
         assert "every_square" in CoordinatePositionFn
         assert "along_outer_rim" in CoordinatePositionFn
+
+
+class TestCheckerBoardTemplate:
+    """Tests for the pre-rendered checkerboard template cache."""
+
+    def test_template_is_reused(self):
+        """Test that the same template is returned for the same key."""
+        first = fbi_main.checker_board_template(20, "#D18B47", "#FFCE9E")
+        second = fbi_main.checker_board_template(20, "#D18B47", "#FFCE9E")
+        assert first is second
+        assert first.size == (160, 160)
+
+    def test_template_matches_painted_board(self):
+        """Test that the template equals a freshly painted checkerboard."""
+        from PIL import Image, ImageChops
+
+        painted = fbi_main.paint_checker_board(
+            Image.new("RGB", (240, 240), "#FFCE9E"), "#D18B47"
+        )
+        template = fbi_main.checker_board_template(30, "#D18B47", "#FFCE9E")
+        assert ImageChops.difference(painted, template).getbbox() is None
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used templates are evicted."""
+        for size in range(1, fbi_main.CHECKER_BOARD_CACHE_SIZE + 5):
+            fbi_main.checker_board_template(size, "#000000", "#ffffff")
+        assert len(fbi_main._checker_board_cache) == fbi_main.CHECKER_BOARD_CACHE_SIZE
+        assert (1, "#000000", "#ffffff") not in fbi_main._checker_board_cache
+
+
+class TestLoaderPickling:
+    """Tests that loaders can be sent to worker processes."""
+
+    def test_loaders_round_trip(self):
+        """Test that piece, arrow and font loaders survive pickling."""
+        import pickle
+
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+        pieces = pickle.loads(pickle.dumps(load_pieces_folder(os.path.join(test_dir, "pieces"))))
+        arrows = pickle.loads(pickle.dumps(load_arrows_folder(os.path.join(test_dir, "arrows1"))))
+        font = pickle.loads(
+            pickle.dumps(load_font_file(os.path.join(test_dir, "fonts", "Roboto-Bold.ttf")))
+        )
+        from PIL import Image
+
+        board = Image.new("RGB", (160, 160))
+        assert set(pieces(board)) == set("kqbnrpKQBNRP")
+        assert arrows(board)["up"].size == (20, 60)
+        assert font(12) is not None
+
+
+class TestLRUCache:
+    """Tests for the bounded LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted first."""
+        from fentoboardimage import LRUCache
+
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats().evictions == 1
+
+    def test_byte_limit(self):
+        """Test that entries are evicted to stay within max_bytes."""
+        from PIL import Image
+        from fentoboardimage import LRUCache
+
+        cache = LRUCache(max_bytes=2 * 10 * 10 * 4)
+        for key in range(3):
+            cache.put(key, Image.new("RGBA", (10, 10)))
+        assert len(cache) == 2
+        assert cache.stats().bytes == 800
+        # A single entry above the limit is not stored
+        cache.put("big", Image.new("RGBA", (20, 20)))
+        assert "big" not in cache
+
+    def test_stats_and_clear(self):
+        """Test hit and miss counters and clear()."""
+        from fentoboardimage import LRUCache
+
+        cache = LRUCache()
+        assert cache.get_or_create("k", lambda: 42) == 42
+        assert cache.get_or_create("k", lambda: 0) == 42
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 2, 1)
+        cache.clear()
+        assert cache.stats() == (0, 0, 0, 0, 0)
+
+    def test_identity_cache(self):
+        """Test that IdentityCache keys values by object identity."""
+        from fentoboardimage import IdentityCache
+
+        cache = IdentityCache(max_entries=2)
+        first, equal = {"K": 1}, {"K": 1}
+        cache.put(first, "a")
+        cache.put(first, "b", key=2)
+        assert cache.get(first) == "a"
+        assert cache.get(first, 2) == "b"
+        assert cache.get(equal) is None
+        cache.put(equal, "c")
+        assert len(cache) == 2
+        assert cache.stats().evictions == 1
+
+    def test_concurrent_access(self):
+        """Test that the cache stays consistent under threaded use."""
+        import threading
+        from fentoboardimage import LRUCache
+
+        cache = LRUCache(max_entries=50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.get_or_create((offset + i) % 80, lambda: i)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        assert len(cache) == 50
+        assert stats.hits + stats.misses == 8 * 500
+
+    def test_module_caches(self):
+        """Test that clear_caches() empties the renderer caches."""
+        from PIL import Image
+        from fentoboardimage import cache_stats, clear_caches
+
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+        pieces = load_pieces_folder(os.path.join(test_dir, "pieces"))
+        pieces(Image.new("RGB", (88, 88)))
+        assert cache_stats()["resized_cache"].entries >= 1
+        clear_caches()
+        assert all(stats.entries == 0 for stats in cache_stats().values())
+        # Existing loaders keep working after the caches are cleared
+        assert pieces(Image.new("RGB", (88, 88)))["K"].size == (11, 11)
+
+    def test_alpha_cache_counts_piece_sets(self):
+        """Test that alpha cache entries count the piece set they keep alive."""
+        from PIL import Image
+        from fentoboardimage import clear_caches
+
+        clear_caches()
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+        pieces = load_pieces_folder(os.path.join(test_dir, "pieces"))
+        pieces(Image.new("RGB", (80, 80)))
+        # 12 RGBA pieces plus their 12 alpha channels, 10x10 pixels each
+        assert fbi_main.alpha_cache.stats().bytes == 12 * 100 * 4 + 12 * 100
+        assert fbi_main.alpha_cache.max_bytes is not None
+
+
+class TestRenderCache:
+    """Tests for render cache keys and backends."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+    def _options(self, **overrides):
+        options = dict(
+            square_length=20,
+            piece_set=load_pieces_folder(os.path.join(self.test_dir, "pieces")),
+            dark_color="#D18B47",
+            light_color="#FFCE9E",
+        )
+        options.update(overrides)
+        return options
+
+    def test_key_uses_piece_placement_only(self):
+        """Test that non-placement FEN fields do not change the key."""
+        from fentoboardimage import render_key
+
+        a = render_key(self.start, **self._options())
+        b = render_key("rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR b - - 3 9", **self._options())
+        assert a == b
+        assert a != render_key(self.start, **self._options(flipped=True))
+        assert a != render_key(self.start, **self._options(square_length=21))
+
+    def test_key_normalizes_squares(self):
+        """Test that algebraic and index arrows share a key."""
+        from fentoboardimage import render_key
+
+        arrow_set = load_arrows_folder(os.path.join(self.test_dir, "arrows1"))
+        a = render_key(self.start, **self._options(arrow_set=arrow_set, arrows=[["e2", "e4"]]))
+        b = render_key(self.start, **self._options(arrow_set=arrow_set, arrows=[((4, 6), (4, 4))]))
+        assert a == b
+
+    def test_unstable_assets_are_not_cached(self):
+        """Test that a lambda piece set produces no key."""
+        from fentoboardimage import render_key
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces"))
+        assert render_key(self.start, **self._options(piece_set=lambda board: pieces(board))) is None
+
+    def test_memory_cache_hit(self):
+        """Test that a repeated request is served from the memory cache."""
+        from fentoboardimage import MemoryRenderCache, fen_to_png_bytes
+
+        cache = MemoryRenderCache()
+        first = fen_to_png_bytes(self.start, cache=cache, **self._options())
+        second = fen_to_png_bytes(self.start, cache=cache, **self._options())
+        assert first == second
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+    def test_disk_cache_round_trip(self, tmp_path):
+        """Test that the disk cache stores and returns encoded renders."""
+        from fentoboardimage import DiskRenderCache, fen_to_png_bytes
+
+        cache = DiskRenderCache(str(tmp_path / "renders"))
+        first = fen_to_png_bytes(self.start, cache=cache, **self._options())
+        assert len(list((tmp_path / "renders").rglob("*"))) == 2
+        # A fresh cache object over the same directory sees the entry
+        other = DiskRenderCache(str(tmp_path / "renders"))
+        assert fen_to_png_bytes(self.start, cache=other, **self._options()) == first
+        other.clear()
+        assert not [p for p in (tmp_path / "renders").rglob("*") if p.is_file()]
+
+
+class TestAsyncRendering:
+    """Tests for the asyncio rendering helpers."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+    def _options(self):
+        return dict(
+            square_length=20,
+            piece_set=load_pieces_folder(os.path.join(self.test_dir, "pieces")),
+            dark_color="#D18B47",
+            light_color="#FFCE9E",
+        )
+
+    def test_fen_to_image_async(self):
+        """Test that the async render matches fen_to_image."""
+        import asyncio
+        from PIL import ImageChops
+        from fentoboardimage import fen_to_image_async
+
+        image = asyncio.run(fen_to_image_async(self.start, **self._options()))
+        expected = fen_to_image(self.start, **self._options())
+        assert ImageChops.difference(image, expected).getbbox() is None
+
+    def test_duplicate_requests_are_coalesced(self):
+        """Test that concurrent identical requests share one render."""
+        import asyncio
+        from fentoboardimage import AsyncRenderer
+
+        renderer = AsyncRenderer(max_concurrency=2)
+        other = "8/8/8/4k3/8/8/4K3/8 w - - 0 1"
+
+        async def run():
+            return await asyncio.gather(
+                renderer.render(self.start, **self._options()),
+                renderer.render(self.start, **self._options()),
+                renderer.render(self.start, **self._options()),
+                renderer.render(other, **self._options()),
+            )
+
+        results = asyncio.run(run())
+        assert results[0] == results[1] == results[2]
+        assert results[3] != results[0]
+        assert renderer.coalesced == 2
+        assert renderer.inflight == 0
+
+    def test_invalid_concurrency(self):
+        """Test that max_concurrency must be positive."""
+        from fentoboardimage import AsyncRenderer
+
+        with pytest.raises(ValueError):
+            AsyncRenderer(max_concurrency=0)
+
+
+class TestBenchmarks:
+    """Tests for the benchmark module."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def test_run_benchmarks(self):
+        """Test that selected stages are timed in both cache modes."""
+        from fentoboardimage.bench import run_benchmarks
+
+        report = run_benchmarks(self.test_dir, sizes=[16], repeat=1, stages=["parse_fen", "paint_all_arrows"])
+        stages = {(result["stage"], result["cache"]) for result in report["results"]}
+        assert ("parse_fen", "cold") in stages
+        assert ("paint_all_arrows:knight", "warm") in stages
+        assert not any(stage.startswith("png_encode") for stage, _ in stages)
+        assert all(result["median_ms"] >= 0 for result in report["results"])
+
+    def test_load_pieces_stage_loads_every_piece(self):
+        """Test that the piece loading stage decodes the whole lazy set."""
+        from fentoboardimage import clear_caches
+        from fentoboardimage.bench import _stages
+
+        clear_caches()
+        stage = next(s for s in _stages(self.test_dir, 16) if s.name == "load_pieces:pieces")
+        piece_images, piece_alphas = stage.run(stage.setup())
+        assert sorted(piece_images.loaded()) == sorted(piece_images)
+        assert sorted(piece_alphas.loaded()) == sorted(piece_images)
+
+    def test_compare(self):
+        """Test that only slowdowns beyond the threshold are reported."""
+        from fentoboardimage.bench import BENCH_VERSION, compare
+
+        def report(*medians):
+            return {
+                "version": BENCH_VERSION,
+                "results": [
+                    {"stage": stage, "square_length": 16, "cache": "warm", "median_ms": median}
+                    for stage, median in zip(("a", "b", "c"), medians)
+                ],
+            }
+
+        regressions = compare(report(10.0, 10.0, 0.01), report(10.5, 12.0, 0.03), threshold=0.10)
+        assert [(r.stage, r.ratio) for r in regressions] == [("b", 1.2)]
+
+    def test_main_fails_on_regression(self, tmp_path, capsys):
+        """Test the exit status of the baseline compare mode."""
+        import json
+        from fentoboardimage.bench import main
+
+        baseline = tmp_path / "baseline.json"
+        args = ["--assets", self.test_dir, "--sizes", "16", "--repeat", "1", "--stage", "parse_fen", "--cache", "warm"]
+        assert main(args + ["--output", str(baseline)]) == 0
+        report = json.loads(baseline.read_text())
+        for result in report["results"]:
+            result["median_ms"] = 0.0
+        baseline.write_text(json.dumps(report))
+        assert main(args + ["--baseline", str(baseline), "--min-ms", "0"]) == 1
+        assert "REGRESSION parse_fen" in capsys.readouterr().err
+
+    def test_main_requires_assets(self, tmp_path, capsys):
+        """Test that a missing asset directory is a usage error."""
+        from fentoboardimage.bench import main
+
+        for args in ([], ["--assets", str(tmp_path / "missing")]):
+            with pytest.raises(SystemExit) as excinfo:
+                main(args + ["--sizes", "16", "--repeat", "1"])
+            assert excinfo.value.code == 2
+            assert "--assets" in capsys.readouterr().err
+
+
+class TestInstrumentation:
+    """Tests for render phase instrumentation."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def _render(self, **options):
+        return fen_to_image(
+            "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7",
+            20,
+            load_pieces_folder(os.path.join(self.test_dir, "pieces")),
+            "#D18B47",
+            "#FFCE9E",
+            **options,
+        )
+
+    def test_phases_are_reported(self):
+        """Test that each phase reports matching start and end events."""
+        from fentoboardimage import Instrumentation
+
+        class Recorder(Instrumentation):
+            def __init__(self):
+                self.calls = []
+
+            def start(self, event):
+                self.calls.append(("start", event))
+
+            def end(self, event, seconds):
+                assert seconds >= 0
+                self.calls.append(("end", event))
+
+        recorder = Recorder()
+        self._render(
+            arrow_set=load_arrows_folder(os.path.join(self.test_dir, "arrows1")),
+            arrows=[("a1", "h8"), ("g1", "f3")],
+            last_move={"before": "e2", "after": "e4", "darkColor": "#aaa23a", "lightColor": "#cdd26a"},
+            instrumentation=recorder,
+        )
+        phases = [event.phase for kind, event in recorder.calls if kind == "end"]
+        assert phases == [
+            "parse",
+            "checkerboard",
+            "last_move",
+            "piece_resolve",
+            "arrow_resolve",
+            "piece_paint",
+            "arrow_paint",
+        ]
+        assert [kind for kind, _ in recorder.calls[:2]] == ["start", "end"]
+        paint = next(event for _, event in recorder.calls if event.phase == "piece_paint")
+        assert (paint.square_length, paint.piece_count, paint.arrow_count) == (20, 32, 2)
+
+    def test_global_instrumentation(self):
+        """Test that a registered instrumentation covers encoding as well."""
+        from fentoboardimage import PhaseTimer, fen_to_png_bytes, set_instrumentation
+
+        timer = PhaseTimer()
+        previous = set_instrumentation(timer)
+        try:
+            fen_to_png_bytes(
+                "8/8/8/4k3/8/8/4K3/8 w - - 0 1",
+                20,
+                load_pieces_folder(os.path.join(self.test_dir, "pieces")),
+                "#D18B47",
+                "#FFCE9E",
+            )
+        finally:
+            set_instrumentation(previous)
+        totals = timer.totals()
+        assert {"parse", "checkerboard", "piece_resolve", "piece_paint", "encode"} <= set(totals)
+        assert "coordinates" not in totals
+
+        timer.clear()
+        self._render()
+        assert timer.records == []
+
+    def test_encode_counts(self):
+        """Test that the encode phase reports the position's piece and arrow counts."""
+        from fentoboardimage import PhaseTimer, render_many
+
+        timer = PhaseTimer()
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces"))
+        jobs = [
+            "8/8/8/4k3/8/8/4K3/8 w - - 0 1",
+            {"fen": "8/8/8/4k3/8/8/4KP2/8 w - - 0 1", "arrows": [("e2", "e4")]},
+        ]
+        list(render_many(jobs, 20, pieces, "#D18B47", "#FFCE9E", instrumentation=timer))
+        encodes = [event for event, _ in timer.records if event.phase == "encode"]
+        assert [(event.piece_count, event.arrow_count) for event in encodes] == [(2, 0), (3, 1)]
+
+    @pytest.mark.parametrize("into", [False, True])
+    def test_numpy_engine_arrow_paint(self, into):
+        """Test that the numpy engine reports arrows in their own phase."""
+        np = pytest.importorskip("numpy")
+        from fentoboardimage import PhaseTimer
+        from fentoboardimage.fen_parser import Position
+
+        timer = PhaseTimer()
+        prepared = fbi_main._PreparedRender(
+            20,
+            load_pieces_folder(os.path.join(self.test_dir, "pieces")),
+            "#D18B47",
+            "#FFCE9E",
+            arrow_set=load_arrows_folder(os.path.join(self.test_dir, "arrows1")),
+            arrows=[("a1", "h8")],
+            engine="numpy",
+            instrumentation=timer,
+        )
+        timer.clear()
+        position = Position.from_fen("8/8/8/4k3/8/8/4K3/8 w - - 0 1")
+        if into:
+            prepared.render_into(np.zeros((160, 160, 3), dtype=np.uint8), (0, 0), position)
+        else:
+            prepared.render_position(position)
+        phases = [(event.phase, event.piece_count, event.arrow_count) for event, _ in timer.records]
+        assert phases == [("piece_paint", 2, 1), ("arrow_paint", 2, 1)]
+
+
+class TestCoordinateLayer:
+    """Tests for cached fonts and coordinate layers."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def _coordinates(self, size=12, position_fn=standard):
+        return {
+            "font": load_font_file(os.path.join(self.test_dir, "fonts", "Roboto-Bold.ttf")),
+            "size": size,
+            "dark_color": "#202020",
+            "light_color": "#f0f0f0",
+            "position_fn": position_fn,
+        }
+
+    def test_font_is_loaded_once_per_size(self):
+        """Test that the font loader returns the cached font for a size."""
+        font = load_font_file(os.path.join(self.test_dir, "fonts", "Roboto-Bold.ttf"))
+        assert font(14) is font(14)
+        assert font(14) is not font(15)
+
+    def test_layer_is_reused(self):
+        """Test that the coordinate mask is rendered once per configuration."""
+        fbi_main.coordinate_layer_cache.clear()
+        for _ in range(3):
+            fbi_main._draw_coordinates(
+                fbi_main.checker_board_template(20, "#D18B47", "#FFCE9E").copy(),
+                self._coordinates(),
+                20,
+            )
+        stats = fbi_main.coordinate_layer_cache.stats()
+        assert (stats.misses, stats.hits, stats.entries) == (1, 2, 1)
+
+    def test_game_renderer_matches_with_overlapping_labels(self):
+        """Test that highlight tiles reuse the layer, even where labels overlap squares."""
+        from PIL import ImageChops
+        from fentoboardimage import GameRenderer
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces"))
+        coordinates = self._coordinates(size=30, position_fn=along_outer_rim)
+        renderer = GameRenderer(20, pieces, "#D18B47", "#FFCE9E", coordinates=coordinates)
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        last_move = {"before": "a1", "after": "b1", "darkColor": "#aaa23a", "lightColor": "#cdd26a"}
+        frame = renderer.render(fen, last_move=last_move)
+        expected = fen_to_image(
+            fen, 20, pieces, "#D18B47", "#FFCE9E", coordinates=coordinates, last_move=last_move
+        )
+        assert ImageChops.difference(frame, expected).getbbox() is None
+
+
+class TestArrowOverlay:
+    """Tests for cached arrow sprites and the single-pass overlay."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def _arrow_images(self, board):
+        return load_arrows_folder(os.path.join(self.test_dir, "arrows1"))(board)
+
+    def test_sprites_are_built_once(self):
+        """Test that finished arrow sprites are reused across renders."""
+        from PIL import Image
+
+        board = Image.new("RGB", (160, 160), "white")
+        arrow_images = self._arrow_images(board)
+        arrows = [((0, 7), (7, 0)), ((4, 6), (4, 4)), ((0, 3), (7, 3)), ((6, 7), (5, 5))]
+        fbi_main._arrow_sprite_cache.clear()
+        fbi_main.paint_all_arrows(board.copy(), arrows, arrow_images)
+        first = fbi_main._arrow_sprites(160, arrows, arrow_images)
+        second = fbi_main._arrow_sprites(160, arrows, arrow_images)
+        assert all(a is b for (a, _), (b, _) in zip(first, second))
+        # Knight arrows come straight from the arrow set
+        assert fbi_main._arrow_sprite_cache.stats().entries == 3
+
+    def test_overlay_matches_sequential_pastes(self):
+        """Test that one overlay paste is within rounding of pasting each arrow."""
+        from PIL import ImageChops
+
+        board = fbi_main.checker_board_template(20, "#D18B47", "#FFCE9E").copy()
+        arrow_images = self._arrow_images(board)
+        arrows = [((0, 7), (7, 0)), ((4, 6), (4, 4)), ((0, 3), (7, 3)), ((6, 7), (5, 5))]
+        expected = board.copy()
+        for image, corner in fbi_main._arrow_sprites(160, arrows, arrow_images):
+            expected.paste(image, corner, image)
+        painted = fbi_main.paint_all_arrows(board.copy(), arrows, arrow_images)
+        extrema = ImageChops.difference(painted, expected).getextrema()
+        assert max(high for _, high in extrema) <= 2
+
+    def test_invalid_arrow(self):
+        """Test that an arrow no sprite can draw is rejected."""
+        from PIL import Image
+
+        board = Image.new("RGB", (160, 160), "white")
+        with pytest.raises(ValueError):
+            fbi_main.paint_all_arrows(board, [((0, 0), (3, 1))], self._arrow_images(board))
+
+
+class TestPieceMipmaps:
+    """Tests for multi-resolution piece loading."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def _path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def test_pyramid_levels(self):
+        """Test that the smallest folder is halved down to min_size."""
+        from fentoboardimage import load_pieces_mipmaps
+
+        pieces = load_pieces_mipmaps([self._path("pieces128"), self._path("pieces256")], cache=False)
+        assert [level["K"].width for level in pieces.pyramid] == [256, 128, 64, 32, 16]
+
+    def test_integer_factor_uses_reduce(self):
+        """Test that sizes dividing a level are reduced from that level."""
+        from PIL import Image, ImageChops
+        from fentoboardimage import load_pieces_mipmaps
+
+        pieces = load_pieces_mipmaps([self._path("pieces512"), self._path("pieces128")], min_size=128)
+        resized = pieces(Image.new("RGB", (512, 512)))
+        source = load_pieces_folder(self._path("pieces128"), cache=False).piece_images
+        assert ImageChops.difference(resized["q"], source["q"].reduce(2)).getbbox() is None
+        # 100px squares come from the 128px level, the nearest larger one
+        assert pieces(Image.new("RGB", (800, 800)))["q"].size == (100, 100)
+
+    def test_renders_and_pickles(self):
+        """Test that the loader renders boards and survives pickling."""
+        import pickle
+        from fentoboardimage import load_pieces_mipmaps
+
+        pieces = pickle.loads(pickle.dumps(load_pieces_mipmaps(self._path("pieces128"))))
+        image = fen_to_image(
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 20, pieces, "#D18B47", "#FFCE9E"
+        )
+        assert image.size == (160, 160)
+
+    def test_no_folders(self):
+        """Test that an empty folder list is rejected."""
+        from fentoboardimage import load_pieces_mipmaps
+
+        with pytest.raises(ValueError):
+            load_pieces_mipmaps([])
+
+
+class TestLazyPieceDecoding:
+    """Tests for on-demand piece decoding and resizing."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def test_only_board_pieces_load(self):
+        """Test that a render decodes and resizes only the pieces it draws."""
+        from PIL import Image
+        from fentoboardimage import clear_caches
+
+        clear_caches()
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        fen_to_image("8/8/4k3/8/8/3K4/8/8 w - - 0 1", 20, pieces, "#D18B47", "#FFCE9E")
+        assert sorted(pieces.piece_images.loaded()) == ["K", "k"]
+        assert sorted(pieces(Image.new("RGB", (160, 160))).loaded()) == ["K", "k"]
+
+    def test_lazy_map(self):
+        """Test that LazyImageMap reports keys and sizes without loading."""
+        from PIL import Image
+        from fentoboardimage import LazyImageMap
+        from fentoboardimage.cache import sizeof_value
+
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return Image.new("RGBA", (4, 4))
+
+        images = LazyImageMap({"a": factory, "b": factory}, nbytes=128)
+        assert "a" in images and "c" not in images
+        assert sorted(images) == ["a", "b"] and len(images) == 2
+        assert sizeof_value(images) == 128
+        assert calls == []
+        assert images["a"] is images["a"]
+        assert calls == [1]
+        with pytest.raises(KeyError):
+            images["c"]
+
+    def test_pickles(self):
+        """Test that lazy piece sets still pickle."""
+        import pickle
+
+        pieces = pickle.loads(pickle.dumps(load_pieces_folder(os.path.join(self.test_dir, "pieces2"))))
+        image = fen_to_image(
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 20, pieces, "#D18B47", "#FFCE9E"
+        )
+        assert image.size == (160, 160)
+
+
+class TestSvgOutput:
+    """Tests for the SVG backend."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    fen = "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7"
+
+    def _parse(self, svg):
+        import xml.etree.ElementTree as ET
+
+        root = ET.fromstring(svg)
+        namespace = "{http://www.w3.org/2000/svg}"
+        href = "{http://www.w3.org/1999/xlink}href"
+        symbols = [symbol.get("id") for symbol in root.iter(namespace + "symbol")]
+        uses = [(use.get(href), use.get("x"), use.get("y")) for use in root.iter(namespace + "use")]
+        return root, symbols, uses
+
+    def test_symbols_and_pattern(self):
+        """Test that each piece type is defined once and the board is a pattern."""
+        from fentoboardimage import fen_to_svg
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        svg = fen_to_svg(self.fen, 45, pieces, "#D18B47", "#FFCE9E")
+        root, symbols, uses = self._parse(svg)
+        assert root.get("viewBox") == "0 0 360 360"
+        assert sorted(symbols) == sorted("BKNPQRbknpqr")
+        assert len(uses) == 32
+        assert ("#K", "270", "315") in uses
+        assert svg.count("<rect") == 4
+
+    def test_flipped_options(self):
+        """Test that flipping, highlights, arrows and coordinates are drawn."""
+        from fentoboardimage import coordinate_position_fn, fen_to_svg, load_font_file
+
+        svg = fen_to_svg(
+            self.fen,
+            45,
+            load_pieces_folder(os.path.join(self.test_dir, "pieces2")),
+            "#D18B47",
+            "#FFCE9E",
+            arrows=[("e2", "e4"), ("g1", "f3")],
+            flipped=True,
+            last_move={"before": "e2", "after": "e4", "darkColor": "#a9a238", "lightColor": "#cdd269"},
+            coordinates={
+                "font": load_font_file(os.path.join(self.test_dir, "fonts", "Roboto-Bold.ttf")),
+                "size": 12,
+                "dark_color": "#000000",
+                "light_color": "#FFFFFF",
+                "position_fn": coordinate_position_fn["standard"],
+            },
+            id_prefix="board1-",
+        )
+        root, symbols, uses = self._parse(svg)
+        # The white king on g1 is at the top left quarter when flipped
+        assert ("#board1-K", "45", "0") in uses
+        assert svg.count("url(#board1-arrowhead)") == 2
+        assert svg.count("<text") == 16
+        assert 'fill="#cdd269"' in svg
+
+    def test_svg_pieces(self, tmp_path):
+        """Test that SVG pieces are inlined as symbols."""
+        from fentoboardimage import fen_to_svg, load_pieces_svg
+
+        for color in ("white", "black"):
+            (tmp_path / color).mkdir()
+            for name in ("Pawn", "Rook", "Knight", "Bishop", "Queen", "King"):
+                (tmp_path / color / f"{name}.svg").write_text(
+                    '<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg" width="45" '
+                    f'height="45"><circle cx="22.5" cy="22.5" r="10" class="{color}{name}"/></svg>'
+                )
+        pieces = load_pieces_svg(str(tmp_path), cache=False)
+        svg = fen_to_svg("8/8/4k3/8/8/3K4/8/8 w - - 0 1", 45, pieces, "#D18B47", "#FFCE9E")
+        root, symbols, uses = self._parse(svg)
+        assert sorted(symbols) == ["K", "k"]
+        assert '<symbol id="K" viewBox="0 0 45 45"><circle' in svg
+        assert 'class="whiteKing"' in svg and "whitePawn" not in svg
+        assert len(svg) < 1200
+
+    def test_svg_piece_ids_are_prefixed(self, tmp_path):
+        """Test that ids inside SVG pieces are scoped to the piece and the prefix."""
+        import re
+        from fentoboardimage import fen_to_svg, load_pieces_svg
+
+        for color in ("white", "black"):
+            (tmp_path / color).mkdir()
+            for name in ("Pawn", "Rook", "Knight", "Bishop", "Queen", "King"):
+                (tmp_path / color / f"{name}.svg").write_text(
+                    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                    'viewBox="0 0 45 45"><defs><linearGradient id="shade"/>'
+                    '<clipPath id="outline"><circle r="10"/></clipPath>'
+                    '<path id="body" d="M 0 0 H 45"/></defs>'
+                    '<g clip-path="url(#outline)" fill="url(\'#shade\')"><use xlink:href="#body"/></g></svg>'
+                )
+        pieces = load_pieces_svg(str(tmp_path), cache=False)
+        svg = fen_to_svg("8/8/4k3/8/8/3K4/8/8 w - - 0 1", 45, pieces, "#D18B47", "#FFCE9E", id_prefix="b1-")
+        root, symbols, uses = self._parse(svg)
+        ids = [element.get("id") for element in root.iter() if element.get("id")]
+        assert len(ids) == len(set(ids))
+        assert {"b1-K-shade", "b1-k-outline", "b1-K-body"} <= set(ids)
+        references = re.findall(r"""href="#([^"]+)"|url\('?#([^)']+)""", svg)
+        assert {"".join(reference) for reference in references} <= set(ids)
+        assert 'clip-path="url(#b1-K-outline)"' in svg
+
+    @pytest.mark.parametrize("arrow", [("a1", "b4"), ("e2", "d5"), ("h1", "a2")])
+    def test_invalid_arrow(self, arrow):
+        """Test that arrows fen_to_image cannot draw are rejected."""
+        from fentoboardimage import fen_to_svg
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        with pytest.raises(ValueError):
+            fen_to_image(
+                self.fen,
+                20,
+                pieces,
+                "#D18B47",
+                "#FFCE9E",
+                arrow_set=load_arrows_folder(os.path.join(self.test_dir, "arrows1")),
+                arrows=[arrow],
+            )
+        with pytest.raises(ValueError):
+            fen_to_svg(self.fen, 20, pieces, "#D18B47", "#FFCE9E", arrows=[arrow])
+
+    def test_arrow_to_own_square(self):
+        """Test that an arrow to its own square is drawn, as by fen_to_image."""
+        from fentoboardimage import fen_to_svg
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        svg = fen_to_svg(self.fen, 20, pieces, "#D18B47", "#FFCE9E", arrows=[("e2", "e2")])
+        assert 'marker-end="url(#arrowhead)"' in svg
+
+
+class TestPdfOutput:
+    """Tests for the PDF writer."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    fen = "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQ1RK1 w - - 0 7"
+
+    def _check_xref(self, pdf):
+        start = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+        lines = pdf[start:].split(b"\n")
+        assert lines[0] == b"xref"
+        count = int(lines[1].split()[1])
+        for number, entry in enumerate(lines[3:2 + count], 1):
+            offset = int(entry[:10])
+            assert pdf[offset:].startswith(b"%d 0 obj" % number)
+
+    def test_single_diagram(self):
+        """Test that a diagram is one board sized page."""
+        from fentoboardimage import fen_to_pdf
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        pdf = fen_to_pdf(self.fen, 20, pieces, "#D18B47", "#FFCE9E")
+        assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+        self._check_xref(pdf)
+        assert pdf.count(b"/Type /Page ") == 1
+        assert b"/MediaBox [0 0 160 160]" in pdf
+        # Each piece type's image and soft mask
+        assert pdf.count(b"/Subtype /Image") == 24
+
+    def test_book_shares_pieces(self):
+        """Test that pieces are embedded once across diagrams and pages."""
+        from fentoboardimage import fens_to_pdf
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        fens = [self.fen, "8/8/4k3/8/8/3K4/8/8 w - - 0 1"] * 10
+        pdf = fens_to_pdf(
+            fens, 20, pieces, "#D18B47", "#FFCE9E",
+            captions=[f"Puzzle ({n})" for n in range(20)], page_size=(595, 842),
+        )
+        self._check_xref(pdf)
+        # Two columns of four rows fit on an A4 page
+        assert pdf.count(b"/Type /Page ") == 3
+        assert pdf.count(b"/Subtype /Image") == 24
+        assert pdf.count(b"/Subtype /Form") == 1
+        single = fens_to_pdf(fens[:2], 20, pieces, "#D18B47", "#FFCE9E")
+        assert len(pdf) < len(single) + 4096
+
+    def test_only_used_pieces(self):
+        """Test that pieces missing from every diagram are not embedded."""
+        from fentoboardimage import fens_to_pdf
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        pdf = fens_to_pdf(["8/8/4k3/8/8/3K4/8/8 w - - 0 1"], 20, pieces, "#D18B47", "#FFCE9E")
+        assert pdf.count(b"/Subtype /Image") == 4
+
+    def test_fractional_square_length_coordinates(self):
+        """Test that labels are placed with the same square length as the board."""
+        import re
+        import zlib
+        from fentoboardimage import coordinate_position_fn, fen_to_pdf
+
+        coordinates = {
+            "font": load_font_file(os.path.join(self.test_dir, "fonts", "Roboto-Bold.ttf")),
+            "size": 6,
+            "dark_color": "#000000",
+            "light_color": "#FFFFFF",
+            "position_fn": coordinate_position_fn["every_square"],
+        }
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        pdf = fen_to_pdf(self.fen, 20.5, pieces, "#D18B47", "#FFCE9E", coordinates=coordinates)
+        form = pdf[pdf.index(b"/Subtype /Form"):]
+        stream = zlib.decompress(form[form.index(b"stream\n") + 7:form.index(b"\nendstream")])
+        placed = [float(x) for x in re.findall(rb"1 0 0 1 (\S+) \S+ Tm", stream)]
+        _, labels = fbi_main._layout_coordinates(coordinates, 20.5)
+        expected = [text["coordinate"][0] for _, text in labels]
+        assert placed == pytest.approx(expected, abs=0.001)
+
+    def test_rejects_missing_captions(self):
+        """Test that every diagram needs a caption when captions are given."""
+        from fentoboardimage import fens_to_pdf
+
+        pieces = load_pieces_folder(os.path.join(self.test_dir, "pieces2"))
+        with pytest.raises(ValueError):
+            fens_to_pdf([self.fen] * 2, 20, pieces, "#D18B47", "#FFCE9E", captions=["Only one"])
+
+
+class TestCommandLine:
+    """Tests for the fentoboardimage command line renderer."""
+
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    lines = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "# a comment",
+        "",
+        "not/a/fen",
+        'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - bm Bb5; id "ruy lopez";',
+        '{"fen": "8/8/4k3/8/8/3K4/8/8 w - - 0 1", "flipped": true}',
+    ]
+
+    def _input(self, tmp_path):
+        path = tmp_path / "positions.txt"
+        path.write_text("\n".join(self.lines) + "\n")
+        return str(path)
+
+    def _args(self, tmp_path, *extra):
+        return [self._input(tmp_path), "--pieces", os.path.join(self.test_dir, "pieces2"), "--size", "20", *extra]
+
+    def test_numbered_files(self, tmp_path, capsys):
+        """Test that images are named after their line and bad lines are reported."""
+        from PIL import Image
+        from fentoboardimage.cli import main
+
+        output = tmp_path / "out"
+        assert main(self._args(tmp_path, "--output-dir", str(output))) == 1
+        assert sorted(os.listdir(output)) == ["000001.png", "000005.png", "000006.png"]
+        assert "line 4" in capsys.readouterr().err
+        with Image.open(output / "000001.png") as image:
+            assert image.size == (160, 160)
+
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_bad_spec_between_good_lines(self, tmp_path, capsys, workers):
+        """Test that a spec with a bad fen, arrow or last move is skipped, not fatal."""
+        from fentoboardimage.cli import main
+
+        path = tmp_path / "specs.ndjson"
+        path.write_text(
+            "\n".join(
+                [
+                    '{"fen": "8/8/4k3/8/8/3K4/8/8", "arrows": [["e2", "e4"]]}',
+                    '{"fen": "8/8/4k3/8/8/3K4/8/8", "arrows": [["a1", "b4"]]}',
+                    '{"fen": "8/8/4k3/8/8/3K4/8/8", "last_move": {"before": "e2", "after": "e9"}}',
+                    '{"fen": "8/8/4k3/8/8/3K4/8/8", "last_move": {"before": "e2"}}',
+                    '{"fen": 123}',
+                    '{"fen": "8/8/4k3/8/8/3K4/8/8", "arrows": [["g1", "f3"]]}',
+                ]
+            )
+            + "\n"
+        )
+        output = tmp_path / "out"
+        args = [
+            str(path),
+            "--pieces", os.path.join(self.test_dir, "pieces2"),
+            "--arrows", os.path.join(self.test_dir, "arrows1"),
+            "--size", "20",
+            "--workers", workers,
+            "--output-dir", str(output),
+        ]
+        assert main(args) == 1
+        assert sorted(os.listdir(output)) == ["000001.png", "000006.png"]
+        err = capsys.readouterr().err
+        assert "line 2: Invalid arrow target" in err
+        assert "line 3" in err and "line 4" in err
+        assert "line 5: Render spec 'fen' must be a string" in err
+
+    def test_matches_fen_to_image(self, tmp_path):
+        """Test that JSON specs apply their overrides."""
+        from PIL import Image, ImageChops
+        from fentoboardimage.cli import THEMES, main
+
+        output = tmp_path / "out"
+        main(self._args(tmp_path, "--output-dir", str(output), "--theme", "green", "--workers", "2"))
+        expected = fen_to_image(
+            "8/8/4k3/8/8/3K4/8/8 w - - 0 1",
+            20,
+            load_pieces_folder(os.path.join(self.test_dir, "pieces2")),
+            *THEMES["green"],
+            flipped=True,
+        )
+        with Image.open(output / "000006.png") as image:
+            assert ImageChops.difference(image.convert("RGB"), expected).getbbox() is None
+
+    def test_archives(self, tmp_path, capsysbinary):
+        """Test that tar and zip archives are streamed to stdout."""
+        import io
+        import tarfile
+        import zipfile
+        from fentoboardimage.cli import main
+
+        main(self._args(tmp_path, "--archive", "tar", "--format", "webp"))
+        with tarfile.open(fileobj=io.BytesIO(capsysbinary.readouterr().out)) as archive:
+            assert archive.getnames() == ["000001.webp", "000005.webp", "000006.webp"]
+        main(self._args(tmp_path, "--archive", "zip"))
+        with zipfile.ZipFile(io.BytesIO(capsysbinary.readouterr().out)) as archive:
+            assert archive.namelist() == ["000001.png", "000005.png", "000006.png"]
+
+    def test_length_prefixed(self, tmp_path, capsysbinary):
+        """Test that images are framed by their length on stdout by default."""
+        import struct
+        from fentoboardimage.cli import main
+
+        main(self._args(tmp_path))
+        data = capsysbinary.readouterr().out
+        frames = []
+        while data:
+            (length,) = struct.unpack(">I", data[:4])
+            frames.append(data[4:4 + length])
+            data = data[4 + length:]
+        assert len(frames) == 3
+        assert all(frame.startswith(b"\x89PNG") for frame in frames)